@@ -0,0 +1 @@
+"""Benchmarks for the generator. These are run manually (or with `pdm bench`), not as part of the test suite."""
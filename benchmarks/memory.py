@@ -0,0 +1,89 @@
+"""Measure how much memory generating a client takes, relative to the size of the OpenAPI document.
+
+Run with `python -m benchmarks.memory` (or `pdm bench_memory`). A synthetic document is generated from, and the growth
+in the peak resident set size of this process while doing so is divided by the size of the document (as JSON). A tiny
+document is generated first, so that imports and compiling templates aren't counted. Pass `--low-memory` to measure
+the `low_memory` mode, `--max-ratio` to exit with an error if the ratio is higher than that, and `--output` to save the
+measurement as JSON.
+
+The peak resident set size can only grow, so each measurement needs a new process.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import resource
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from openapi_python_client import generate
+from openapi_python_client.config import Config, ConfigFile, MetaType
+
+from .synthetic import Shape, synthetic_document
+
+# `ru_maxrss` is in bytes on macOS, kilobytes everywhere else
+_MAX_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def _peak_rss() -> int:
+    # On Linux, `ru_maxrss` starts at the peak of the parent process (like a test runner), but `VmHWM` doesn't
+    with contextlib.suppress(OSError):
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAX_RSS_UNIT
+
+
+def _generate(shape: Shape, directory: Path, *, low_memory: bool) -> int:
+    """Generate a client from a synthetic document with the given `shape`, returning the size of the document"""
+    document_path = directory / "openapi.json"
+    document_path.write_text(json.dumps(synthetic_document(shape)))
+    config = Config.from_sources(
+        ConfigFile(post_hooks=[], low_memory=low_memory),
+        MetaType.NONE,
+        document_source=document_path,
+        file_encoding="utf-8",
+        overwrite=True,
+        output_path=directory / "client",
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        errors = generate(config=config)
+    if errors:
+        raise RuntimeError(f"Unexpected errors generating from synthetic document: {errors[:3]}")
+    return document_path.stat().st_size
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=500, help="Number of schemas and of endpoints in the document")
+    parser.add_argument("--low-memory", action="store_true", help="Generate in low memory mode")
+    parser.add_argument("--max-ratio", type=float, help="Fail if memory grows by more than this times the document")
+    parser.add_argument("--output", type=Path, help="Write the measurement to this JSON file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as warm_up_dir:
+        _generate(Shape(schemas=10, endpoints=10), Path(warm_up_dir), low_memory=args.low_memory)
+    with tempfile.TemporaryDirectory() as output_dir:
+        before = _peak_rss()
+        document_size = _generate(
+            Shape(schemas=args.size, endpoints=args.size, inline_ratio=0.5),
+            Path(output_dir),
+            low_memory=args.low_memory,
+        )
+        growth = _peak_rss() - before
+
+    ratio = growth / document_size
+    print(f"{document_size / 1e6:.2f}MB document, peak memory grew by {growth / 1e6:.1f}MB ({ratio:.1f}x)")
+    if args.output:
+        args.output.write_text(json.dumps({"document_size": document_size, "growth": growth, "ratio": ratio}))
+    if args.max_ratio is not None and ratio > args.max_ratio:
+        print(f"Peak memory grew by more than {args.max_ratio}x the size of the document")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Measure how the whole generator scales along each axis of a synthetic document.
+
+Run with `python -m benchmarks.scaling` (or `pdm bench`). For each axis (number of schemas, endpoints, `allOf` depth,
+union width, enum size, and ratio of inline schemas to `$ref`s), documents of increasing size are parsed with
+`GeneratorData.from_dict` and rendered with `Project.build` (without post hooks). The marginal time per unit (how much
+longer each size took than the previous one, divided by the difference in size) is printed for every size. The script
+exits with an error if that grows by more than `MAX_SLOWDOWN` from the smaller to the largest sizes, which would mean
+that axis scales worse than linearly (e.g. quadratic copying of `Schemas`).
+
+Pass `--output curves.json` to save the measurements for plotting, `--axis` to only run some axes, and `--quick` for a
+rough look (the three smallest sizes of each, measured once, which is too noisy to check linearity).
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from attrs import asdict, define, evolve, field
+
+from openapi_python_client import Project
+from openapi_python_client.config import Config, ConfigFile, MetaType
+from openapi_python_client.parser import GeneratorData
+
+from .synthetic import Shape, synthetic_document
+
+# How much slower per unit the largest sizes may be than the smallest before an axis is considered non-linear
+MAX_SLOWDOWN = 2.0
+# Phases which take less extra time than this between sizes are too noisy to check for linearity
+MIN_CHECKED_SECONDS = 0.05
+# Each size is measured this many times, keeping the fastest, to reduce noise
+REPEAT = 3
+
+
+@define
+class Axis:
+    """One dimension to scale a synthetic document along, holding everything else at `base`"""
+
+    name: str
+    sizes: tuple[Any, ...]
+    base: Shape = field(factory=Shape)
+    check_linear: bool = True
+
+
+AXES = (
+    Axis("schemas", (250, 500, 1000, 2000), base=Shape(endpoints=10)),
+    Axis("endpoints", (250, 500, 1000, 2000), base=Shape(schemas=10)),
+    # Every level of the chain is also a model with all the properties of the levels above it, so the size of the
+    # output grows with the square of the depth. Use enough other models that they dominate it.
+    Axis("all_of_depth", (4, 8, 16, 32), base=Shape(schemas=200, endpoints=10)),
+    Axis("union_width", (5, 10, 20, 40)),
+    Axis("enum_size", (2000, 4000, 8000, 16000), base=Shape(schemas=10, endpoints=10)),
+    # Not a size, so only reported rather than checked for linearity
+    Axis("inline_ratio", (0.0, 0.25, 0.5, 1.0), check_linear=False),
+)
+
+
+@define
+class Measurement:
+    """Seconds taken by each phase for one size of an axis"""
+
+    size: Any
+    parse: float
+    build: float
+
+
+def _config(output_path: Path) -> Config:
+    return Config.from_sources(
+        ConfigFile(post_hooks=[]),
+        MetaType.NONE,
+        document_source=Path("benchmark.yaml"),
+        file_encoding="utf-8",
+        overwrite=True,
+        output_path=output_path,
+    )
+
+
+def measure(shape: Shape, config: Config) -> tuple[float, float]:
+    """Get the seconds taken to parse and then to build a document with the given `shape`"""
+    document = synthetic_document(shape)
+    start = time.perf_counter()
+    openapi = GeneratorData.from_dict(document, config=config)
+    parsed = time.perf_counter()
+    if not isinstance(openapi, GeneratorData):
+        raise RuntimeError(f"Could not parse synthetic document: {openapi.header} {openapi.detail}")
+    if openapi.errors:
+        raise RuntimeError(f"Unexpected errors parsing synthetic document: {openapi.errors[:3]}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        errors = Project(openapi=openapi, config=config).build()
+    built = time.perf_counter()
+    if errors:
+        raise RuntimeError(f"Unexpected errors building synthetic document: {errors[:3]}")
+    return parsed - start, built - parsed
+
+
+def run_axis(axis: Axis, config: Config, sizes: tuple[Any, ...], repeat: int) -> list[Measurement]:
+    """Measure every size of `axis`, printing the results as they come in"""
+    print(f"{axis.name}:")
+    measurements: list[Measurement] = []
+    for size in sizes:
+        runs = []
+        for _ in range(repeat):
+            gc.collect()
+            runs.append(measure(evolve(axis.base, **{axis.name: size}), config))
+        parse, build = min(run[0] for run in runs), min(run[1] for run in runs)
+        measurements.append(Measurement(size=size, parse=parse, build=build))
+        per_unit = ""
+        if axis.check_linear and len(measurements) > 1:
+            parse_per_unit, build_per_unit = (
+                _marginal(measurements[-2], measurements[-1], phase) * 1e3 for phase in PHASES
+            )
+            per_unit = f" (+{parse_per_unit:.3f}ms / +{build_per_unit:.3f}ms per extra unit)"
+        print(f"  {size:>6}: parse {parse:7.3f}s, build {build:7.3f}s{per_unit}")
+    return measurements
+
+
+PHASES = ("parse", "build")
+
+
+def _marginal(smaller: Measurement, larger: Measurement, phase: str) -> float:
+    return (getattr(larger, phase) - getattr(smaller, phase)) / (larger.size - smaller.size)
+
+
+def slowdowns(measurements: list[Measurement]) -> dict[str, Optional[float]]:
+    """How many times longer each extra unit took between the two largest sizes than between the smaller ones.
+
+    None for phases which don't take long enough to tell.
+    """
+    result: dict[str, Optional[float]] = {}
+    for phase in PHASES:
+        # The smallest sizes are too close together to compare on their own, the noise is bigger than the difference
+        first = _marginal(measurements[0], measurements[-2], phase)
+        last = _marginal(measurements[-2], measurements[-1], phase)
+        extra_seconds = getattr(measurements[-1], phase) - getattr(measurements[-2], phase)
+        if first <= 0 or extra_seconds < MIN_CHECKED_SECONDS:
+            result[phase] = None
+        else:
+            result[phase] = last / first
+    return result
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--axis", action="append", choices=[axis.name for axis in AXES], help="Only run these axes")
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Only run the three smallest sizes of each axis once, without checking linearity",
+    )
+    parser.add_argument("--output", type=Path, help="Write the measurements to this JSON file")
+    args = parser.parse_args(argv)
+
+    curves: dict[str, list[dict[str, Any]]] = {}
+    failures = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        config = _config(Path(output_dir) / "benchmark-client")
+        measure(Shape(schemas=10, endpoints=10), config)  # Warm up imports and template compilation
+        for axis in AXES:
+            if args.axis and axis.name not in args.axis:
+                continue
+            if args.quick:
+                measurements = run_axis(axis, config, axis.sizes[:3], repeat=1)
+            else:
+                measurements = run_axis(axis, config, axis.sizes, repeat=REPEAT)
+            curves[axis.name] = [asdict(measurement) for measurement in measurements]
+            if not axis.check_linear or args.quick:
+                continue
+            for phase, slowdown in slowdowns(measurements).items():
+                if slowdown is None:
+                    print(f"  {phase}: too fast to check")
+                    continue
+                print(f"  {phase} slowdown per extra unit: {slowdown:.2f}x")
+                if slowdown > MAX_SLOWDOWN:
+                    failures.append(f"{phase} does not scale linearly with {axis.name} ({slowdown:.2f}x)")
+
+    if args.output:
+        args.output.write_text(json.dumps(curves, indent=2))
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Check that building `Schemas` scales linearly with the number of components.
+
+Run with `python -m benchmarks.schemas_scaling`. Each size builds a synthetic document with that many models (which
+reference each other and an enum) and reports the time taken per component. If adding a schema ever becomes O(N) again
+(e.g. by copying `Schemas` on every insert), the time per component will grow with the size and the script exits with
+an error.
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Union
+
+from openapi_python_client.config import Config, ConfigFile, MetaType
+from openapi_python_client.parser.properties import Schemas, build_schemas
+from openapi_python_client.schema import Reference, Schema
+
+from .synthetic import Shape, synthetic_document
+
+SIZES = (1250, 2500, 5000, 10000, 20000)
+# How much slower per component the largest size may be than the smallest before it's considered non-linear
+MAX_SLOWDOWN = 2.0
+
+
+def synthetic_components(count: int) -> dict[str, Union[Reference, Schema]]:
+    """Create `count` models, each referencing the previous one, with a property of a shared enum"""
+    schemas = synthetic_document(Shape(schemas=count, endpoints=0, enum_size=3))["components"]["schemas"]
+    return {name: Schema.model_validate(data) for name, data in schemas.items()}
+
+
+def time_build_schemas(count: int, config: Config) -> float:
+    """Get the number of seconds it takes to build `Schemas` from `count` components"""
+    components = synthetic_components(count)
+    start = time.perf_counter()
+    schemas = build_schemas(components=components, schemas=Schemas(), config=config)
+    elapsed = time.perf_counter() - start
+    if schemas.errors:
+        raise RuntimeError(f"Unexpected errors building synthetic schemas: {schemas.errors[:3]}")
+    return elapsed
+
+
+def main() -> int:
+    config = Config.from_sources(
+        ConfigFile(),
+        MetaType.NONE,
+        document_source=Path("benchmark.yaml"),
+        file_encoding="utf-8",
+        overwrite=False,
+        output_path=None,
+    )
+    per_component = []
+    for count in SIZES:
+        elapsed = time_build_schemas(count, config)
+        per_component.append(elapsed / count)
+        print(f"{count:>6} components: {elapsed:8.3f}s ({elapsed / count * 1e6:7.1f}µs per component)")
+    slowdown = per_component[-1] / per_component[0]
+    print(f"Slowdown per component from {SIZES[0]} to {SIZES[-1]}: {slowdown:.2f}x")
+    if slowdown > MAX_SLOWDOWN:
+        print(f"Building schemas does not scale linearly (more than {MAX_SLOWDOWN}x slower per component)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
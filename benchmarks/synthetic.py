@@ -0,0 +1,112 @@
+"""Synthetic OpenAPI documents for benchmarks, which can be scaled along one axis at a time"""
+
+from typing import Any
+
+from attrs import define
+
+
+@define
+class Shape:
+    """How big a synthetic document is along each axis"""
+
+    # Models, each referencing the previous one either by `$ref` or with an inline copy
+    schemas: int = 100
+    # Operations, each with path and query parameters and a model as request body or response
+    endpoints: int = 100
+    # Length of an `allOf` inheritance chain which every model extends
+    all_of_depth: int = 0
+    # Variants of a `oneOf` property on every model
+    union_width: int = 0
+    # Values of an enum which every model has a property of
+    enum_size: int = 0
+    # Fraction of references between models which are inline schemas instead of `$ref`s
+    inline_ratio: float = 0.0
+
+
+def _ref(name: str) -> dict[str, Any]:
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def _model_properties(index: int) -> dict[str, Any]:
+    return {
+        "id": {"type": "integer"},
+        "name": {"type": "string"},
+        "created": {"type": "string", "format": "date-time"},
+        f"field{index}": {"type": "number"},
+    }
+
+
+def _schemas(shape: Shape) -> dict[str, Any]:
+    schemas: dict[str, Any] = {}
+
+    for level in range(shape.all_of_depth):
+        parent = [_ref(f"Base{level - 1}")] if level else []
+        schemas[f"Base{level}"] = {
+            "allOf": [*parent, {"type": "object", "properties": {f"base{level}": {"type": "string"}}}]
+        }
+    for variant in range(shape.union_width):
+        schemas[f"Variant{variant}"] = {
+            "type": "object",
+            "properties": {"kind": {"type": "string"}, f"variant{variant}": {"type": "integer"}},
+            "required": ["kind"],
+        }
+    if shape.enum_size:
+        schemas["Status"] = {"type": "string", "enum": [f"status_{value}" for value in range(shape.enum_size)]}
+
+    # Spread inline references evenly through the models, so the ratio holds for every prefix of them
+    inline_every = round(1 / shape.inline_ratio) if shape.inline_ratio else 0
+    for index in range(shape.schemas):
+        properties = _model_properties(index)
+        if index:
+            if inline_every and index % inline_every == 0:
+                properties["previous"] = {"type": "object", "properties": _model_properties(index - 1)}
+            else:
+                properties["previous"] = _ref(f"Model{index - 1}")
+        if shape.union_width:
+            properties["choice"] = {"oneOf": [_ref(f"Variant{variant}") for variant in range(shape.union_width)]}
+        if shape.enum_size:
+            properties["status"] = _ref("Status")
+        model: dict[str, Any] = {"type": "object", "properties": properties, "required": ["id", "name"]}
+        if shape.all_of_depth:
+            model = {"allOf": [_ref(f"Base{shape.all_of_depth - 1}"), model]}
+        schemas[f"Model{index}"] = model
+    return schemas
+
+
+def _paths(shape: Shape) -> dict[str, Any]:
+    paths: dict[str, Any] = {}
+    for index in range(shape.endpoints):
+        model = _ref(f"Model{index % shape.schemas}") if shape.schemas else {"type": "object"}
+        parameters = [
+            {"name": "item_id", "in": "path", "required": True, "schema": {"type": "integer"}},
+            {"name": "limit", "in": "query", "schema": {"type": "integer", "default": 10}},
+        ]
+        if index % 2:
+            operation = {
+                "operationId": f"update_item_{index}",
+                "tags": [f"tag{index % 10}"],
+                "parameters": parameters,
+                "requestBody": {"required": True, "content": {"application/json": {"schema": model}}},
+                "responses": {"204": {"description": "Updated"}},
+            }
+            method = "put"
+        else:
+            operation = {
+                "operationId": f"get_item_{index}",
+                "tags": [f"tag{index % 10}"],
+                "parameters": parameters,
+                "responses": {"200": {"description": "OK", "content": {"application/json": {"schema": model}}}},
+            }
+            method = "get"
+        paths[f"/items{index}/{{item_id}}"] = {method: operation}
+    return paths
+
+
+def synthetic_document(shape: Shape) -> dict[str, Any]:
+    """Create an OpenAPI document with the given `shape`"""
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "Benchmark API", "version": "1.0.0"},
+        "paths": _paths(shape),
+        "components": {"schemas": _schemas(shape)},
+    }
@@ -116,6 +116,10 @@ def test_baseline_end_to_end_3_1():
     run_e2e_test("baseline_openapi_3.1.yaml", [], {})
 
 
+def test_baseline_end_to_end_parallel_jobs():
+    run_e2e_test("baseline_openapi_3.0.json", ["--jobs=2"], {})
+
+
 def test_3_1_specific_features():
     run_e2e_test(
         "3.1_specific.openapi.yaml",
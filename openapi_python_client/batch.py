@@ -0,0 +1,168 @@
+"""Generating many clients in one process, sharing compiled templates and caches between them"""
+
+__all__ = ["BatchEntry", "BatchManifest", "generate_batch"]
+
+import json
+import mimetypes
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Optional, Union
+
+from jinja2 import Environment
+from pydantic import BaseModel
+from ruamel.yaml import YAML
+
+from .config import Config, ConfigFile
+from .generator import Project, get_generator_data
+from .meta_type import MetaType
+from .parser.errors import GeneratorError
+
+# Environments (with their compiled templates) by custom template path and cache directory, shared by every client
+# generated in this process which uses the same ones
+_environments: dict[tuple[Optional[Path], Optional[Path]], Environment] = {}
+
+
+class BatchEntry(BaseModel):
+    """One client to generate in a batch, from either a `path` or a `url`.
+
+    Relative paths are relative to the manifest. Anything not set here falls back to the options of the whole batch.
+    """
+
+    path: Optional[Path] = None
+    url: Optional[str] = None
+    config: Optional[Path] = None
+    output_path: Optional[Path] = None
+    meta: Optional[MetaType] = None
+    custom_template_path: Optional[Path] = None
+
+    @property
+    def source(self) -> str:
+        """The document this client is generated from, for messages"""
+        return self.url or str(self.path)
+
+
+class BatchManifest(BaseModel):
+    """A list of clients to generate together.
+
+    See https://github.com/openapi-generators/openapi-python-client#generating-many-clients
+    """
+
+    clients: list[BatchEntry]
+
+    @staticmethod
+    def load_from_path(path: Path) -> "BatchManifest":
+        """Load a manifest from a JSON or YAML file, resolving the paths in it relative to the file"""
+        mime = mimetypes.guess_type(path.absolute().as_uri(), strict=True)[0]
+        if mime == "application/json":
+            data = json.loads(path.read_text())
+        else:
+            yaml = YAML(typ="safe")
+            data = yaml.load(path)
+        manifest = BatchManifest(**data)
+        base_dir = path.parent
+        for entry in manifest.clients:
+            for name in ("path", "config", "output_path", "custom_template_path"):
+                value = getattr(entry, name)
+                if value is not None:
+                    setattr(entry, name, base_dir / value)
+        return manifest
+
+
+def _entry_config(
+    entry: BatchEntry,
+    *,
+    meta_type: MetaType,
+    file_encoding: str,
+    overwrite: bool,
+    fast: bool,
+    cache_dir: Optional[Path],
+) -> Union[Config, GeneratorError]:
+    source: Union[Path, str]
+    if entry.url and not entry.path:
+        source = entry.url
+    elif entry.path and not entry.url:
+        source = entry.path
+    else:
+        return GeneratorError(header="Provide either path or url for each client in the manifest, not both")
+
+    config_file = ConfigFile()
+    if entry.config is not None:
+        try:
+            config_file = ConfigFile.load_from_path(path=entry.config)
+        except Exception as err:
+            return GeneratorError(header=f"Unable to parse config {entry.config}", detail=str(err))
+    return Config.from_sources(
+        config_file,
+        entry.meta or meta_type,
+        source,
+        file_encoding,
+        overwrite,
+        output_path=entry.output_path,
+        cache_dir=cache_dir,
+        fast=fast,
+    )
+
+
+def _generate_entry(
+    entry: BatchEntry,
+    *,
+    meta_type: MetaType,
+    file_encoding: str,
+    overwrite: bool,
+    fast: bool,
+    cache_dir: Optional[Path],
+    custom_template_path: Optional[Path],
+) -> Sequence[GeneratorError]:
+    config = _entry_config(
+        entry, meta_type=meta_type, file_encoding=file_encoding, overwrite=overwrite, fast=fast, cache_dir=cache_dir
+    )
+    if isinstance(config, GeneratorError):
+        return [config]
+    openapi = get_generator_data(config)
+    if isinstance(openapi, GeneratorError):
+        return [openapi]
+
+    template_path = entry.custom_template_path or custom_template_path
+    environment_key = (template_path, config.cache_dir)
+    project = Project(
+        openapi=openapi,
+        config=config,
+        custom_template_path=template_path,
+        env=_environments.get(environment_key),
+    )
+    _environments.setdefault(environment_key, project.env)
+    return project.build()
+
+
+def generate_batch(
+    entries: Sequence[BatchEntry],
+    *,
+    meta_type: MetaType = MetaType.POETRY,
+    file_encoding: str = "utf-8",
+    overwrite: bool = False,
+    fast: bool = False,
+    cache_dir: Optional[Path] = None,
+    custom_template_path: Optional[Path] = None,
+    workers: int = 1,
+) -> list[Sequence[GeneratorError]]:
+    """Generate every client in `entries`, returning the errors for each one, in the same order.
+
+    Clients are generated one after another in this process, so imports, compiled templates, and memoized identifiers
+    are shared between them. With more than one of `workers`, clients are spread across that many worker processes
+    instead, each of which shares the same things between the clients it generates.
+    """
+    generate_entry = partial(
+        _generate_entry,
+        meta_type=meta_type,
+        file_encoding=file_encoding,
+        overwrite=overwrite,
+        fast=fast,
+        cache_dir=cache_dir,
+        custom_template_path=custom_template_path,
+    )
+    if workers > 1 and len(entries) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(entries))) as process_pool:
+            return list(process_pool.map(generate_entry, entries))
+    return [generate_entry(entry) for entry in entries]
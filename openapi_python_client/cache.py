@@ -0,0 +1,345 @@
+"""Caches which let repeated runs of the generator skip work they have already done"""
+
+__all__ = [
+    "RenderCache",
+    "fingerprint",
+    "generator_data_cache_key",
+    "load_generator_data",
+    "store_generator_data",
+    "template_bytecode_cache",
+]
+
+import dataclasses
+import enum
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import types
+from pathlib import Path, PurePath
+from typing import TYPE_CHECKING, Any, Optional
+
+import attrs
+from attrs import asdict, define, field
+from jinja2 import BytecodeCache, Environment, FileSystemBytecodeCache, TemplateNotFound, meta, nodes
+from jinja2.bccache import Bucket
+from pydantic import BaseModel
+from pydantic_core import PydanticSerializationError
+
+from .config import Config
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .parser import GeneratorData
+
+# Config values which only affect how files are written, not how the document is parsed
+_CONFIG_FIELDS_NOT_AFFECTING_PARSING = {
+    "document_source",
+    "file_encoding",
+    "overwrite",
+    "output_path",
+    "post_hooks",
+    "jobs",
+    "incremental",
+    "cache_dir",
+    "fast",
+}
+
+
+def generator_data_cache_key(document: bytes, config: Config, version: str) -> str:
+    """Get a key which identifies the `GeneratorData` parsed from `document` with this config and generator version"""
+    config_values = {
+        key: value for key, value in asdict(config).items() if key not in _CONFIG_FIELDS_NOT_AFFECTING_PARSING
+    }
+    hasher = hashlib.sha256()
+    hasher.update(version.encode())
+    hasher.update(json.dumps(config_values, sort_keys=True, default=str).encode())
+    hasher.update(document)
+    return hasher.hexdigest()
+
+
+def _cache_path(cache_dir: Path, key: str) -> Path:
+    return cache_dir / f"{key}.pickle"
+
+
+def load_generator_data(cache_dir: Path, key: str) -> Optional["GeneratorData"]:
+    """Get previously stored `GeneratorData` for `key`, or None if there isn't any (or it is unreadable)"""
+    from .parser import GeneratorData
+
+    try:
+        with _cache_path(cache_dir, key).open("rb") as cache_file:
+            # The cache directory is trusted the same way custom templates are
+            data = pickle.load(cache_file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError):
+        return None
+    if not isinstance(data, GeneratorData):
+        return None
+    return data
+
+
+def store_generator_data(cache_dir: Path, key: str, data: "GeneratorData") -> None:
+    """Store `data` for later runs to load with `key`. Failure to store is not an error, the cache is just skipped."""
+    try:
+        content = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, RecursionError, TypeError, AttributeError):
+        return
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so concurrent runs never read a partial entry
+        with tempfile.NamedTemporaryFile(dir=cache_dir, delete=False, suffix=".tmp") as temp_file:
+            temp_file.write(content)
+    except OSError:
+        return
+    try:
+        os.replace(temp_file.name, _cache_path(cache_dir, key))
+    except OSError:
+        Path(temp_file.name).unlink(missing_ok=True)
+
+
+class _ContentKeyedBytecodeCache(FileSystemBytecodeCache):
+    """Stores compiled templates keyed by their name and source, rather than by where the source was loaded from.
+
+    Jinja keys its cache by file path, so copies of the same custom templates in different places (like fresh CI
+    checkouts) would never share entries.
+    """
+
+    def __init__(self, directory: Path, version: str) -> None:
+        super().__init__(str(directory))
+        self.version = version
+
+    def get_bucket(self, environment: Environment, name: str, filename: Optional[str], source: str) -> Bucket:
+        checksum = self.get_source_checksum(source)
+        bucket = Bucket(environment, self.get_cache_key(f"{self.version}:{name}:{checksum}"), checksum)
+        self.load_bytecode(bucket)
+        return bucket
+
+
+def template_bytecode_cache(cache_dir: Path, version: str) -> Optional[BytecodeCache]:
+    """Get a cache for compiled templates in `cache_dir`, or None if the directory can't be used"""
+    directory = cache_dir / "templates"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return _ContentKeyedBytecodeCache(directory, version)
+
+
+_SCALARS = (str, int, float, bytes, type(None))
+_CODE = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+# How values are fingerprinted: as leaves, as JSON (for parts of the document), or from their fields or items
+_LEAF, _JSON, _FIELDS, _ITEMS, _SET, _MAPPING = range(6)
+# The kind of each type seen so far and (for `_FIELDS`) the names of the fields which take part in equality. None for
+# types which can't be fingerprinted.
+_kinds: dict[type, Optional[tuple[int, tuple[str, ...]]]] = {}
+# Kinds of values which are recognized by a base class
+_KINDS_BY_BASE: tuple[tuple[tuple[type, ...], int], ...] = (
+    ((*_SCALARS, enum.Enum, PurePath, *_CODE), _LEAF),
+    ((BaseModel,), _JSON),
+    ((list, tuple), _ITEMS),
+    ((set, frozenset), _SET),
+    ((dict,), _MAPPING),
+)
+
+
+def _kind(cls: type) -> Optional[tuple[int, tuple[str, ...]]]:
+    for bases, kind in _KINDS_BY_BASE:
+        if issubclass(cls, bases):
+            return kind, ()
+    if attrs.has(cls):
+        return _FIELDS, tuple(attribute.name for attribute in attrs.fields(cls) if attribute.eq)
+    if dataclasses.is_dataclass(cls):
+        return _FIELDS, tuple(data_field.name for data_field in dataclasses.fields(cls) if data_field.compare)
+    return None
+
+
+def _leaf_digest(value: Any) -> bytes:
+    if isinstance(value, _SCALARS):  # Including subclasses like `PythonIdentifier`, which only add behavior
+        return f"{type(value).__name__}:{value!r}".encode()
+    if isinstance(value, enum.Enum):
+        return f"{type(value).__qualname__}.{value.name}".encode()
+    if isinstance(value, PurePath):
+        return f"path:{value}".encode()
+    # Code can only change between processes, and functions which depend on config are covered by the config
+    return f"code:{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', '')}".encode()
+
+
+def _json_digest(value: BaseModel) -> Optional[bytes]:
+    """Parts of the document only contain each other and JSON values, and are much faster to dump than to walk"""
+    try:
+        dumped = value.model_dump_json()
+    except PydanticSerializationError:
+        return None
+    return hashlib.sha256(type(value).__qualname__.encode() + dumped.encode()).digest()
+
+
+def _children(value: Any, kind: tuple[int, tuple[str, ...]]) -> list[Any]:
+    if kind[0] == _FIELDS:
+        return [getattr(value, name) for name in kind[1]]
+    if kind[0] == _MAPPING:
+        return [item for pair in value.items() for item in pair]
+    return list(value)
+
+
+# An object being fingerprinted: [object, kind, children, index of the next child, digests so far, depth of the
+# shallowest object on the stack it refers back to]
+_Entry = list[Any]
+
+
+def _finish(entry: _Entry, stack: list[_Entry], memo: dict[int, tuple[Any, bytes]]) -> bytes:
+    """Get the digest of an object which was popped off `stack`, since all of its children are done"""
+    digests = entry[4]
+    if entry[1] == _SET:
+        digests[1:] = sorted(digests[1:])
+    digest = hashlib.sha256(b"\0".join(digests)).digest()
+    # Objects which refer back to their ancestors could have another fingerprint elsewhere, so aren't kept
+    if entry[5] >= len(stack):
+        memo[id(entry[0])] = (entry[0], digest)
+    elif stack:
+        stack[-1][5] = min(stack[-1][5], entry[5])
+    return digest
+
+
+def fingerprint(value: Any, memo: dict[int, tuple[Any, bytes]]) -> Optional[bytes]:
+    """Get a digest of everything in `value`, so that two values with the same fingerprint render the same way.
+
+    `value` can hold the attrs classes, dataclasses, and pydantic models the parser produces, and collections of them.
+    Returns None if it holds anything else. References back to an object which is still being fingerprinted (like a
+    recursive model) are included as how many levels up that object is. Fingerprints of objects are stored in `memo`
+    by id (along with the object, so the id isn't reused), so objects shared by many others are only walked once.
+    """
+    # Walked without recursion, since models can nest deeply
+    stack: list[_Entry] = []
+    depths: dict[int, int] = {}
+    current = value
+    while True:
+        cls = type(current)
+        kind = _kinds[cls] if cls in _kinds else _kinds.setdefault(cls, _kind(cls))
+        digest: Optional[bytes] = None
+        if kind is None:
+            return None
+        if kind[0] == _LEAF:
+            digest = _leaf_digest(current)
+        elif id(current) in memo:
+            digest = memo[id(current)][1]
+        elif kind[0] == _JSON:
+            digest = _json_digest(current)
+            if digest is None:
+                return None
+            memo[id(current)] = (current, digest)
+        elif id(current) in depths:
+            depth = depths[id(current)]
+            digest = b"^%d" % (len(stack) - 1 - depth)
+            stack[-1][5] = min(stack[-1][5], depth)
+        else:
+            depths[id(current)] = len(stack)
+            stack.append([current, kind[0], _children(current, kind), 0, [cls.__qualname__.encode()], len(stack)])
+
+        while True:
+            if digest is not None:
+                if not stack:
+                    return digest
+                stack[-1][4].append(digest)
+            entry = stack[-1]
+            if entry[3] < len(entry[2]):
+                current = entry[2][entry[3]]
+                entry[3] += 1
+                break
+            stack.pop()
+            del depths[id(entry[0])]
+            digest = _finish(entry, stack, memo)
+
+
+def _template_name_prefix(node: nodes.Node) -> tuple[str, bool]:
+    """Get the name of a template from an expression, and whether it is only the start of the name (because the rest
+    is computed while rendering)
+    """
+    if isinstance(node, nodes.Const) and isinstance(node.value, str):
+        return node.value, False
+    if isinstance(node, nodes.Add):
+        return _template_name_prefix(node.left)[0], True
+    if isinstance(node, nodes.Concat) and node.nodes:
+        return _template_name_prefix(node.nodes[0])[0], True
+    return "", True
+
+
+def _template_references(ast: nodes.Template) -> frozenset[tuple[str, bool]]:
+    """Get the templates which `ast` extends, includes, or imports, as returned by `_template_name_prefix`"""
+    references: set[tuple[str, bool]] = set()
+    for node in ast.find_all((nodes.Extends, nodes.Include, nodes.Import, nodes.FromImport)):
+        if not isinstance(node, (nodes.Extends, nodes.Include, nodes.Import, nodes.FromImport)):  # pragma: no cover
+            continue
+        template = node.template
+        names = template.items if isinstance(template, (nodes.Tuple, nodes.List)) else [template]
+        references.update(_template_name_prefix(name) for name in names)
+    return frozenset(references)
+
+
+# Globals which hold the whole document, so templates which use them could render differently after any change
+_WHOLE_DOCUMENT_GLOBALS = frozenset(("openapi", "endpoint_collections_by_tag"))
+
+
+@define
+class RenderCache:
+    """Files rendered by earlier builds in this process, so that building again (e.g. when watching for changes) only
+    renders templates whose inputs changed. Also holds on to the Jinja environment, so templates are compiled once.
+    """
+
+    env: Optional[Environment] = None
+    # The key of what each file was last rendered from, and the result (tidied, in fast mode)
+    _files: dict[Path, tuple[bytes, str]] = field(factory=dict)
+    # Templates each template refers to and variables it uses, by its name and source
+    _parsed_templates: dict[tuple[str, str], tuple[frozenset[tuple[str, bool]], frozenset[str]]] = field(factory=dict)
+    # How many files the last build rendered and how many it reused
+    rendered: int = 0
+    reused: int = 0
+
+    def get(self, path: Path, key: bytes) -> Optional[str]:
+        """Get what was rendered for `path` last time, if it was rendered from the same inputs (`key`)"""
+        entry = self._files.get(path)
+        if entry is None or entry[0] != key:
+            self.rendered += 1
+            return None
+        self.reused += 1
+        return entry[1]
+
+    def store(self, path: Path, key: bytes, content: str) -> None:
+        self._files[path] = (key, content)
+
+    def template_inputs(self, env: Environment, name: str) -> Optional[tuple[bytes, frozenset[str]]]:
+        """Get a digest of the source of template `name` and of every template it imports, includes, or extends, and
+        the names of the variables they use which aren't defined in them.
+
+        Returns None if they use globals that hold the whole document, so there's no use in caching their output.
+        """
+        if env.loader is None:
+            return None
+        hasher = hashlib.sha256()
+        variables: set[str] = set()
+        pending, seen = [name], set()
+        while pending:
+            current = pending.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            try:
+                source = env.loader.get_source(env, current)[0]
+            except TemplateNotFound:
+                hasher.update(f"{current}\0\0".encode())  # Which could be fine, if it's only used conditionally
+                continue
+            hasher.update(f"{current}\0{source}\0".encode())
+            parsed = self._parsed_templates.get((current, source))
+            if parsed is None:
+                ast = env.parse(source)
+                parsed = _template_references(ast), frozenset(meta.find_undeclared_variables(ast))
+                self._parsed_templates[(current, source)] = parsed
+            references, undeclared = parsed
+            variables.update(undeclared)
+            for reference, is_prefix in sorted(references):
+                if is_prefix:
+                    # Names computed while rendering (like property templates) could be any template which fits
+                    pending.extend(name for name in sorted(env.list_templates()) if name.startswith(reference))
+                else:
+                    pending.append(reference)
+        if variables & _WHOLE_DOCUMENT_GLOBALS:
+            return None
+        return hasher.digest(), frozenset(variables)
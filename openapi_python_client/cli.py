@@ -1,14 +1,18 @@
 import codecs
 from collections.abc import Sequence
+from contextlib import AbstractContextManager, nullcontext
 from pathlib import Path
 from pprint import pformat
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Optional, Union
 
 import typer
 
-from openapi_python_client import MetaType
-from openapi_python_client.config import Config, ConfigFile
-from openapi_python_client.parser.errors import ErrorLevel, GeneratorError, ParseError
+from openapi_python_client.meta_type import MetaType
+
+# Everything else is imported only by the commands which need it, so that `--help` and `--version` start fast
+if TYPE_CHECKING:  # pragma: no cover
+    from openapi_python_client.config import Config
+    from openapi_python_client.parser.errors import ErrorLevel, GeneratorError
 
 app = typer.Typer(name="openapi-python-client")
 
@@ -31,7 +35,14 @@ def _process_config(
     file_encoding: str,
     overwrite: bool,
     output_path: Optional[Path],
-) -> Config:
+    jobs: Optional[int] = None,
+    incremental: bool = False,
+    cache_dir: Optional[Path] = None,
+    fast: bool = False,
+    low_memory: bool = False,
+) -> "Config":
+    from openapi_python_client.config import Config, ConfigFile
+
     source: Union[Path, str]
     if url and not path:
         source = url
@@ -63,12 +74,22 @@ def _process_config(
     else:
         config_file = ConfigFile()
 
-    return Config.from_sources(config_file, meta_type, source, file_encoding, overwrite, output_path=output_path)
+    return Config.from_sources(
+        config_file,
+        meta_type,
+        source,
+        file_encoding,
+        overwrite,
+        output_path=output_path,
+        jobs=jobs,
+        incremental=incremental,
+        cache_dir=cache_dir,
+        fast=fast,
+        low_memory=low_memory,
+    )
 
 
 # noinspection PyUnusedLocal
-
-
 @app.callback()
 def cli(
     version: bool = typer.Option(False, "--version", callback=_version_callback, help="Print the version and exit"),
@@ -76,7 +97,9 @@ def cli(
     """Generate a Python client from an OpenAPI document"""
 
 
-def _print_parser_error(err: GeneratorError, color: str) -> None:
+def _print_parser_error(err: "GeneratorError", color: str) -> None:
+    from openapi_python_client.parser.errors import ParseError
+
     typer.secho(err.header, bold=True, fg=color, err=True)
     typer.echo()
     if err.detail:
@@ -90,10 +113,21 @@ def _print_parser_error(err: GeneratorError, color: str) -> None:
     typer.echo()
 
 
-def handle_errors(errors: Sequence[GeneratorError], fail_on_warning: bool = False) -> None:
+def handle_errors(errors: Sequence["GeneratorError"], fail_on_warning: bool = False) -> None:
     """Turn custom errors into formatted error messages"""
+    from openapi_python_client.parser.errors import ErrorLevel
+
     if len(errors) == 0:
         return
+    error_level = _print_errors(errors)
+    if error_level == ErrorLevel.ERROR or fail_on_warning:
+        raise typer.Exit(code=1)
+
+
+def _print_errors(errors: Sequence["GeneratorError"]) -> "ErrorLevel":
+    """Print formatted error messages, returning the most severe level of them"""
+    from openapi_python_client.parser.errors import ErrorLevel
+
     error_level = ErrorLevel.WARNING
     message = "Warning(s) encountered while generating. Client was generated, but some pieces may be missing"
     header_color = typer.colors.BRIGHT_YELLOW
@@ -126,9 +160,7 @@ def handle_errors(errors: Sequence[GeneratorError], fail_on_warning: bool = Fals
         fg=typer.colors.BLUE,
         err=True,
     )
-
-    if error_level == ErrorLevel.ERROR or fail_on_warning:
-        raise typer.Exit(code=1)
+    return error_level
 
 
 @app.command()
@@ -158,6 +190,41 @@ def generate(
         "Defaults to the OpenAPI document title converted to kebab or snake case (depending on meta type). "
         "Can also be overridden with `project_name_override` or `package_name_override` in config.",
     ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        min=1,
+        help="Number of parallel workers used to render models and endpoints. Overrides `jobs` in config. "
+        "Defaults to 1 (no parallelism).",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        help="Only rewrite files whose content changed since the last incremental run and delete files which are "
+        "no longer generated. Use with --overwrite to update an existing client.",
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None,
+        help="A directory to cache the parsed OpenAPI document in, so that later runs with the same document and "
+        "config (e.g., when only custom templates changed) can skip parsing. Overrides `cache_dir` in config.",
+        file_okay=False,
+        dir_okay=True,
+    ),
+    fast: bool = typer.Option(
+        False,
+        help="Tidy generated code while rendering instead of running the default Ruff post hooks afterward. Overrides "
+        "`fast` in config.",
+    ),
+    low_memory: bool = typer.Option(
+        False,
+        help="Release parts of the OpenAPI document as soon as they are parsed, and render and write one file at a "
+        "time, to use less memory for very large documents. Overrides `low_memory` in config.",
+    ),
+    profile: Optional[Path] = typer.Option(
+        None,
+        help="Write a Chrome trace of where generating spent time and memory to this file. "
+        "Open it with a trace viewer, like https://ui.perfetto.dev",
+        file_okay=True,
+        dir_okay=False,
+    ),
 ) -> None:
     """Generate a new OpenAPI Client library"""
     from . import generate
@@ -171,9 +238,174 @@ def generate(
         file_encoding=file_encoding,
         overwrite=overwrite,
         output_path=output_path,
+        jobs=jobs,
+        incremental=incremental,
+        cache_dir=cache_dir,
+        fast=fast,
+        low_memory=low_memory,
     )
-    errors = generate(
+    profiling: AbstractContextManager[object] = nullcontext()
+    if profile is not None:
+        from openapi_python_client.profiling import profile as record_profile
+
+        profiling = record_profile(profile)
+    with profiling:
+        errors = generate(
+            custom_template_path=custom_template_path,
+            config=config,
+        )
+    handle_errors(errors, fail_on_warning)
+
+
+@app.command(name="generate-batch")
+def generate_batch(
+    manifest: Path = typer.Option(
+        ...,
+        help="A JSON or YAML file listing the clients to generate, each with a `path` or `url`, and optionally a "
+        "`config`, `output_path`, `meta`, and `custom_template_path`",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+    ),
+    custom_template_path: Optional[Path] = typer.Option(
+        None,
+        help="A path to a directory containing custom template(s), for clients which don't set their own",
+        file_okay=False,
+        dir_okay=True,
+        readable=True,
+        resolve_path=True,
+    ),  # type: ignore
+    meta: MetaType = typer.Option(
+        MetaType.POETRY,
+        help="The type of metadata you want to generate, for clients which don't set their own.",
+    ),
+    file_encoding: str = typer.Option("utf-8", help="Encoding used when writing generated"),
+    fail_on_warning: bool = False,
+    overwrite: bool = typer.Option(False, help="Overwrite existing clients"),
+    workers: int = typer.Option(
+        1,
+        min=1,
+        help="Number of worker processes to generate clients in. Defaults to 1 (every client in this process).",
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None,
+        help="A directory to cache parsed OpenAPI documents and compiled templates in. Overrides `cache_dir` in "
+        "every config.",
+        file_okay=False,
+        dir_okay=True,
+    ),
+    fast: bool = typer.Option(
+        False,
+        help="Tidy generated code while rendering instead of running Ruff afterward. Overrides `fast` in every config.",
+    ),
+) -> None:
+    """Generate many clients in one process, listed in a manifest.
+
+    Imports, compiled templates, and memoized identifiers are shared between every client, instead of paying for them
+    again in a separate run for each one.
+    """
+    from openapi_python_client.batch import BatchManifest
+    from openapi_python_client.batch import generate_batch as generate_clients
+    from openapi_python_client.parser.errors import ErrorLevel
+
+    try:
+        codecs.getencoder(file_encoding)
+    except LookupError as err:
+        typer.secho(f"Unknown encoding : {file_encoding}", fg=typer.colors.RED)
+        raise typer.Exit(code=1) from err
+    try:
+        clients = BatchManifest.load_from_path(manifest).clients
+    except Exception as err:
+        raise typer.BadParameter("Unable to parse manifest") from err
+
+    results = generate_clients(
+        clients,
+        meta_type=meta,
+        file_encoding=file_encoding,
+        overwrite=overwrite,
+        fast=fast,
+        cache_dir=cache_dir,
         custom_template_path=custom_template_path,
-        config=config,
+        workers=workers,
     )
-    handle_errors(errors, fail_on_warning)
+    failed = False
+    for client, errors in zip(clients, results):
+        if not errors:
+            continue
+        typer.secho(f"Generating from {client.source}:", bold=True, err=True)
+        if _print_errors(errors) == ErrorLevel.ERROR or fail_on_warning:
+            failed = True
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def watch(
+    path: Path = typer.Option(..., help="A path to the OpenAPI document"),
+    custom_template_path: Optional[Path] = typer.Option(
+        None,
+        help="A path to a directory containing custom template(s)",
+        file_okay=False,
+        dir_okay=True,
+        readable=True,
+        resolve_path=True,
+    ),  # type: ignore
+    meta: MetaType = typer.Option(
+        MetaType.POETRY,
+        help="The type of metadata you want to generate.",
+    ),
+    file_encoding: str = typer.Option("utf-8", help="Encoding used when writing generated"),
+    config_json: Optional[str] = typer.Option(None, help="Config json content"),
+    config_path: Optional[Path] = typer.Option(None, help="Path to the config file to use"),
+    output_path: Optional[Path] = typer.Option(
+        None,
+        help="Path to write the generated code to. "
+        "Defaults to the OpenAPI document title converted to kebab or snake case (depending on meta type). "
+        "Can also be overridden with `project_name_override` or `package_name_override` in config.",
+    ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        min=1,
+        help="Number of parallel workers used to render models and endpoints. Overrides `jobs` in config. "
+        "Defaults to 1 (no parallelism).",
+    ),
+) -> None:
+    """Generate a client, then update it whenever the OpenAPI document or custom templates change.
+
+    Runs are incremental and in fast mode, and the existing client is always overwritten. Stop with Ctrl+C.
+    """
+    from openapi_python_client.watch import Watcher
+    from openapi_python_client.watch import watch as watch_for_changes
+
+    config = _process_config(
+        url=None,
+        path=path,
+        config_json=config_json,
+        config_path=config_path,
+        meta_type=meta,
+        file_encoding=file_encoding,
+        overwrite=True,
+        output_path=output_path,
+        jobs=jobs,
+        incremental=True,
+        fast=True,
+    )
+    watcher = Watcher(config=config, custom_template_path=custom_template_path)
+
+    def on_generated(errors: Sequence["GeneratorError"], seconds: float) -> None:
+        from openapi_python_client.parser.errors import ErrorLevel
+
+        if errors and _print_errors(errors) == ErrorLevel.ERROR:
+            typer.echo("Watching for changes...")
+            return
+        cache = watcher.render_cache
+        typer.secho(
+            f"Generated in {seconds:.2f}s ({cache.rendered} files rendered, {cache.reused} unchanged). "
+            "Watching for changes...",
+            fg=typer.colors.GREEN,
+        )
+
+    try:
+        watch_for_changes(watcher, on_generated)
+    except KeyboardInterrupt:
+        typer.echo("Stopped watching")
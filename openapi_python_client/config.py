@@ -1,6 +1,6 @@
 import json
 import mimetypes
-from enum import Enum
+from fnmatch import fnmatchcase
 from pathlib import Path
 from typing import Optional, Union
 
@@ -8,6 +8,8 @@ from attr import define
 from pydantic import BaseModel
 from ruamel.yaml import YAML
 
+from .meta_type import MetaType
+
 
 class ClassOverride(BaseModel):
     """An override of a single generated class.
@@ -19,13 +21,22 @@ class ClassOverride(BaseModel):
     module_name: Optional[str] = None
 
 
-class MetaType(str, Enum):
-    """The types of metadata supported for project generation."""
+class OperationFilter(BaseModel):
+    """Selects operations by any of their tags, their path (a shell-style pattern), or their operationId.
+
+    See https://github.com/openapi-generators/openapi-python-client#include-and-exclude
+    """
 
-    NONE = "none"
-    POETRY = "poetry"
-    SETUP = "setup"
-    PDM = "pdm"
+    tags: list[str] = []
+    paths: list[str] = []
+    operation_ids: list[str] = []
+
+    def matches(self, *, path: str, tags: list[str], operation_id: str) -> bool:
+        return (
+            any(tag in self.tags for tag in tags)
+            or any(fnmatchcase(path, pattern) for pattern in self.paths)
+            or operation_id in self.operation_ids
+        )
 
 
 class ConfigFile(BaseModel):
@@ -46,6 +57,16 @@ class ConfigFile(BaseModel):
     generate_all_tags: bool = False
     http_timeout: int = 5
     literal_enums: bool = False
+    jobs: int = 1
+    incremental: bool = False
+    cache_dir: Optional[Path] = None
+    fast: bool = False
+    include: Optional[OperationFilter] = None
+    exclude: Optional[OperationFilter] = None
+    skip_unused_models: bool = False
+    deduplicate_inline_schemas: bool = False
+    low_memory: bool = False
+    lazy_validation: bool = False
 
     @staticmethod
     def load_from_path(path: Path) -> "ConfigFile":
@@ -65,6 +86,7 @@ class ConfigFile(BaseModel):
         config = ConfigFile(**config_data)
         return config
 
+
 @define
 class Config:
     """Contains all the config values for the generator, from files, defaults, and CLI arguments."""
@@ -81,6 +103,16 @@ class Config:
     generate_all_tags: bool
     http_timeout: int
     literal_enums: bool
+    jobs: int
+    incremental: bool
+    cache_dir: Optional[Path]
+    fast: bool
+    include: Optional[OperationFilter]
+    exclude: Optional[OperationFilter]
+    skip_unused_models: bool
+    deduplicate_inline_schemas: bool
+    low_memory: bool
+    lazy_validation: bool
     document_source: Union[Path, str]
     file_encoding: str
     content_type_overrides: dict[str, str]
@@ -95,9 +127,17 @@ class Config:
         file_encoding: str,
         overwrite: bool,
         output_path: Optional[Path],
+        jobs: Optional[int] = None,
+        incremental: bool = False,
+        cache_dir: Optional[Path] = None,
+        fast: bool = False,
+        low_memory: bool = False,
     ) -> "Config":
+        fast = fast or config_file.fast
         if config_file.post_hooks is not None:
             post_hooks = config_file.post_hooks
+        elif fast:
+            post_hooks = []  # Generated code is tidied while rendering instead
         elif meta_type == MetaType.NONE:
             post_hooks = [
                 "ruff check . --fix --extend-select=I",
@@ -123,9 +163,25 @@ class Config:
             generate_all_tags=config_file.generate_all_tags,
             http_timeout=config_file.http_timeout,
             literal_enums=config_file.literal_enums,
+            jobs=jobs if jobs is not None else config_file.jobs,
+            incremental=incremental or config_file.incremental,
+            cache_dir=cache_dir or config_file.cache_dir,
+            fast=fast,
+            include=config_file.include,
+            exclude=config_file.exclude,
+            skip_unused_models=config_file.skip_unused_models,
+            deduplicate_inline_schemas=config_file.deduplicate_inline_schemas,
+            low_memory=low_memory or config_file.low_memory,
+            lazy_validation=config_file.lazy_validation,
             document_source=document_source,
             file_encoding=file_encoding,
             overwrite=overwrite,
             output_path=output_path,
         )
         return config
+
+    def includes_operation(self, *, path: str, tags: list[str], operation_id: str) -> bool:
+        """Whether to generate an operation, according to `include` and `exclude`"""
+        if self.include is not None and not self.include.matches(path=path, tags=tags, operation_id=operation_id):
+            return False
+        return self.exclude is None or not self.exclude.matches(path=path, tags=tags, operation_id=operation_id)
@@ -0,0 +1,76 @@
+"""Loading OpenAPI documents with the fastest parser which is installed"""
+
+__all__ = ["LoadedDocument", "load_document"]
+
+import json
+import re
+from typing import Any, Optional, Union
+
+from attrs import define
+from ruamel.yaml import YAML
+from ruamel.yaml.error import YAMLError
+
+from .parser.errors import GeneratorError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+# orjson turns integers which don't fit in 64 bits into floats, where the standard library keeps them exact. Every
+# integer outside of that range (from -9223372036854775808 to 18446744073709551615) has at least 19 digits.
+_LONG_NUMBER = re.compile(rb"[0-9]{19,}")
+_JSON_OBJECT_START = re.compile(rb"\s*\{")
+
+
+@define
+class LoadedDocument:
+    """The contents of an OpenAPI document, and which parser loaded them"""
+
+    data: dict[str, Any]
+    parser: str
+
+
+def _looks_like_json(data: bytes) -> bool:
+    """Whether `data` is probably a JSON object, whatever its file extension or content type claims"""
+    return _JSON_OBJECT_START.match(data) is not None
+
+
+def _load_json(data: bytes) -> tuple[Any, str]:
+    if orjson is not None and _LONG_NUMBER.search(data) is None:
+        try:
+            return orjson.loads(data), "orjson"
+        except orjson.JSONDecodeError:
+            pass  # The standard library accepts a few more documents (like NaN) and has more familiar errors
+    return json.loads(data.decode()), "json"
+
+
+def _yaml_parser_name(yaml: YAML) -> str:
+    # ruamel.yaml uses libyaml when ruamel.yaml.clib is installed, and falls back to pure Python otherwise
+    if yaml.Parser.__name__ == "CParser":
+        return "ruamel.yaml (libyaml)"
+    return "ruamel.yaml"  # pragma: no cover
+
+
+def load_document(data: bytes, content_type: Optional[str]) -> Union[LoadedDocument, GeneratorError]:
+    """Parse a JSON or YAML OpenAPI document.
+
+    Anything which looks like JSON is parsed as JSON first, since that is much faster than parsing it as YAML. If that
+    fails, it's parsed as YAML unless `content_type` says it must be JSON.
+    """
+    is_json = content_type == "application/json"
+    if is_json or _looks_like_json(data):
+        try:
+            json_data, parser = _load_json(data)
+            return LoadedDocument(data=json_data, parser=parser)
+        except ValueError as err:
+            if is_json:
+                return GeneratorError(header=f"Invalid JSON from provided source: {err}")
+            # YAML flow mappings also start with "{", so this might still be valid YAML
+
+    yaml = YAML(typ="safe")
+    try:
+        yaml_data = yaml.load(data)
+    except YAMLError as err:
+        return GeneratorError(header=f"Invalid YAML from provided source: {err}")
+    return LoadedDocument(data=yaml_data, parser=_yaml_parser_name(yaml))
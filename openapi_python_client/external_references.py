@@ -0,0 +1,265 @@
+"""Resolving `$ref`s to other files by copying what they refer to into the document being generated from.
+
+A reference like `common.yaml#/components/schemas/Money` becomes `#/components/schemas/Money`, with the `Money` schema
+from `common.yaml` added to the document's own `components`. Anything else that points to (including its own local
+references, which are relative to `common.yaml`) is copied the same way. What a reference points to is copied to the
+section of `components` for what the reference is in place of (e.g., `parameters` for a reference in an operation's
+`parameters`), named after the last part of the reference, whatever it is called in the other file. Path items can't be
+put in `components`, so what they refer to is copied in place instead.
+"""
+
+__all__ = ["has_external_references", "loaded_document_paths", "resolve_external_references"]
+
+import copy
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+from typing import Any, Optional, Union
+from urllib.parse import unquote, urlparse
+
+from attrs import define, field
+
+from .document import load_document
+from .parser.errors import GeneratorError
+
+# A `$ref` (in JSON or YAML) whose value doesn't start with `#`, so points to somewhere other than this document
+_EXTERNAL_REFERENCE = re.compile(rb"""\$ref["']?\s*:\s*["']?[^"'#\s]""")
+
+# Documents which have been loaded, by absolute path, with a hash of their content. Kept for the life of the process,
+# so generating again (e.g., when watching for changes) only reloads the files which changed.
+_loaded_documents: dict[Path, tuple[str, Any]] = {}
+
+
+def has_external_references(document: bytes) -> bool:
+    """Whether `document` might refer to other files, without parsing it"""
+    return _EXTERNAL_REFERENCE.search(document) is not None
+
+
+def loaded_document_paths() -> set[Path]:
+    """The paths of every document which has been loaded to resolve references so far"""
+    return set(_loaded_documents)
+
+
+def _load(path: Path) -> Union[Any, GeneratorError]:
+    try:
+        content = path.read_bytes()
+    except OSError as err:
+        return GeneratorError(header=f"Could not read referenced document {path}", detail=str(err))
+    digest = hashlib.sha256(content).hexdigest()
+    cached = _loaded_documents.get(path)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+    loaded = load_document(content, mimetypes.guess_type(path.as_uri(), strict=True)[0])
+    if isinstance(loaded, GeneratorError):
+        loaded.detail = f"In referenced document {path}"
+        return loaded
+    _loaded_documents[path] = (digest, loaded.data)
+    return loaded.data
+
+
+def _resolve_pointer(document: Any, pointer: str) -> Any:
+    """Get what a JSON pointer (like `/components/schemas/Money`) points to, or None if there isn't anything"""
+    target = document
+    for part in pointer.split("/")[1:] if pointer else []:
+        part = part.replace("~1", "/").replace("~0", "~")  # noqa: PLW2901
+        if isinstance(target, dict):
+            target = target.get(part)
+        elif isinstance(target, list) and part.isdigit() and int(part) < len(target):
+            target = target[int(part)]
+        else:
+            return None
+    return target
+
+
+# What each field of an object holds, by the kind of object: ("one" | "map" | "list", the kind of object(s) in it)
+_FIELDS: dict[str, dict[str, tuple[str, str]]] = {
+    "document": {"paths": ("map", "path_item"), "components": ("one", "components")},
+    "components": {
+        "schemas": ("map", "schema"),
+        "responses": ("map", "response"),
+        "parameters": ("map", "parameter"),
+        "requestBodies": ("map", "request_body"),
+        "headers": ("map", "header"),
+    },
+    "path_item": {
+        **{
+            method: ("one", "operation")
+            for method in ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+        },
+        "parameters": ("list", "parameter"),
+    },
+    "operation": {
+        "parameters": ("list", "parameter"),
+        "requestBody": ("one", "request_body"),
+        "responses": ("map", "response"),
+    },
+    "request_body": {"content": ("map", "media_type")},
+    "response": {"content": ("map", "media_type"), "headers": ("map", "header")},
+    "parameter": {"schema": ("one", "schema"), "content": ("map", "media_type")},
+    "header": {"schema": ("one", "schema"), "content": ("map", "media_type")},
+    "media_type": {"schema": ("one", "schema")},
+}
+# The section of `components` which each kind of object is copied to
+_SECTIONS = {
+    "schema": "schemas",
+    "response": "responses",
+    "parameter": "parameters",
+    "request_body": "requestBodies",
+    "header": "headers",
+}
+_KINDS = {section: kind for kind, section in _SECTIONS.items()}
+
+
+def _children(node: Any, kind: Optional[str]) -> list[tuple[Any, Optional[str]]]:
+    """Everything directly in `node` (an object of `kind`, or None if unknown) with the kind of object each one is"""
+    if isinstance(node, list):
+        return [(item, kind) for item in node]
+    if kind == "schema":
+        return [(value, kind) for value in node.values()]  # Everything within a schema is another schema
+    fields = _FIELDS.get(kind or "", {})
+    children: list[tuple[Any, Optional[str]]] = []
+    for key, value in node.items():
+        holds, child_kind = fields.get(key, ("one", None))
+        if holds == "map" and isinstance(value, dict):
+            children.extend((item, child_kind) for item in value.values())
+        else:
+            children.append((value, child_kind))
+    return children
+
+
+@define
+class _Resolver:
+    document: dict[str, Any]
+    # The local reference which each (file, pointer, section) was copied to
+    copied: dict[tuple[Path, str, str], str] = field(factory=dict)
+    # The path items being copied in place right now, so one which refers to itself can't be copied forever
+    inlining: set[tuple[Path, str]] = field(factory=set)
+
+    def resolve(self, node: Any, path: Optional[Path], base_dir: Path, kind: Optional[str]) -> Optional[GeneratorError]:
+        """Replace every reference to another file in `node` (an object of `kind`, from the file at `path`, or the
+        document being generated from if None) with a local reference.
+        """
+        stack: list[tuple[Any, Optional[str]]] = [(node, kind)]
+        while stack:
+            current, current_kind = stack.pop()
+            if not isinstance(current, (dict, list)):
+                continue
+            ref = current.get("$ref") if isinstance(current, dict) else None
+            target = self._target(ref, path, base_dir) if isinstance(ref, str) else None
+            if isinstance(current, dict) and isinstance(ref, str) and target is not None:
+                error = self._replace(current, ref, target, current_kind, stack)
+                if error is not None:
+                    return error
+                continue
+            stack.extend(_children(current, current_kind))
+        return None
+
+    @staticmethod
+    def _target(ref: str, path: Optional[Path], base_dir: Path) -> Optional[tuple[Path, str]]:
+        """The file and JSON pointer `ref` points to, or None if it's left as it is"""
+        parsed = urlparse(ref)
+        if parsed.scheme or parsed.netloc:
+            return None  # Remote references aren't supported, the parser reports them
+        if parsed.path:
+            return (base_dir / unquote(parsed.path)).resolve(), unquote(parsed.fragment)
+        if path is not None:
+            return path, unquote(parsed.fragment)  # A local reference within another file
+        return None
+
+    def _replace(
+        self,
+        node: dict[str, Any],
+        ref: str,
+        target: tuple[Path, str],
+        kind: Optional[str],
+        stack: list[tuple[Any, Optional[str]]],
+    ) -> Optional[GeneratorError]:
+        """Replace the reference `ref` in `node` (an object of `kind`) with a local one, adding what else in `node`
+        still needs resolving to `stack`
+        """
+        if kind == "path_item":
+            # Path items can't be put in `components`, so what they refer to is copied in place instead
+            del node["$ref"]
+            stack.extend(_children(node, kind))
+            inlined = self._inline(ref, target)
+            if isinstance(inlined, GeneratorError):
+                return inlined
+            for key, value in inlined.items():
+                node.setdefault(key, value)
+            return None
+        file, pointer = target
+        parts = pointer.split("/")
+        if kind is None and len(parts) == 4 and parts[1] == "components" and parts[2] in _KINDS:
+            kind = _KINDS[parts[2]]  # Somewhere else which refers directly to a component of a known kind
+        if kind not in _SECTIONS:
+            return GeneratorError(
+                header=f"Could not resolve reference {ref}",
+                detail="References to other files are only supported in place of path items, parameters, request "
+                "bodies, responses, headers, and schemas",
+            )
+        section = _SECTIONS[kind]
+        local_ref = self.copied.get((file, pointer, section))
+        if local_ref is None:
+            copied = self._copy(ref, file, pointer, kind)
+            if isinstance(copied, GeneratorError):
+                return copied
+            local_ref = copied
+        node["$ref"] = local_ref
+        return None
+
+    def _referenced(self, ref: str, file: Path, pointer: str) -> Union[dict[str, Any], GeneratorError]:
+        """A copy of what `pointer` points to in `file`"""
+        referenced_document = _load(file)
+        if isinstance(referenced_document, GeneratorError):
+            return referenced_document
+        referenced = _resolve_pointer(referenced_document, pointer)
+        if not isinstance(referenced, dict):
+            return GeneratorError(header=f"Could not resolve reference {ref}", detail=f"Nothing found at {file}")
+        # Loaded documents are shared, so only change a copy
+        return copy.deepcopy(referenced)
+
+    def _inline(self, ref: str, target: tuple[Path, str]) -> Union[dict[str, Any], GeneratorError]:
+        """The path item `target` points to, with its own references resolved"""
+        if target in self.inlining:
+            return GeneratorError(header=f"Could not resolve reference {ref}", detail="The path item refers to itself")
+        file, pointer = target
+        path_item = self._referenced(ref, file, pointer)
+        if isinstance(path_item, GeneratorError):
+            return path_item
+        self.inlining.add(target)
+        error = self.resolve(path_item, file, file.parent, "path_item")
+        self.inlining.discard(target)
+        return path_item if error is None else error
+
+    def _copy(self, ref: str, file: Path, pointer: str, kind: str) -> Union[str, GeneratorError]:
+        """Copy what `pointer` points to in `file` (an object of `kind`) into the document, returning a reference to it"""
+        referenced = self._referenced(ref, file, pointer)
+        if isinstance(referenced, GeneratorError):
+            return referenced
+
+        section = _SECTIONS[kind]
+        parts = pointer.split("/")
+        name = parts[-1].replace("~1", "/").replace("~0", "~") or file.stem
+        components = self.document.setdefault("components", {}).setdefault(section, {})
+        unique_name = name
+        suffix = 2
+        while unique_name in components:
+            unique_name = f"{name}{suffix}"
+            suffix += 1
+        local_ref = f"#/components/{section}/{unique_name.replace('~', '~0').replace('/', '~1')}"
+        # Recorded before resolving the copy's own references, which might lead back to it
+        self.copied[(file, pointer, section)] = local_ref
+        components[unique_name] = referenced
+        error = self.resolve(referenced, file, file.parent, kind)
+        if error is not None:
+            return error
+        return local_ref
+
+
+def resolve_external_references(document: dict[str, Any], path: Path) -> Optional[GeneratorError]:
+    """Replace references to other files in `document` (loaded from `path`) with references to copies of what they
+    point to, which are added to its `components`. Each referenced file is only loaded once, and only if it is used.
+    """
+    path = path.resolve()
+    return _Resolver(document=document).resolve(document, None, path.parent, "document")
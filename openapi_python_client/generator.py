@@ -0,0 +1,830 @@
+"""Generating a client project from an OpenAPI document"""
+
+import hashlib
+import json
+import mimetypes
+import multiprocessing
+import shutil
+import subprocess
+import uuid
+from collections import ChainMap
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from subprocess import CalledProcessError
+from typing import Any, Optional, Union
+
+from attrs import evolve
+from jinja2 import BaseLoader, ChoiceLoader, Environment, FileSystemLoader, PackageLoader, Template
+
+from . import __version__, utils
+from .cache import (
+    RenderCache,
+    fingerprint,
+    generator_data_cache_key,
+    load_generator_data,
+    store_generator_data,
+    template_bytecode_cache,
+)
+from .config import Config, MetaType
+from .document import load_document
+from .external_references import has_external_references, resolve_external_references
+from .parser import GeneratorData, import_string_from_class
+from .parser.errors import ErrorLevel, GeneratorError
+from .parser.properties import LiteralEnumProperty
+from .profiling import annotate, span
+from .tidy import tidy_python
+
+TEMPLATE_FILTERS = {
+    "snakecase": utils.snake_case,
+    "kebabcase": utils.kebab_case,
+    "pascalcase": utils.pascal_case,
+    "any": any,
+}
+
+# A template to render, the context to render it with, and where to write the result
+_Render = tuple[Path, Template, dict[str, Any]]
+
+# How much rendered content to hold in memory before writing it out
+WRITE_BATCH_SIZE = 8 * 1024 * 1024
+
+
+class Project:
+    """Represents a Python project (the top level file-tree) to generate"""
+
+    def __init__(
+        self,
+        *,
+        openapi: GeneratorData,
+        config: Config,
+        custom_template_path: Optional[Path] = None,
+        render_cache: Optional[RenderCache] = None,
+        env: Optional[Environment] = None,
+    ) -> None:
+        self.openapi: GeneratorData = openapi
+        self.config = config
+        # Files rendered by earlier builds with the same config and templates, to reuse if their inputs didn't change
+        self.render_cache = render_cache
+        if render_cache is not None and render_cache.env is not None:
+            self.env: Environment = render_cache.env
+        elif env is not None:
+            # Shared with other projects using the same templates, so each template is only compiled once
+            self.env = env
+        else:
+            self.env = self._create_environment(custom_template_path)
+        if render_cache is not None:
+            render_cache.env = self.env
+
+        self.project_name: str = config.project_name_override or f"{utils.kebab_case(openapi.title).lower()}-client"
+        self.package_name: str = config.package_name_override or self.project_name.replace("-", "_")
+        self.project_dir: Path  # Where the generated code will be placed
+        self.package_dir: Path  # Where the generated Python module will be placed (same as project_dir if no meta)
+
+        if config.output_path is not None:
+            self.project_dir = config.output_path
+        elif config.meta_type == MetaType.NONE:
+            self.project_dir = Path.cwd() / self.package_name
+        else:
+            self.project_dir = Path.cwd() / self.project_name
+
+        if config.meta_type == MetaType.NONE:
+            self.package_dir = self.project_dir
+        else:
+            self.package_dir = self.project_dir / self.package_name
+
+        self.package_description: str = utils.remove_string_escapes(
+            f"A client library for accessing {self.openapi.title}"
+        )
+        self.version: str = config.package_version_override or openapi.version
+
+        self.env.filters.update(TEMPLATE_FILTERS)
+        self.env.globals.update(
+            config=config,
+            utils=utils,
+            python_identifier=lambda x: utils.PythonIdentifier(x, config.field_prefix),
+            class_name=lambda x: utils.ClassName(x, config.field_prefix),
+            package_name=self.package_name,
+            package_dir=self.package_dir,
+            package_description=self.package_description,
+            package_version=self.version,
+            project_name=self.project_name,
+            project_dir=self.project_dir,
+            openapi=self.openapi,
+            endpoint_collections_by_tag=self.openapi.endpoint_collections_by_tag,
+        )
+        self.errors: list[GeneratorError] = []
+        # Content hashes of files from the last incremental run, None unless updating an incremental build in place
+        self._previous_manifest: Optional[dict[str, _ManifestEntry]] = None
+        # Content hashes of every file rendered during this run, keyed by path relative to project_dir
+        self._rendered_hashes: dict[str, str] = {}
+        # Hashes of the files which were already up to date on disk, so didn't need to be written
+        self._unchanged_on_disk: dict[str, str] = {}
+        # A directory next to project_dir which files are written to while building, then replaces project_dir
+        self._staging_dir: Optional[Path] = None
+        # Files waiting to be written together, None when files are written immediately (when not building, or in low
+        # memory mode)
+        self._pending_writes: Optional[list[tuple[Path, str]]] = None
+        self._pending_size = 0
+        # Directories which are known to exist, so they aren't created again for every file
+        self._created_dirs: set[Path] = set()
+        # Fingerprints of everything rendered so far, to look renders up in `render_cache`
+        self._fingerprints: dict[int, tuple[Any, bytes]] = {}
+        self._template_inputs: dict[str, Optional[tuple[bytes, frozenset[str]]]] = {}
+
+    def _create_environment(self, custom_template_path: Optional[Path]) -> Environment:
+        package_loader = PackageLoader(__package__)
+        loader: BaseLoader
+        if custom_template_path is not None:
+            loader = ChoiceLoader(
+                [
+                    FileSystemLoader(str(custom_template_path)),
+                    package_loader,
+                ]
+            )
+        else:
+            loader = package_loader
+        return Environment(
+            loader=loader,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            extensions=["jinja2.ext.loopcontrols"],
+            keep_trailing_newline=True,
+            bytecode_cache=(
+                template_bytecode_cache(self.config.cache_dir, __version__) if self.config.cache_dir else None
+            ),
+        )
+
+    def build(self) -> Sequence[GeneratorError]:
+        """Create the project from templates.
+
+        Unless an incremental build is being updated in place, the project is built (and post hooks are run) in a
+        staging directory next to `project_dir`, which then replaces it. So a failed or interrupted run leaves the
+        previous client untouched, and nothing else ever sees a partially written one. Once post hooks have succeeded,
+        files in `project_dir` which aren't generated (outside of the `models` and `api` packages) are moved over to
+        the new project.
+        """
+
+        print(f"Generating {self.project_dir}")
+        for name, merged in self.openapi.merged_classes.items():
+            print(f"Using {name} for identical inline schemas instead of: {', '.join(merged)}")
+        if self.render_cache is not None:
+            self.render_cache.rendered = self.render_cache.reused = 0
+        if self.project_dir.exists() and not self.config.overwrite:
+            return [GeneratorError(detail="Directory already exists. Delete it or use the --overwrite option.")]
+        if self.config.incremental:
+            self._previous_manifest = _load_manifest(self.project_dir / MANIFEST_FILE_NAME)
+        # The working directory can't be swapped out from under this process
+        if self._previous_manifest is None and not _is_relative_to(Path.cwd(), self.project_dir):
+            self._staging_dir = _create_staging_dir(self.project_dir)
+        else:
+            self.project_dir.mkdir(exist_ok=True)
+        # In low memory mode, files are written as soon as they're rendered instead of in batches
+        self._pending_writes = None if self.config.low_memory else []
+        # Files moved from project_dir to the staging directory, which must be moved back if the swap fails
+        moved: list[tuple[Path, Path]] = []
+        try:
+            self._build_files()
+            if self._staging_dir is not None:
+                with span("post hooks"):
+                    self._run_post_hooks()
+                with span("swap"):
+                    _swap_dirs(self._staging_dir, self.project_dir, self._generated_dirs(), moved)
+            else:
+                self._remove_orphaned_files()
+                with span("post hooks"):
+                    self._run_post_hooks()
+        finally:
+            self._pending_writes = None
+            self._remove_staging_dir(moved)
+        if self.config.incremental:
+            self._save_manifest()
+        return self._get_errors()
+
+    def _remove_staging_dir(self, moved: list[tuple[Path, Path]]) -> None:
+        """Delete the staging directory, which is only still there if something went wrong, unless it has files from
+        `project_dir` which couldn't be moved back
+        """
+        if self._staging_dir is None:
+            return
+        if moved:
+            print(f"Could not move some files back to {self.project_dir}, they are in {self._staging_dir}")
+        else:
+            shutil.rmtree(self._staging_dir, ignore_errors=True)
+        self._staging_dir = None
+
+    def _build_files(self) -> None:
+        self._clear_generated_dir(self.package_dir / "models")
+        self._clear_generated_dir(self.package_dir / "api")
+        for name, renders in self._renders():
+            with span(name):
+                self._render_and_write(renders)
+        self._flush_writes()
+
+    def iter_files(self) -> Iterator[tuple[PurePosixPath, bytes]]:
+        """Render the project without writing anything, yielding each file's path (relative to `project_dir`) and
+        content (encoded with `config.file_encoding`) as soon as it's rendered.
+
+        Files are produced in the same order, and with the same content, as `build` would write them before running
+        post hooks, which aren't run. In fast mode, Python files are tidied the same way too.
+        """
+        for name, renders in self._renders():
+            with span(name):
+                for path, content in self._render_all(renders):
+                    yield (
+                        PurePosixPath(path.relative_to(self.project_dir).as_posix()),
+                        content.encode(self.config.file_encoding),
+                    )
+
+    def _generated_dirs(self) -> set[Path]:
+        """Directories which only contain generated files, relative to `project_dir`"""
+        package = self.package_dir.relative_to(self.project_dir)
+        return {package / "models", package / "api"}
+
+    @property
+    def _output_dir(self) -> Path:
+        """Where the project is currently being written to"""
+        return self._staging_dir or self.project_dir
+
+    def _write_file(self, path: Path, content: str, *, tidied: bool = False) -> None:
+        """Write `content` to `path`, skipping the write in incremental mode if the file is already up to date.
+
+        In fast mode, Python code is tidied first unless that was already done (`tidied`).
+        """
+        if self.config.fast and not tidied:
+            with span("tidy", "tidy", path=str(path)):
+                content = _tidy_rendered(path, content)
+        with span("write", "write", path=str(path)):
+            self._write_file_if_changed(path, content)
+
+    def _write_file_if_changed(self, path: Path, content: str) -> None:
+        if not self.config.incremental:
+            self._queue_write(path, content)
+            return
+
+        key = path.relative_to(self.project_dir).as_posix()
+        rendered_hash = _hash_content(content.encode(self.config.file_encoding))
+        self._rendered_hashes[key] = rendered_hash
+        previous = (self._previous_manifest or {}).get(key)
+        if (
+            previous is not None
+            and previous.rendered == rendered_hash
+            and path.is_file()
+            and _hash_content(path.read_bytes()) == previous.on_disk
+        ):
+            self._unchanged_on_disk[key] = previous.on_disk
+            return
+        self._queue_write(path, content)
+
+    def _queue_write(self, path: Path, content: str) -> None:
+        """Write `content` to `path` (in the staging directory, if there is one) with the next batch of files"""
+        if self._staging_dir is not None:
+            path = self._staging_dir / path.relative_to(self.project_dir)
+        if self._pending_writes is None:
+            self._write_batch([(path, content)])
+            return
+        self._pending_writes.append((path, content))
+        self._pending_size += len(content)
+        if self._pending_size >= WRITE_BATCH_SIZE:
+            self._flush_writes()
+
+    def _flush_writes(self) -> None:
+        if not self._pending_writes:
+            return
+        batch, self._pending_writes, self._pending_size = self._pending_writes, [], 0
+        with span("write batch", "write", files=len(batch)):
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: list[tuple[Path, str]]) -> None:
+        """Write files, creating any directories they need first. With more than one job, the files are written
+        concurrently, which hides the latency of each write on network filesystems.
+        """
+        for directory in sorted({path.parent for path, _ in batch} - self._created_dirs):
+            directory.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(directory)
+
+        def write(item: tuple[Path, str]) -> None:
+            item[0].write_text(item[1], encoding=self.config.file_encoding)
+
+        if self.config.jobs > 1 and len(batch) > 1:
+            with ThreadPoolExecutor(max_workers=self.config.jobs) as thread_pool:
+                list(thread_pool.map(write, batch))
+        else:
+            for item in batch:
+                write(item)
+
+    def _remove_orphaned_files(self) -> None:
+        """Delete files generated by the previous incremental run which were not generated this time"""
+        if self._previous_manifest is None:
+            return
+        for key in self._previous_manifest.keys() - self._rendered_hashes.keys():
+            path = self.project_dir / key
+            path.unlink(missing_ok=True)
+            # Clean up directories (like an `api` tag) which no longer contain anything
+            for parent in path.parents:
+                if parent == self.project_dir or not parent.is_dir() or any(parent.iterdir()):
+                    break
+                parent.rmdir()
+
+    def _save_manifest(self) -> None:
+        """Record the hashes of every generated file, both as rendered and as left on disk by post hooks"""
+        manifest: dict[str, _ManifestEntry] = {}
+        for key, rendered_hash in sorted(self._rendered_hashes.items()):
+            if key in self._unchanged_on_disk and not self.config.post_hooks:
+                manifest[key] = _ManifestEntry(rendered=rendered_hash, on_disk=self._unchanged_on_disk[key])
+                continue
+            path = self.project_dir / key
+            if path.is_file():
+                manifest[key] = _ManifestEntry(rendered=rendered_hash, on_disk=_hash_content(path.read_bytes()))
+        _dump_manifest(self.project_dir / MANIFEST_FILE_NAME, manifest)
+
+    def _run_post_hooks(self) -> None:
+        for command in self.config.post_hooks:
+            with span(command, "post_hook"):
+                self._run_command(command)
+
+    def _run_command(self, cmd: str) -> None:
+        cmd_name = cmd.split(" ")[0]
+        command_exists = shutil.which(cmd_name)
+        if not command_exists:
+            self.errors.append(
+                GeneratorError(
+                    level=ErrorLevel.WARNING, header="Skipping Integration", detail=f"{cmd_name} is not in PATH"
+                )
+            )
+            return
+        try:
+            cwd = self._output_dir
+            subprocess.run(cmd, cwd=cwd, shell=True, capture_output=True, check=True)
+        except CalledProcessError as err:
+            self.errors.append(
+                GeneratorError(
+                    level=ErrorLevel.ERROR,
+                    header=f"{cmd_name} failed",
+                    detail=err.stderr.decode() or err.output.decode(),
+                )
+            )
+
+    def _get_errors(self) -> list[GeneratorError]:
+        errors: list[GeneratorError] = []
+        for collection in self.openapi.endpoint_collections_by_tag.values():
+            errors.extend(collection.parse_errors)
+        errors.extend(self.openapi.errors)
+        errors.extend(self.errors)
+        return errors
+
+    def _renders(self) -> Iterator[tuple[str, list[_Render]]]:
+        """Every file in the project, in groups to render together, each named for profiling"""
+        yield "create package", self._package_renders()
+        yield "build models", self._model_renders()
+        yield "build api", self._api_renders()
+
+    def _package_renders(self) -> list[_Render]:
+        renders: list[_Render] = [
+            (self.package_dir / "__init__.py", self.env.get_template("package_init.py.jinja"), {})
+        ]
+        if self.config.meta_type != MetaType.NONE:
+            renders.append((self.package_dir / "py.typed", self.env.from_string("# Marker file for PEP 561"), {}))
+        renders.append((self.package_dir / "types.py", self.env.get_template("types.py.jinja"), {}))
+        if self.config.meta_type == MetaType.NONE:
+            return renders
+
+        pyproject_template = self.env.get_template("pyproject.toml.jinja")
+        renders.append((self.project_dir / "pyproject.toml", pyproject_template, {"meta": self.config.meta_type}))
+        if self.config.meta_type == MetaType.SETUP:
+            renders.append((self.project_dir / "setup.py", self.env.get_template("setup.py.jinja"), {}))
+        readme_template = self.env.get_template("README.md.jinja")
+        renders.append(
+            (self.project_dir / "README.md", readme_template, {"poetry": self.config.meta_type == MetaType.POETRY})
+        )
+        renders.append((self.project_dir / ".gitignore", self.env.get_template(".gitignore.jinja"), {}))
+        return renders
+
+    def _model_renders(self) -> list[_Render]:
+        models_dir = self.package_dir / "models"
+        imports = []
+        alls = []
+        renders: list[_Render] = []
+
+        model_template = self.env.get_template("model.py.jinja")
+        for model in self.openapi.models:
+            module_path = models_dir / f"{model.class_info.module_name}.py"
+            renders.append((module_path, model_template, {"model": model}))
+            imports.append(import_string_from_class(model.class_info))
+            alls.append(model.class_info.name)
+
+        str_enum_template = self.env.get_template("str_enum.py.jinja")
+        int_enum_template = self.env.get_template("int_enum.py.jinja")
+        literal_enum_template = self.env.get_template("literal_enum.py.jinja")
+        for enum in self.openapi.enums:
+            module_path = models_dir / f"{enum.class_info.module_name}.py"
+            if isinstance(enum, LiteralEnumProperty):
+                renders.append((module_path, literal_enum_template, {"enum": enum}))
+            elif enum.value_type is int:
+                renders.append((module_path, int_enum_template, {"enum": enum}))
+            else:
+                renders.append((module_path, str_enum_template, {"enum": enum}))
+            imports.append(import_string_from_class(enum.class_info))
+            alls.append(enum.class_info.name)
+
+        models_init_template = self.env.get_template("models_init.py.jinja")
+        renders.append((models_dir / "__init__.py", models_init_template, {"imports": imports, "alls": alls}))
+        return renders
+
+    def _clear_generated_dir(self, path: Path) -> None:
+        """Delete the previous contents of a directory of generated files when building in place from scratch"""
+        if self._staging_dir is None and self._previous_manifest is None:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _api_renders(self) -> list[_Render]:
+        api_dir = self.package_dir / "api"
+        renders: list[_Render] = [
+            (self.package_dir / "client.py", self.env.get_template("client.py.jinja"), {}),
+            (self.package_dir / "errors.py", self.env.get_template("errors.py.jinja"), {}),
+            (api_dir / "__init__.py", self.env.get_template("api_init.py.jinja"), {}),
+        ]
+
+        endpoint_template = self.env.get_template(
+            "endpoint_module.py.jinja", globals={"isbool": lambda obj: obj.get_base_type_string() == "bool"}
+        )
+        endpoint_init_template = self.env.get_template("endpoint_init.py.jinja")
+        for tag, collection in self.openapi.endpoint_collections_by_tag.items():
+            tag_dir = api_dir / tag
+            renders.append((tag_dir / "__init__.py", endpoint_init_template, {"endpoint_collection": collection}))
+
+            for endpoint in collection.endpoints:
+                module_path = tag_dir / f"{utils.PythonIdentifier(endpoint.name, self.config.field_prefix)}.py"
+                renders.append((module_path, endpoint_template, {"endpoint": endpoint}))
+        return renders
+
+    def _render_and_write(self, renders: list[_Render]) -> None:
+        """Render every template in `renders` and write the results, in order, to their paths.
+
+        Each file is written (or, outside of low memory mode, queued to be written) as soon as it's rendered.
+        """
+        with span("render and write", "render", templates=len(renders), jobs=self.config.jobs):
+            for path, content in self._render_all(renders):
+                self._write_file(path, content, tidied=True)
+
+    def _render_all(self, renders: list[_Render]) -> Iterator[tuple[Path, str]]:
+        """Render every template in `renders`, yielding each path with its content in order.
+
+        When `config.jobs` is greater than 1, rendering (and tidying, in fast mode) is spread across a pool of workers.
+        Results are still yielded in the order given, so the output is identical to a serial run. With a
+        `render_cache`, files whose template and context are the same as last time aren't rendered again.
+        """
+        keys: list[Optional[bytes]] = [None] * len(renders)
+        contents: list[Optional[str]] = [None] * len(renders)
+        if self.render_cache is not None:
+            with span("look up renders", "render", templates=len(renders)):
+                for index, (path, template, context) in enumerate(renders):
+                    keys[index] = key = self._render_key(template, context)
+                    if key is not None:
+                        contents[index] = self.render_cache.get(path, key)
+        missing = [index for index, content in enumerate(contents) if content is None]
+
+        rendered: Iterator[str]
+        if self.config.jobs > 1 and len(missing) > 1:
+            rendered = _render_in_pool(
+                [renders[index] for index in missing], jobs=self.config.jobs, tidy=self.config.fast
+            )
+        else:
+            rendered = (self._render_template(renders[index]) for index in missing)
+        for (path, _, _), key, cached in zip(renders, keys, contents):
+            content = next(rendered) if cached is None else cached
+            if self.render_cache is not None and key is not None:
+                self.render_cache.store(path, key, content)
+            yield path, content
+
+    def _render_template(self, render: _Render) -> str:
+        path, template, context = render
+        with span(template.name or "render", "render", path=str(path)):
+            output = template.render(**context)
+        if self.config.fast:
+            with span("tidy", "tidy", path=str(path)):
+                output = _tidy_rendered(path, output)
+        return output
+
+    def _render_key(self, template: Template, context: dict[str, Any]) -> Optional[bytes]:
+        """Identify everything rendering `template` with `context` depends on, or None if that can't be worked out"""
+        if self.render_cache is None or template.name is None:
+            return None
+        if template.name not in self._template_inputs:
+            self._template_inputs[template.name] = self.render_cache.template_inputs(self.env, template.name)
+        inputs = self._template_inputs[template.name]
+        if inputs is None:
+            return None
+        sources, variables = inputs
+        used_globals = {name: self.env.globals[name] for name in sorted(variables) if name in self.env.globals}
+        # Globals passed to `get_template` for this template only, the rest are the environment's
+        template_globals = template.globals.maps[0] if isinstance(template.globals, ChainMap) else {}
+        # Config is always included, since functions like `python_identifier` depend on it without taking it
+        digests = [
+            fingerprint(value, self._fingerprints) for value in (self.config, used_globals, template_globals, context)
+        ]
+        if any(digest is None for digest in digests):
+            return None
+        return hashlib.sha256(b"".join([sources, *filter(None, digests)])).digest()
+
+
+MANIFEST_FILE_NAME = ".openapi-python-client-manifest.json"
+
+
+@dataclass(frozen=True)
+class _ManifestEntry:
+    """The hashes of a single generated file in the incremental manifest"""
+
+    rendered: str  # The content produced by the templates
+    on_disk: str  # The content after post hooks (e.g., formatters) ran
+
+
+def _hash_content(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _load_manifest(path: Path) -> Optional[dict[str, _ManifestEntry]]:
+    """Read a manifest written by a previous incremental run, returning None if there isn't a usable one"""
+    try:
+        data = json.loads(path.read_text())
+        return {key: _ManifestEntry(**entry) for key, entry in data["files"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _dump_manifest(path: Path, manifest: dict[str, _ManifestEntry]) -> None:
+    files = {key: {"rendered": entry.rendered, "on_disk": entry.on_disk} for key, entry in manifest.items()}
+    content = json.dumps({"files": files}, indent=2) + "\n"
+    if path.is_file() and path.read_text() == content:
+        return  # Don't touch the manifest's mtime either if nothing changed
+    path.write_text(content)
+
+
+def _is_relative_to(path: Path, other: Path) -> bool:
+    try:
+        path.resolve().relative_to(other.resolve())
+    except ValueError:
+        return False
+    return True
+
+
+def _create_staging_dir(project_dir: Path) -> Path:
+    """Create an empty directory next to `project_dir`, so it's on the same filesystem and can be renamed to it"""
+    staging_dir = project_dir.with_name(f".{project_dir.name}.{uuid.uuid4().hex[:8]}.tmp")
+    staging_dir.mkdir()
+    return staging_dir
+
+
+def _move_untouched_files(
+    old_dir: Path, new_dir: Path, generated_dirs: set[Path], moved: list[tuple[Path, Path]], relative: Path = Path()
+) -> None:
+    """Move everything in `old_dir` which wasn't generated again into `new_dir`, apart from `generated_dirs`, adding
+    each move to `moved`
+    """
+    for old_path in old_dir.iterdir():
+        if relative / old_path.name in generated_dirs:
+            continue
+        new_path = new_dir / old_path.name
+        if not new_path.exists() and not new_path.is_symlink():
+            old_path.rename(new_path)
+            moved.append((old_path, new_path))
+        elif old_path.is_dir() and not old_path.is_symlink() and new_path.is_dir():
+            _move_untouched_files(old_path, new_path, generated_dirs, moved, relative / old_path.name)
+
+
+def _move_back(moved: list[tuple[Path, Path]]) -> None:
+    """Undo the moves in `moved`, leaving only those which couldn't be undone"""
+    for old_path, new_path in reversed(list(moved)):
+        try:
+            new_path.rename(old_path)
+        except OSError:
+            continue
+        moved.remove((old_path, new_path))
+
+
+def _swap_dirs(staging_dir: Path, project_dir: Path, generated_dirs: set[Path], moved: list[tuple[Path, Path]]) -> None:
+    """Replace `project_dir` with `staging_dir`, keeping the files in `project_dir` which weren't generated.
+
+    Those files are moved into `staging_dir` (recorded in `moved`), then `project_dir` is renamed out of the way and
+    `staging_dir` renamed to it. So `project_dir` is briefly missing, but never partially written. If anything fails
+    before `staging_dir` is in place, `project_dir` is put back as it was.
+    """
+    if not project_dir.exists():
+        staging_dir.rename(project_dir)
+        return
+    old_dir = staging_dir.with_name(f"{staging_dir.name}.old")
+    try:
+        if project_dir.is_dir():
+            _move_untouched_files(project_dir, staging_dir, generated_dirs, moved)
+        project_dir.rename(old_dir)
+        try:
+            staging_dir.rename(project_dir)
+        except BaseException:
+            if not project_dir.exists():
+                old_dir.rename(project_dir)
+            raise
+    except BaseException:
+        if staging_dir.exists():
+            _move_back(moved)
+        raise
+    moved.clear()
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _tidy_rendered(path: Path, content: str) -> str:
+    """Tidy `content` if it's going to be a Python file"""
+    if path.suffix != ".py":
+        return content
+    # Package `__init__.py` files import names only to re-export them
+    return tidy_python(content, remove_unused_imports=path.name != "__init__.py")
+
+
+def _render(render: _Render, *, tidy: bool) -> str:
+    path, template, context = render
+    content = template.render(**context)
+    return _tidy_rendered(path, content) if tidy else content
+
+
+_forked_renders: list[_Render] = []
+_forked_tidy = False
+
+
+def _render_forked(index: int) -> str:
+    """Render one entry of `_forked_renders`, which worker processes inherit from their parent when forked."""
+    return _render(_forked_renders[index], tidy=_forked_tidy)
+
+
+def _render_in_pool(renders: list[_Render], *, jobs: int, tidy: bool = False) -> Iterator[str]:
+    """Render `renders` with up to `jobs` workers, yielding the results in the same order.
+
+    If `tidy`, Python files are also tidied by the workers. Templates, models, and endpoints can't be pickled, so
+    worker processes are forked and inherit them. Platforms without `fork` fall back to a pool of threads.
+    """
+    global _forked_renders, _forked_tidy
+
+    if "fork" not in multiprocessing.get_all_start_methods():  # pragma: no cover
+        with ThreadPoolExecutor(max_workers=jobs) as thread_pool:
+            yield from thread_pool.map(lambda render: _render(render, tidy=tidy), renders)
+            return
+
+    _forked_renders, _forked_tidy = renders, tidy
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("fork")) as process_pool:
+            chunksize = max(1, len(renders) // (jobs * 4))
+            yield from process_pool.map(_render_forked, range(len(renders)), chunksize=chunksize)
+    finally:
+        _forked_renders, _forked_tidy = [], False
+
+
+def _get_project_for_url_or_path(
+    config: Config,
+    custom_template_path: Optional[Path] = None,
+) -> Union[Project, GeneratorError]:
+    openapi = get_generator_data(config)
+    if isinstance(openapi, GeneratorError):
+        return openapi
+    return Project(
+        openapi=openapi,
+        custom_template_path=custom_template_path,
+        config=config,
+    )
+
+
+def get_generator_data(config: Config) -> Union[GeneratorData, GeneratorError]:
+    """Fetch and parse the document `config` points to"""
+    with span("fetch document"):
+        document = _get_document_bytes(source=config.document_source, timeout=config.http_timeout)
+    if isinstance(document, GeneratorError):
+        return document
+    return _get_generator_data(*document, config=config)
+
+
+def _get_generator_data(
+    document: bytes, content_type: Optional[str], *, config: Config
+) -> Union[GeneratorData, GeneratorError]:
+    """Parse the document, or reuse a previous parse of the same document and config from `config.cache_dir`"""
+    # Only references relative to a local document can be resolved
+    base_path = config.document_source if isinstance(config.document_source, Path) else None
+    external = base_path is not None and has_external_references(document)
+    cache_key = None
+    # The cache key only covers this document, so changes to the files it refers to would be missed
+    if config.cache_dir is not None and not external:
+        cache_key = generator_data_cache_key(document, config, __version__)
+        with span("load cached document"):
+            cached = load_generator_data(config.cache_dir, cache_key)
+        if cached is not None:
+            return cached
+
+    with span("load document", content_type=content_type):
+        loaded = load_document(document, content_type)
+        if isinstance(loaded, GeneratorError):
+            return loaded
+        annotate(parser=loaded.parser)
+    if external and base_path is not None:
+        with span("resolve external references"):
+            error = resolve_external_references(loaded.data, base_path)
+        if error is not None:
+            return error
+    openapi = GeneratorData.from_dict(loaded.data, config=config, release=True)
+    if config.cache_dir is not None and cache_key is not None and not isinstance(openapi, GeneratorError):
+        store_generator_data(config.cache_dir, cache_key, openapi)
+    return openapi
+
+
+def generate(
+    *,
+    config: Config,
+    custom_template_path: Optional[Path] = None,
+) -> Sequence[GeneratorError]:
+    """
+    Generate the client library
+
+    Returns:
+         A list containing any errors encountered when generating.
+    """
+    project = _get_project_for_url_or_path(
+        custom_template_path=custom_template_path,
+        config=config,
+    )
+    if isinstance(project, GeneratorError):
+        return [project]
+    errors = project.build()
+    # How well memoizing the string transformations worked (so far in this process), for `--profile`
+    annotate(string_caches={name: info._asdict() for name, info in utils.cache_info().items()})
+    return errors
+
+
+def stream_files(
+    *,
+    config: Config,
+    custom_template_path: Optional[Path] = None,
+) -> tuple[Iterator[tuple[PurePosixPath, bytes]], Sequence[GeneratorError]]:
+    """
+    Generate the client library in memory, without writing any files or running post hooks
+
+    Python files are tidied in-process (as in fast mode), since there are no post hooks to format them.
+
+    Returns:
+        An iterator of each file's path (relative to the project directory) and content, rendered as it is consumed,
+        and a list containing any errors encountered while parsing the document.
+    """
+    project = _get_project_for_url_or_path(
+        custom_template_path=custom_template_path,
+        config=evolve(config, fast=True),
+    )
+    if isinstance(project, GeneratorError):
+        return iter(()), [project]
+    return project.iter_files(), project._get_errors()
+
+
+def generate_files(
+    *,
+    config: Config,
+    custom_template_path: Optional[Path] = None,
+) -> tuple[dict[PurePosixPath, bytes], Sequence[GeneratorError]]:
+    """
+    Generate the client library in memory, like `stream_files`, rendering every file before returning
+
+    Returns:
+        The content of each file by its path (relative to the project directory), and a list containing any errors
+        encountered when generating.
+    """
+    files, errors = stream_files(config=config, custom_template_path=custom_template_path)
+    return dict(files), errors
+
+
+def _get_document_bytes(
+    *, source: Union[str, Path], timeout: int
+) -> Union[tuple[bytes, Optional[str]], GeneratorError]:
+    """Fetch the raw OpenAPI document and its content type (if known) from a URL or path"""
+    yaml_bytes: bytes
+    content_type: Optional[str]
+    if isinstance(source, str):
+        # Only imported when needed, since most runs use local files and httpx is slow to import
+        import httpcore
+        import httpx
+
+        try:
+            response = httpx.get(source, timeout=timeout)
+            yaml_bytes = response.content
+            if "content-type" in response.headers:
+                content_type = response.headers["content-type"].split(";")[0]
+            else:  # pragma: no cover
+                content_type = mimetypes.guess_type(source, strict=True)[0]
+
+        except (httpx.HTTPError, httpcore.NetworkError):
+            return GeneratorError(header="Could not get OpenAPI document from provided URL")
+    else:
+        yaml_bytes = source.read_bytes()
+        content_type = mimetypes.guess_type(source.absolute().as_uri(), strict=True)[0]
+
+    return yaml_bytes, content_type
+
+
+def _get_document(*, source: Union[str, Path], timeout: int) -> Union[dict[str, Any], GeneratorError]:
+    document = _get_document_bytes(source=source, timeout=timeout)
+    if isinstance(document, GeneratorError):
+        return document
+    loaded = load_document(*document)
+    if isinstance(loaded, GeneratorError):
+        return loaded
+    return loaded.data
@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class MetaType(str, Enum):
+    """The types of metadata supported for project generation."""
+
+    NONE = "none"
+    POETRY = "poetry"
+    SETUP = "setup"
+    PDM = "pdm"
@@ -59,6 +59,8 @@ def body_from_data(
     bodies: list[Union[Body, ParseError]] = []
     body_content = body.content
     prefix_type_names = len(body_content) > 1
+    # Which body was passed is told apart by its class, so each content type needs its own even if they're identical
+    body_config = attr.evolve(config, deduplicate_inline_schemas=False) if prefix_type_names else config
 
     for content_type, media_type in body_content.items():
         simplified_content_type = get_content_type(content_type, config)
@@ -104,7 +106,7 @@ def body_from_data(
             data=media_type_schema,
             schemas=schemas,
             parent_name=f"{endpoint_name}_{body_type}" if prefix_type_names else endpoint_name,
-            config=config,
+            config=body_config,
         )
         if isinstance(prop, ParseError):
             bodies.append(prop)
@@ -112,14 +114,8 @@ def body_from_data(
         if isinstance(prop, ModelProperty) and body_type == BodyType.FILES:
             # Regardless of if we just made this property or found it, it now needs the `to_multipart` method
             prop = attr.evolve(prop, is_multipart_body=True)
-            schemas = attr.evolve(
-                schemas,
-                classes_by_name={
-                    **schemas.classes_by_name,
-                    prop.class_info.name: prop,
-                },
-                models_to_process=[*schemas.models_to_process, prop],
-            )
+            schemas.set_class_by_name(prop.class_info.name, prop)
+            schemas.add_model_to_process(prop)
         bodies.append(
             Body(
                 content_type=content_type,
@@ -1,35 +1,45 @@
 import re
-from collections.abc import Iterator
-from copy import deepcopy
-from dataclasses import dataclass, field
+from collections.abc import Callable, Iterator, Mapping, MutableMapping
+from dataclasses import dataclass, field, replace
 from http import HTTPStatus
-from typing import Any, Optional, Protocol, Union
+from typing import Any, Generic, Optional, Protocol, TypeVar, Union
 
-from pydantic import ValidationError
+from attrs import evolve
+from pydantic import BaseModel, ValidationError
 
 from .. import schema as oai
 from .. import utils
 from ..config import Config
+from ..profiling import span
 from ..utils import PythonIdentifier
 from .bodies import Body, body_from_data
 from .errors import GeneratorError, ParseError, PropertyError
 from .properties import (
     Class,
     EnumProperty,
+    ListProperty,
     LiteralEnumProperty,
     ModelProperty,
     Parameters,
     Property,
     Schemas,
+    UnionProperty,
     build_parameters,
     build_schemas,
     property_from_data,
 )
-from .properties.schemas import parameter_from_reference
+from .properties.schemas import parameter_from_reference, parse_reference_path
 from .responses import Response, response_from_data
 
 _PATH_PARAM_REGEX = re.compile("{([a-zA-Z_-][a-zA-Z0-9_-]*)}")
 
+_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+_Part = TypeVar("_Part", bound=BaseModel)
+# What `data` is replaced with on models and responses in low memory mode, once parsing no longer needs it
+_RELEASED_SCHEMA = oai.Schema()
+_RELEASED_RESPONSE = oai.Response(description="")
+
 
 def import_string_from_class(class_: Class, prefix: str = "") -> str:
     """Create a string which is used to import a reference"""
@@ -47,7 +57,7 @@ class EndpointCollection:
     @staticmethod
     def from_data(
         *,
-        data: dict[str, oai.PathItem],
+        data: MutableMapping[str, oai.PathItem],
         schemas: Schemas,
         parameters: Parameters,
         request_bodies: dict[str, Union[oai.RequestBody, oai.Reference]],
@@ -57,13 +67,19 @@ class EndpointCollection:
         """Parse the openapi paths data to get EndpointCollections by tag"""
         endpoints_by_tag: dict[utils.PythonIdentifier, EndpointCollection] = {}
 
-        methods = ["get", "put", "post", "delete", "options", "head", "patch", "trace"]
-
-        for path, path_data in data.items():
-            for method in methods:
+        for path in list(data):
+            # In low memory mode, each path is released once its endpoints are created
+            path_data = data.pop(path) if config.low_memory else data[path]
+            for method in _METHODS:
                 operation: Optional[oai.Operation] = getattr(path_data, method)
                 if operation is None:
                     continue
+                if not config.includes_operation(
+                    path=path,
+                    tags=operation.tags or ["default"],
+                    operation_id=operation.operationId or generate_operation_id(path=path, method=method),
+                ):
+                    continue
 
                 tags = [utils.PythonIdentifier(value=tag, prefix="tag") for tag in operation.tags or ["default"]]
                 if not config.generate_all_tags:
@@ -71,26 +87,27 @@ class EndpointCollection:
 
                 collections = [endpoints_by_tag.setdefault(tag, EndpointCollection(tag=tag)) for tag in tags]
 
-                endpoint, schemas, parameters = Endpoint.from_data(
-                    data=operation,
-                    path=path,
-                    method=method,
-                    tags=tags,
-                    schemas=schemas,
-                    parameters=parameters,
-                    request_bodies=request_bodies,
-                    responses=responses,
-                    config=config,
-                )
-                # Add `PathItem` parameters
-                if not isinstance(endpoint, ParseError):
-                    endpoint, schemas, parameters = Endpoint.add_parameters(
-                        endpoint=endpoint,
-                        data=path_data,
+                with span(f"{method.upper()} {path}", "endpoint"):
+                    endpoint, schemas, parameters = Endpoint.from_data(
+                        data=operation,
+                        path=path,
+                        method=method,
+                        tags=tags,
                         schemas=schemas,
                         parameters=parameters,
+                        request_bodies=request_bodies,
+                        responses=responses,
                         config=config,
                     )
+                    # Add `PathItem` parameters
+                    if not isinstance(endpoint, ParseError):
+                        endpoint, schemas, parameters = Endpoint.add_parameters(
+                            endpoint=endpoint,
+                            data=path_data,
+                            schemas=schemas,
+                            parameters=parameters,
+                            config=config,
+                        )
                 if not isinstance(endpoint, ParseError):
                     endpoint = Endpoint.sort_parameters(endpoint=endpoint)
                 if isinstance(endpoint, ParseError):
@@ -108,6 +125,225 @@ class EndpointCollection:
         return endpoints_by_tag, schemas, parameters
 
 
+def _used_class_names(
+    endpoint_collections_by_tag: dict[utils.PythonIdentifier, EndpointCollection], models: list[ModelProperty]
+) -> set[str]:
+    """The names of every model and enum which the endpoints use, directly or through other `models`"""
+    stack: list[Any] = []
+    for collection in endpoint_collections_by_tag.values():
+        for endpoint in collection.endpoints:
+            stack.extend(endpoint.path_parameters)
+            stack.extend(endpoint.query_parameters)
+            stack.extend(endpoint.header_parameters)
+            stack.extend(endpoint.cookie_parameters)
+            stack.extend(body.prop for body in endpoint.bodies)
+            stack.extend(response.prop for response in endpoint.responses)
+    used: set[str] = set()
+    for prop in _walk_properties(stack, {model.class_info.name: model for model in models}):
+        if isinstance(prop, (ModelProperty, EnumProperty, LiteralEnumProperty)):
+            used.add(prop.class_info.name)
+    return used
+
+
+def _walk_properties(stack: list[Any], models_by_name: dict[str, ModelProperty]) -> Iterator[Property]:
+    """Every property in `stack` and, through models, lists, and unions, every property they contain, once each"""
+    seen: set[int] = set()
+    while stack:
+        prop = stack.pop()
+        if id(prop) in seen:
+            continue
+        seen.add(id(prop))
+        yield prop
+        if isinstance(prop, ModelProperty):
+            # Models referenced from other models are copies, which may have been made before the model was processed
+            prop = models_by_name.get(prop.class_info.name, prop)
+            stack.extend(prop.details.required_properties or ())
+            stack.extend(prop.details.optional_properties or ())
+            if prop.details.additional_properties is not None:
+                stack.append(prop.details.additional_properties)
+        elif isinstance(prop, ListProperty):
+            stack.append(prop.inner_property)
+        elif isinstance(prop, UnionProperty):
+            stack.extend(prop.inner_properties)
+
+
+def _copy_containers(data: dict[str, Any]) -> dict[str, Any]:
+    """A copy of `data` which parts can be removed from (by `_validate_in_parts` or `_validate_lazily`) without changing
+    `data`. The parts themselves aren't copied.
+    """
+    copied = dict(data)
+    if isinstance(copied.get("paths"), dict):
+        copied["paths"] = dict(copied["paths"])
+    components = copied.get("components")
+    if isinstance(components, dict):
+        copied["components"] = {
+            section: dict(entries) if isinstance(entries, dict) else entries for section, entries in components.items()
+        }
+    return copied
+
+
+def _validate_in_parts(data: dict[str, Any]) -> oai.OpenAPI:
+    """Validate `data` one path and one component at a time, removing each from `data` as it goes (leaving it empty).
+
+    This gives the same result as `oai.OpenAPI.model_validate(data)`, but the raw document is released while it's being
+    validated instead of both being in memory at once. Errors still report where they are in the whole document.
+    """
+    paths = data.get("paths")
+    if isinstance(paths, dict):
+        data["paths"] = {path: _validate_part(oai.PathItem, paths.pop(path), ("paths", path)) for path in list(paths)}
+    components = data.get("components")
+    if isinstance(components, dict):
+        sections: dict[str, Any] = {}
+        for section in list(components):
+            entries = components[section]
+            if section not in oai.Components.model_fields or not isinstance(entries, dict):
+                continue
+            del components[section]
+            sections[section] = {}
+            for name in list(entries):
+                part = _validate_part(oai.Components, {section: {name: entries.pop(name)}}, ("components",))
+                sections[section].update(getattr(part, section))
+        # Validated parts are added after validating, since validating a schema again repeats converting `nullable`
+        data["components"] = _validate_part(oai.Components, components, ("components",)).model_copy(update=sections)
+    openapi = oai.OpenAPI.model_validate(data)
+    data.clear()
+    return openapi
+
+
+def _validate_part(model: type[_Part], data: Any, location: tuple[str, ...]) -> _Part:
+    try:
+        return model.model_validate(data)
+    except ValidationError as err:
+        errors: list[Any] = [{**error, "loc": (*location, *error["loc"])} for error in err.errors()]
+        raise ValidationError.from_exception_data(oai.OpenAPI.__name__, errors) from None
+
+
+class _LazyParts(MutableMapping[str, _Part], Generic[_Part]):
+    """Parts of the document (like paths or component schemas) which are only validated when first looked up"""
+
+    def __init__(self, parts: dict[str, Any], validate: Callable[[str, Any], _Part]) -> None:
+        self._parts = parts
+        self._validate = validate
+        self._validated: set[str] = set()
+
+    def __getitem__(self, key: str) -> _Part:
+        if key not in self._validated:
+            self._parts[key] = self._validate(key, self._parts[key])
+            self._validated.add(key)
+        return self._parts[key]
+
+    def __setitem__(self, key: str, value: _Part) -> None:
+        self._parts[key] = value
+        self._validated.add(key)
+
+    def __delitem__(self, key: str) -> None:
+        del self._parts[key]
+        self._validated.discard(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._parts)
+
+    def __len__(self) -> int:
+        return len(self._parts)
+
+
+def _validate_path(path: str, data: Any) -> oai.PathItem:
+    return _validate_part(oai.PathItem, data, ("paths", path))
+
+
+def _validate_component_schema(name: str, data: Any) -> Union[oai.Reference, oai.Schema]:
+    components = _validate_part(oai.Components, {"schemas": {name: data}}, ("components",))
+    return (components.schemas or {})[name]
+
+
+def _validate_lazily(
+    data: dict[str, Any], config: Config
+) -> tuple[oai.OpenAPI, _LazyParts[oai.PathItem], _LazyParts[Union[oai.Reference, oai.Schema]]]:
+    """Validate everything in `data` apart from its paths and component schemas, which are validated one at a time as
+    the parser looks them up instead. Like `_validate_in_parts`, this removes everything from `data` (leaving it empty).
+
+    Paths with no operations which `config` includes, and (when skipping unused models) component schemas which
+    nothing left refers to, are dropped without being validated at all.
+    """
+    paths: dict[str, Any] = {}
+    if isinstance(data.get("paths"), dict):
+        paths, data["paths"] = data["paths"], {}
+    schemas: dict[str, Any] = {}
+    components = data.get("components")
+    if isinstance(components, dict) and isinstance(components.get("schemas"), dict):
+        schemas, components["schemas"] = components["schemas"], {}
+
+    if config.include is not None or config.exclude is not None:
+        paths = {path: item for path, item in paths.items() if _includes_any_operation(path, item, config)}
+    if config.skip_unused_models:
+        used = _referenced_schemas([paths, components], schemas)
+        schemas = {name: schema for name, schema in schemas.items() if name in used}
+    openapi = oai.OpenAPI.model_validate(data)
+    data.clear()
+    return openapi, _LazyParts(paths, _validate_path), _LazyParts(schemas, _validate_component_schema)
+
+
+def _includes_any_operation(path: str, data: Any, config: Config) -> bool:
+    """Whether `config` includes any operation of the raw path item `data`, or it's too malformed to tell"""
+    if not isinstance(data, dict):
+        return True
+    for method in _METHODS:
+        operation = data.get(method)
+        if operation is None:
+            continue
+        if not isinstance(operation, dict):
+            return True
+        tags = operation.get("tags") or ["default"]
+        operation_id = operation.get("operationId") or generate_operation_id(path=path, method=method)
+        if config.includes_operation(path=path, tags=tags, operation_id=operation_id):
+            return True
+    return False
+
+
+def _referenced_schemas(roots: list[Any], schemas: dict[str, Any]) -> set[str]:
+    """The names of the raw component `schemas` which are referred to from `roots`, directly or through each other"""
+    name_by_ref_path = {parse_reference_path(f"#/components/schemas/{name}"): name for name in schemas}
+    used: set[str] = set()
+    stack = list(roots)
+    while stack:
+        current = stack.pop()
+        if isinstance(current, list):
+            stack.extend(current)
+            continue
+        if not isinstance(current, dict):
+            continue
+        ref = current.get("$ref")
+        ref_path = parse_reference_path(ref) if isinstance(ref, str) else None
+        # Remote references (a ParseError here) are reported when they're parsed, and can't refer to these schemas
+        if isinstance(ref_path, str):
+            name = name_by_ref_path.get(ref_path)
+            if name is not None and name not in used:
+                used.add(name)
+                stack.append(schemas[name])
+        stack.extend(current.values())
+    return used
+
+
+def _release_documents(
+    endpoint_collections_by_tag: dict[utils.PythonIdentifier, EndpointCollection], models: list[ModelProperty]
+) -> None:
+    """Drop the references models and responses keep to the parts of the document they were created from.
+
+    Nothing needs them once parsing is done, so this lets the validated document be freed before rendering.
+    """
+    stack: list[Any] = list(models)
+    for collection in endpoint_collections_by_tag.values():
+        for endpoint in collection.endpoints:
+            stack.extend(endpoint.list_all_parameters())
+            stack.extend(body.prop for body in endpoint.bodies)
+            for response in endpoint.responses:
+                response.data = _RELEASED_RESPONSE
+                stack.append(response.prop)
+    for prop in _walk_properties(stack, {model.class_info.name: model for model in models}):
+        if isinstance(prop, ModelProperty):
+            prop.data = _RELEASED_SCHEMA
+
+
 def generate_operation_id(*, path: str, method: str) -> str:
     """Generate an operationId from a path"""
     clean_path = path.replace("{", "").replace("}", "").replace("/", "_")
@@ -151,6 +387,27 @@ class Endpoint:
     bodies: list[Body] = field(default_factory=list)
     errors: list[ParseError] = field(default_factory=list)
 
+    def _copy(self) -> "Endpoint":
+        """Copy this endpoint so that the parsing steps can update the copy without changing the original.
+
+        Only what the parsing steps mutate is copied: the lists and imports they append to, and the parameter
+        `Property`s which `_check_parameters_for_conflicts` may rename (with `evolve`, so each copy gets its own cache of
+        `cached_value`s). Everything else (like the schemas of responses and bodies) is shared, which is much cheaper than
+        a `deepcopy` of every nested `Property`.
+        """
+        return replace(
+            self,
+            tags=list(self.tags),
+            relative_imports=set(self.relative_imports),
+            query_parameters=[evolve(prop) for prop in self.query_parameters],
+            path_parameters=[evolve(prop) for prop in self.path_parameters],
+            header_parameters=[evolve(prop) for prop in self.header_parameters],
+            cookie_parameters=[evolve(prop) for prop in self.cookie_parameters],
+            responses=list(self.responses),
+            bodies=list(self.bodies),
+            errors=list(self.errors),
+        )
+
     @staticmethod
     def _add_responses(
         *,
@@ -160,7 +417,7 @@ class Endpoint:
         responses: dict[str, Union[oai.Response, oai.Reference]],
         config: Config,
     ) -> tuple["Endpoint", Schemas]:
-        endpoint = deepcopy(endpoint)
+        endpoint = endpoint._copy()
         for code, response_data in data.items():
             status_code: HTTPStatus
             try:
@@ -239,7 +496,7 @@ class Endpoint:
         if data.parameters is None:
             return endpoint, schemas, parameters
 
-        endpoint = deepcopy(endpoint)
+        endpoint = endpoint._copy()
 
         unique_parameters: set[tuple[str, oai.ParameterLocation]] = set()
         parameters_by_location: dict[str, list[Property]] = {
@@ -282,6 +539,7 @@ class Endpoint:
                 # Defined at the operation level, ignore it here
                 continue
 
+            checkpoint = schemas.checkpoint()
             prop, new_schemas = property_from_data(
                 name=param.name,
                 required=param.required,
@@ -292,6 +550,7 @@ class Endpoint:
             )
 
             if isinstance(prop, ParseError):
+                schemas.rollback(checkpoint)
                 return (
                     ParseError(
                         detail=f"cannot parse parameter of endpoint {endpoint.name}: {prop.detail}",
@@ -384,7 +643,7 @@ class Endpoint:
             Either an updated `endpoint` with sorted path parameters or a `ParseError` if something was wrong with
                 the path parameters and they could not be sorted.
         """
-        endpoint = deepcopy(endpoint)
+        endpoint = endpoint._copy()
         parameters_from_path = re.findall(_PATH_PARAM_REGEX, endpoint.path)
         try:
             endpoint.path_parameters.sort(
@@ -512,44 +771,80 @@ class GeneratorData:
     errors: list[ParseError]
     endpoint_collections_by_tag: dict[utils.PythonIdentifier, EndpointCollection]
     enums: list[Union[EnumProperty, LiteralEnumProperty]]
+    # With `deduplicate_inline_schemas`, the classes which weren't generated, by the identical class used instead
+    merged_classes: dict[str, list[str]] = field(default_factory=dict)
 
     @staticmethod
-    def from_dict(data: dict[str, Any], *, config: Config) -> Union["GeneratorData", GeneratorError]:
-        """Create an OpenAPI from dict"""
+    def from_dict(
+        data: dict[str, Any], *, config: Config, release: bool = False
+    ) -> Union["GeneratorData", GeneratorError]:
+        """Create an OpenAPI from dict
+
+        `data` isn't changed, unless `release` is set by a caller which doesn't use `data` again. Then (with `low_memory`
+        or `lazy_validation`) each part is removed from it as it's parsed, so that it can be freed as soon as possible.
+        """
+        swagger = "swagger" in data
+        if not release and (config.low_memory or config.lazy_validation):
+            data = _copy_containers(data)
         try:
-            openapi = oai.OpenAPI.model_validate(data)
+            return GeneratorData._from_dict(data, config=config)
         except ValidationError as err:
             detail = str(err)
-            if "swagger" in data:
+            if swagger:
                 detail = (
                     "You may be trying to use a Swagger document; this is not supported by this project.\n\n" + detail
                 )
             return GeneratorError(header="Failed to parse OpenAPI document", detail=detail)
+
+    @staticmethod
+    def _from_dict(data: dict[str, Any], *, config: Config) -> "GeneratorData":
+        """Create an OpenAPI from dict, raising a `ValidationError` if the document isn't valid.
+
+        With `lazy_validation`, that can happen at any point, since paths and schemas are only validated when parsed.
+        """
+        paths: MutableMapping[str, oai.PathItem]
+        component_schemas: Mapping[str, Union[oai.Reference, oai.Schema]]
+        with span("validate document"):
+            if config.lazy_validation:
+                openapi, paths, component_schemas = _validate_lazily(data, config)
+            else:
+                openapi = _validate_in_parts(data) if config.low_memory else oai.OpenAPI.model_validate(data)
+                paths = openapi.paths
+                component_schemas = (openapi.components and openapi.components.schemas) or {}
         schemas = Schemas()
         parameters = Parameters()
-        if openapi.components and openapi.components.schemas:
-            schemas = build_schemas(components=openapi.components.schemas, schemas=schemas, config=config)
+        if component_schemas:
+            with span("build_schemas"):
+                schemas = build_schemas(components=component_schemas, schemas=schemas, config=config)
         if openapi.components and openapi.components.parameters:
-            parameters = build_parameters(
-                components=openapi.components.parameters,
+            with span("build_parameters"):
+                parameters = build_parameters(
+                    components=openapi.components.parameters,
+                    parameters=parameters,
+                    config=config,
+                )
+        request_bodies = (openapi.components and openapi.components.requestBodies) or {}
+        responses = (openapi.components and openapi.components.responses) or {}
+        with span("EndpointCollection.from_data"):
+            endpoint_collections_by_tag, schemas, parameters = EndpointCollection.from_data(
+                data=paths,
+                schemas=schemas,
                 parameters=parameters,
+                request_bodies=request_bodies,
+                responses=responses,
                 config=config,
             )
-        request_bodies = (openapi.components and openapi.components.requestBodies) or {}
-        responses = (openapi.components and openapi.components.responses) or {}
-        endpoint_collections_by_tag, schemas, parameters = EndpointCollection.from_data(
-            data=openapi.paths,
-            schemas=schemas,
-            parameters=parameters,
-            request_bodies=request_bodies,
-            responses=responses,
-            config=config,
-        )
 
         enums = [
             prop for prop in schemas.classes_by_name.values() if isinstance(prop, (EnumProperty, LiteralEnumProperty))
         ]
         models = [prop for prop in schemas.classes_by_name.values() if isinstance(prop, ModelProperty)]
+        if config.skip_unused_models:
+            used = _used_class_names(endpoint_collections_by_tag, models)
+            enums = [enum for enum in enums if enum.class_info.name in used]
+            models = [model for model in models if model.class_info.name in used]
+        if config.low_memory:
+            _release_documents(endpoint_collections_by_tag, models)
 
         return GeneratorData(
             title=openapi.info.title,
@@ -559,4 +854,9 @@ class GeneratorData:
             models=models,
             errors=schemas.errors + parameters.errors,
             enums=enums,
+            merged_classes={
+                name: sorted(merged)
+                for name, merged in sorted(schemas.merged_classes.items())
+                if name in schemas.classes_by_name
+            },
         )
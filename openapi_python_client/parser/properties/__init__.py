@@ -14,18 +14,21 @@ __all__ = [
     "property_from_data",
 ]
 
-from collections.abc import Iterable
+
+from collections.abc import Mapping
 
 from attrs import evolve
 
 from ... import Config, utils
 from ... import schema as oai
+from ...profiling import span
 from ..errors import ParameterError, ParseError, PropertyError
 from .any import AnyProperty
 from .boolean import BooleanProperty
 from .const import ConstProperty
 from .date import DateProperty
 from .datetime import DateTimeProperty
+from .dependency_graph import all_of_references, creation_references, is_cycle, strongly_connected_components
 from .enum_property import EnumProperty
 from .file import FileProperty
 from .float import FloatProperty
@@ -177,10 +180,7 @@ def property_from_data(  # noqa: PLR0911, PLR0912
         # the class for the schema it's referencing - so we don't add it to classes_by_name; but we do
         # add it to models_to_process, if it's a model, because its properties still need to be resolved.
         if isinstance(prop, ModelProperty):
-            schemas = evolve(
-                schemas,
-                models_to_process=[*schemas.models_to_process, prop],
-            )
+            schemas.add_model_to_process(prop)
         return prop, schemas
 
     if data.type == oai.DataType.BOOLEAN:
@@ -312,41 +312,70 @@ def property_from_data(  # noqa: PLR0911, PLR0912
 
 def _create_schemas(
     *,
-    components: dict[str, oai.Reference | oai.Schema],
+    components: Mapping[str, oai.Reference | oai.Schema],
     schemas: Schemas,
     config: Config,
 ) -> Schemas:
-    to_process: Iterable[tuple[str, oai.Reference | oai.Schema]] = components.items()
-    still_making_progress = True
-    errors: list[PropertyError] = []
+    to_process: list[tuple[str, oai.Schema, ReferencePath]] = []
+    for name, data in components.items():
+        if isinstance(data, oai.Reference):
+            schemas.errors.append(PropertyError(data=data, detail="Reference schemas are not supported."))
+            continue
+        ref_path = parse_reference_path(f"#/components/schemas/{name}")
+        if isinstance(ref_path, ParseError):
+            schemas.errors.append(PropertyError(detail=ref_path.detail, data=data))
+            continue
+        to_process.append((name, data, ref_path))
+
+    # Create every schema after the schemas it needs, so that forward references don't need retrying
+    index_by_ref_path = {ref_path: index for index, (_, _, ref_path) in enumerate(to_process)}
+    dependencies: list[list[int]] = []
+    for _, data, _ in to_process:
+        referenced = (parse_reference_path(ref) for ref in creation_references(data))
+        dependencies.append([index_by_ref_path[ref_path] for ref_path in referenced if ref_path in index_by_ref_path])
 
-    # References could have forward References so keep going as long as we are making progress
-    while still_making_progress:
-        still_making_progress = False
-        errors = []
-        next_round = []
-        # Only accumulate errors from the last round, since we might fix some along the way
-        for name, data in to_process:
-            if isinstance(data, oai.Reference):
-                schemas.errors.append(PropertyError(data=data, detail="Reference schemas are not supported."))
-                continue
-            ref_path = parse_reference_path(f"#/components/schemas/{name}")
-            if isinstance(ref_path, ParseError):
-                schemas.errors.append(PropertyError(detail=ref_path.detail, data=data))
-                continue
-            schemas_or_err = update_schemas_with_data(ref_path=ref_path, data=data, schemas=schemas, config=config)
-            if isinstance(schemas_or_err, PropertyError):
-                next_round.append((name, data))
-                errors.append(schemas_or_err)
-                continue
-            schemas = schemas_or_err
-            still_making_progress = True
-        to_process = next_round
+    errors: list[PropertyError] = []
+    for component in strongly_connected_components(dependencies):
+        cycle = is_cycle(component, dependencies)
+        pending = component
+        while True:
+            failed: list[tuple[int, PropertyError]] = []
+            for index in pending:
+                name, data, ref_path = to_process[index]
+                with span(name, "schema"):
+                    schemas_or_err = update_schemas_with_data(
+                        ref_path=ref_path, data=data, schemas=schemas, config=config
+                    )
+                if isinstance(schemas_or_err, PropertyError):
+                    failed.append((index, schemas_or_err))
+                    continue
+                schemas = schemas_or_err
+            # Schemas in a cycle may still depend on each other, so retry them while that makes progress
+            if not cycle or not failed or len(failed) == len(pending):
+                break
+            pending = [index for index, _ in failed]
+        for _, error in failed:
+            if cycle and _references_component(error, component=component, to_process=to_process):
+                error.detail = error.detail or ""
+                error.detail += "\n\nCircular reference between schemas: " + ", ".join(
+                    to_process[index][0] for index in component
+                )
+            errors.append(error)
 
     schemas.errors.extend(errors)
     return schemas
 
 
+def _references_component(
+    error: PropertyError, *, component: list[int], to_process: list[tuple[str, oai.Schema, ReferencePath]]
+) -> bool:
+    """Whether `error` is a reference to a schema in `component` which couldn't be created"""
+    if not isinstance(error.data, oai.Reference):
+        return False
+    ref_path = parse_reference_path(error.data.ref)
+    return ref_path in {to_process[index][2] for index in component}
+
+
 def _propogate_removal(*, root: ReferencePath | utils.ClassName, schemas: Schemas, error: PropertyError) -> None:
     if isinstance(root, utils.ClassName):
         schemas.classes_by_name.pop(root, None)
@@ -371,49 +400,68 @@ def _process_model_errors(
 
 
 def _process_models(*, schemas: Schemas, config: Config) -> Schemas:
-    to_process = schemas.models_to_process
-    still_making_progress = True
-    final_model_errors: list[tuple[ModelProperty, PropertyError]] = []
-    latest_model_errors: list[tuple[ModelProperty, PropertyError]] = []
+    # Processing models can queue up more (already processed) inline models, don't iterate over those
+    to_process = list(schemas.models_to_process)
+    model_errors: list[tuple[ModelProperty, PropertyError]] = []
 
     # Models which refer to other models in their allOf must be processed after their referenced models
-    while still_making_progress:
-        still_making_progress = False
-        # Only accumulate errors from the last round, since we might fix some along the way
-        latest_model_errors = []
-        next_round = []
-        for model_prop in to_process:
-            schemas_or_err = process_model(model_prop, schemas=schemas, config=config)
-            if isinstance(schemas_or_err, PropertyError):
-                schemas_or_err.header = f"\nUnable to process schema {model_prop.name}:"
-                if isinstance(schemas_or_err.data, oai.Reference) and schemas_or_err.data.ref.endswith(
-                    f"/{model_prop.class_info.name}"
-                ):
-                    schemas_or_err.detail = schemas_or_err.detail or ""
-                    schemas_or_err.detail += "\n\nRecursive allOf reference found"
-                    final_model_errors.append((model_prop, schemas_or_err))
+    index_by_model = {id(model_prop): index for index, model_prop in enumerate(to_process)}
+    dependencies: list[list[int]] = []
+    for model_prop in to_process:
+        dependencies.append([])
+        for ref in all_of_references(model_prop.data):
+            ref_path = parse_reference_path(ref)
+            referenced = None if isinstance(ref_path, ParseError) else schemas.classes_by_reference.get(ref_path)
+            if id(referenced) in index_by_model:
+                dependencies[-1].append(index_by_model[id(referenced)])
+
+    unprocessed: list[ModelProperty] = []
+    for component in strongly_connected_components(dependencies):
+        cycle = is_cycle(component, dependencies)
+        pending = component
+        while True:
+            failed: list[tuple[int, PropertyError]] = []
+            for index in pending:
+                model_prop = to_process[index]
+                checkpoint = schemas.checkpoint()
+                with span(model_prop.class_info.name, "model"):
+                    schemas_or_err = process_model(model_prop, schemas=schemas, config=config)
+                if isinstance(schemas_or_err, PropertyError):
+                    schemas.rollback(checkpoint)
+                    failed.append((index, schemas_or_err))
                     continue
-                latest_model_errors.append((model_prop, schemas_or_err))
-                next_round.append(model_prop)
-                continue
-            schemas = schemas_or_err
-            still_making_progress = True
-        to_process = next_round
-
-    final_model_errors.extend(latest_model_errors)
-    errors = _process_model_errors(final_model_errors, schemas=schemas)
-    return evolve(schemas, errors=[*schemas.errors, *errors], models_to_process=to_process)
+                schemas = schemas_or_err
+            if not cycle or not failed or len(failed) == len(pending):
+                break
+            pending = [index for index, _ in failed]
+        for index, error in failed:
+            model_prop = to_process[index]
+            error.header = f"\nUnable to process schema {model_prop.name}:"
+            if cycle:
+                error.detail = error.detail or ""
+                error.detail += "\n\nRecursive allOf reference found between: " + ", ".join(
+                    to_process[member].class_info.name for member in component
+                )
+            model_errors.append((model_prop, error))
+            unprocessed.append(model_prop)
+
+    errors = _process_model_errors(model_errors, schemas=schemas)
+    schemas.errors.extend(errors)
+    schemas.models_to_process = unprocessed
+    return schemas
 
 
 def build_schemas(
     *,
-    components: dict[str, oai.Reference | oai.Schema],
+    components: Mapping[str, oai.Reference | oai.Schema],
     schemas: Schemas,
     config: Config,
 ) -> Schemas:
     """Get a list of Schemas from an OpenAPI dict"""
-    schemas = _create_schemas(components=components, schemas=schemas, config=config)
-    schemas = _process_models(schemas=schemas, config=config)
+    with span("create schemas"):
+        schemas = _create_schemas(components=components, schemas=schemas, config=config)
+    with span("process models"):
+        schemas = _process_models(schemas=schemas, config=config)
     return schemas
 
 
@@ -424,36 +472,24 @@ def build_parameters(
     config: Config,
 ) -> Parameters:
     """Get a list of Parameters from an OpenAPI dict"""
-    to_process: Iterable[tuple[str, oai.Reference | oai.Parameter]] = []
-    if components is not None:
-        to_process = components.items()
-    still_making_progress = True
     errors: list[ParameterError] = []
 
-    # References could have forward References so keep going as long as we are making progress
-    while still_making_progress:
-        still_making_progress = False
-        errors = []
-        next_round = []
-        # Only accumulate errors from the last round, since we might fix some along the way
-        for name, data in to_process:
-            if isinstance(data, oai.Reference):
-                parameters.errors.append(ParameterError(data=data, detail="Reference parameters are not supported."))
-                continue
-            ref_path = parse_reference_path(f"#/components/parameters/{name}")
-            if isinstance(ref_path, ParseError):
-                parameters.errors.append(ParameterError(detail=ref_path.detail, data=data))
-                continue
-            parameters_or_err = update_parameters_with_data(
-                ref_path=ref_path, data=data, parameters=parameters, config=config
-            )
-            if isinstance(parameters_or_err, ParameterError):
-                next_round.append((name, data))
-                errors.append(parameters_or_err)
-                continue
-            parameters = parameters_or_err
-            still_making_progress = True
-        to_process = next_round
+    # Parameters can't reference other parameters, so there is nothing to wait for and a single pass is enough
+    for name, data in (components or {}).items():
+        if isinstance(data, oai.Reference):
+            parameters.errors.append(ParameterError(data=data, detail="Reference parameters are not supported."))
+            continue
+        ref_path = parse_reference_path(f"#/components/parameters/{name}")
+        if isinstance(ref_path, ParseError):
+            parameters.errors.append(ParameterError(detail=ref_path.detail, data=data))
+            continue
+        parameters_or_err = update_parameters_with_data(
+            ref_path=ref_path, data=data, parameters=parameters, config=config
+        )
+        if isinstance(parameters_or_err, ParameterError):
+            errors.append(parameters_or_err)
+            continue
+        parameters = parameters_or_err
 
     parameters.errors.extend(errors)
     return parameters
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+__all__ = [
+    "all_of_references",
+    "creation_references",
+    "is_cycle",
+    "references",
+    "strongly_connected_components",
+]
+
+from collections.abc import Iterator, Sequence
+
+from ... import schema as oai
+
+
+def _child_schemas(data: oai.Schema) -> Iterator[oai.Reference | oai.Schema]:
+    yield from data.allOf
+    yield from data.anyOf
+    yield from data.oneOf
+    yield from data.prefixItems
+    if data.schema_not is not None:
+        yield data.schema_not
+    if data.items is not None:
+        yield data.items
+    if data.properties:
+        yield from data.properties.values()
+    if isinstance(data.additionalProperties, (oai.Reference, oai.Schema)):
+        yield data.additionalProperties
+
+
+def references(data: oai.Reference | oai.Schema) -> Iterator[str]:
+    """Every `$ref` anywhere in `data`, without following them"""
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, oai.Reference):
+            yield item.ref
+        else:
+            stack.extend(_child_schemas(item))
+
+
+def creation_references(data: oai.Reference | oai.Schema) -> Iterator[str]:
+    """Every `$ref` in `data` which has to be created before `data` can be, without following them.
+
+    Properties (including `additionalProperties`) of models aren't built until the models are processed, so only
+    references in `allOf`, `anyOf`, `oneOf`, and `items` count, and only outside of properties.
+    """
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, oai.Reference):
+            yield item.ref
+            continue
+        stack.extend(item.allOf)
+        stack.extend(item.anyOf)
+        stack.extend(item.oneOf)
+        if item.items is not None:
+            stack.append(item.items)
+
+
+def all_of_references(data: oai.Reference | oai.Schema) -> Iterator[str]:
+    """Every `$ref` directly inside an `allOf` anywhere in `data`, without following them.
+
+    A model can only be processed after every model it (or any of its inline schemas) takes `allOf` of.
+    """
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, oai.Reference):
+            continue
+        yield from (sub_schema.ref for sub_schema in item.allOf if isinstance(sub_schema, oai.Reference))
+        stack.extend(_child_schemas(item))
+
+
+def strongly_connected_components(dependencies: Sequence[Sequence[int]]) -> list[list[int]]:
+    """Group nodes which depend on each other (directly or indirectly) and order the groups by their dependencies.
+
+    Args:
+        dependencies: For each node (identified by its index), the indexes of the nodes it depends on.
+
+    Returns:
+        Every group of nodes, where a group always comes after all the groups it depends on. Nodes within a group are
+        sorted. When there are no dependencies between groups, they keep the order of the nodes, so processing them
+        in this order is stable for documents which are already ordered.
+    """
+    # Iterative version of Tarjan's algorithm, so deeply nested references can't hit the recursion limit
+    index_of: dict[int, int] = {}
+    low_link: dict[int, int] = {}
+    on_stack: set[int] = set()
+    stack: list[int] = []
+    components: list[list[int]] = []
+
+    for root in range(len(dependencies)):
+        if root in index_of:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, next_edge = work.pop()
+            if next_edge == 0:
+                index_of[node] = low_link[node] = len(index_of)
+                stack.append(node)
+                on_stack.add(node)
+            edges = dependencies[node]
+            recurse = False
+            while next_edge < len(edges):
+                child = edges[next_edge]
+                next_edge += 1
+                if child not in index_of:
+                    work.append((node, next_edge))
+                    work.append((child, 0))
+                    recurse = True
+                    break
+                if child in on_stack:
+                    low_link[node] = min(low_link[node], index_of[child])
+            if recurse:
+                continue
+            if low_link[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+            if work:
+                parent = work[-1][0]
+                low_link[parent] = min(low_link[parent], low_link[node])
+    return components
+
+
+def is_cycle(component: Sequence[int], dependencies: Sequence[Sequence[int]]) -> bool:
+    """Whether a group from `strongly_connected_components` is a cycle (rather than a single independent node)"""
+    return len(component) > 1 or component[0] in dependencies[component[0]]
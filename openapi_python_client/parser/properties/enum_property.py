@@ -127,6 +127,13 @@ class EnumProperty(PropertyProtocol):
             class_name = f"{utils.pascal_case(parent_name)}{utils.pascal_case(class_name)}"
         class_info = Class.from_string(string=class_name, config=config)
         values = EnumProperty.values_from_list(value_list, name_list, class_info)
+        fingerprint = None
+        identical = None
+        if config.deduplicate_inline_schemas and parent_name:
+            fingerprint = ("enum", value_type, tuple(values.items()))
+            identical = schemas.identical_inline_class(fingerprint, class_info.name)
+            if isinstance(identical, EnumProperty):
+                class_info = identical.class_info
 
         if class_info.name in schemas.classes_by_name:
             existing = schemas.classes_by_name[class_info.name]
@@ -155,7 +162,10 @@ class EnumProperty(PropertyProtocol):
             return checked_default, schemas
         prop = evolve(prop, default=checked_default)
 
-        schemas = evolve(schemas, classes_by_name={**schemas.classes_by_name, class_info.name: prop})
+        if identical is None:
+            schemas.set_class_by_name(class_info.name, prop)
+            if fingerprint is not None:
+                schemas.add_inline_class(fingerprint, prop)
         return prop, schemas
 
     def convert_value(self, value: Any) -> Value | PropertyError | None:
@@ -2,12 +2,12 @@ from __future__ import annotations
 
 from typing import Any, ClassVar
 
-from attr import define
+from attr import define, field
 
 from ... import Config, utils
 from ... import schema as oai
 from ..errors import PropertyError
-from .protocol import PropertyProtocol, Value
+from .protocol import PropertyProtocol, Value, cached_value
 from .schemas import ReferencePath, Schemas
 
 
@@ -23,6 +23,7 @@ class ListProperty(PropertyProtocol):
     example: str | None
     inner_property: PropertyProtocol
     template: ClassVar[str] = "list_property.py.jinja"
+    _cached_values: dict[Any, Any] = field(factory=dict, init=False, eq=False, repr=False)
 
     @classmethod
     def build(
@@ -105,9 +106,11 @@ class ListProperty(PropertyProtocol):
     def convert_value(self, value: Any) -> Value | None | PropertyError:
         return None  # pragma: no cover
 
+    @cached_value
     def get_base_type_string(self, *, quoted: bool = False) -> str:
         return f"list[{self.inner_property.get_type_string(quoted=not self.inner_property.is_base_type)}]"
 
+    @cached_value
     def get_base_json_type_string(self, *, quoted: bool = False) -> str:
         return f"list[{self.inner_property.get_type_string(json=True, quoted=not self.inner_property.is_base_type)}]"
 
@@ -115,6 +118,7 @@ class ListProperty(PropertyProtocol):
         """Get a string representation of runtime type that should be used for `isinstance` checks"""
         return "list"
 
+    @cached_value
     def get_imports(self, *, prefix: str) -> set[str]:
         """
         Get a set of import strings that should be included when this property is used somewhere
@@ -123,16 +127,18 @@ class ListProperty(PropertyProtocol):
             prefix: A prefix to put before any relative (local) module names. This should be the number of . to get
             back to the root of the generated client.
         """
-        imports = super().get_imports(prefix=prefix)
+        imports = PropertyProtocol.get_imports(self, prefix=prefix)
         imports.update(self.inner_property.get_imports(prefix=prefix))
         imports.add("from typing import cast")
         return imports
 
+    @cached_value
     def get_lazy_imports(self, *, prefix: str) -> set[str]:
-        lazy_imports = super().get_lazy_imports(prefix=prefix)
+        lazy_imports = PropertyProtocol.get_lazy_imports(self, prefix=prefix)
         lazy_imports.update(self.inner_property.get_lazy_imports(prefix=prefix))
         return lazy_imports
 
+    @cached_value
     def get_type_string(
         self,
         no_optional: bool = False,
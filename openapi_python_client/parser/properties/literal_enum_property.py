@@ -121,6 +121,13 @@ class LiteralEnumProperty(PropertyProtocol):
             class_name = f"{utils.pascal_case(parent_name)}{utils.pascal_case(class_name)}"
         class_info = Class.from_string(string=class_name, config=config)
         values: set[str | int] = set(value_list)
+        fingerprint = None
+        identical = None
+        if config.deduplicate_inline_schemas and parent_name:
+            fingerprint = ("literal_enum", value_type, frozenset(values))
+            identical = schemas.identical_inline_class(fingerprint, class_info.name)
+            if isinstance(identical, LiteralEnumProperty):
+                class_info = identical.class_info
 
         if class_info.name in schemas.classes_by_name:
             existing = schemas.classes_by_name[class_info.name]
@@ -149,7 +156,10 @@ class LiteralEnumProperty(PropertyProtocol):
             return checked_default, schemas
         prop = evolve(prop, default=checked_default)
 
-        schemas = evolve(schemas, classes_by_name={**schemas.classes_by_name, class_info.name: prop})
+        if identical is None:
+            schemas.set_class_by_name(class_info.name, prop)
+            if fingerprint is not None:
+                schemas.add_inline_class(fingerprint, prop)
         return prop, schemas
 
     def convert_value(self, value: Any) -> Value | PropertyError | None:
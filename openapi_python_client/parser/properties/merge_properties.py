@@ -26,7 +26,7 @@ from .enum_property import EnumProperty
 from .int import IntProperty
 from .list_property import ListProperty
 from .property import Property
-from .protocol import PropertyProtocol
+from .protocol import PropertyProtocol, invalidate_cached_values
 from .string import StringProperty
 
 PropertyT = TypeVar("PropertyT", bound=PropertyProtocol)
@@ -102,6 +102,7 @@ def _merge_same_type(
         if isinstance(inner_property, PropertyError):
             return PropertyError(detail=f"can't merge list properties: {inner_property.detail}")
         prop1.inner_property = inner_property
+        invalidate_cached_values()
 
     if isinstance(prop1, UnionProperty) and isinstance(prop2, UnionProperty):
         return prop2
@@ -11,8 +11,9 @@ from ... import schema as oai
 from ...utils import PythonIdentifier
 from ..errors import ParseError, PropertyError
 from .any import AnyProperty
-from .protocol import PropertyProtocol, Value
-from .schemas import Class, ReferencePath, Schemas, parse_reference_path
+from .dependency_graph import references
+from .protocol import PropertyProtocol, Value, cached_value, invalidate_cached_values
+from .schemas import Class, ReferencePath, Schemas, inline_schema_fingerprint, parse_reference_path
 
 
 @define
@@ -24,6 +25,18 @@ class ModelDetails:
     additional_properties: Property | None = None
     relative_imports: set[str] = field(factory=set)
     lazy_imports: set[str] = field(factory=set)
+    _properties_by_name: dict[str, Property] | None = field(default=None, init=False, eq=False, repr=False)
+
+    def properties_by_name(self) -> dict[str, Property]:
+        """Every property by name, for models which take `allOf` this one.
+
+        Built once for each model, however many others extend it, so the result must not be changed.
+        """
+        if self._properties_by_name is None:
+            self._properties_by_name = {
+                prop.name: prop for prop in chain(self.required_properties or (), self.optional_properties or ())
+            }
+        return self._properties_by_name
 
 
 @define
@@ -45,6 +58,7 @@ class ModelProperty(PropertyProtocol):
     template: ClassVar[str] = "model_property.py.jinja"
     json_is_dict: ClassVar[bool] = True
     is_multipart_body: bool = False
+    _cached_values: dict[Any, Any] = field(factory=dict, init=False, eq=False, repr=False)
 
     @classmethod
     def build(
@@ -82,6 +96,14 @@ class ModelProperty(PropertyProtocol):
             else:
                 class_string = title
         class_info = Class.from_string(string=class_string, config=config)
+        fingerprint = None
+        if config.deduplicate_inline_schemas and parent_name:
+            fingerprint = inline_schema_fingerprint(data)
+            identical = schemas.identical_inline_class(fingerprint, class_info.name)
+            if isinstance(identical, ModelProperty):
+                return identical.reused_for(
+                    data=data, name=name, required=required, schemas=schemas, config=config, roots=roots
+                )
         model_roots = {*roots, class_info.name}
         details = ModelDetails()
         if process_properties:
@@ -114,10 +136,33 @@ class ModelProperty(PropertyProtocol):
             )
             return error, schemas
 
-        schemas = evolve(
-            schemas,
-            classes_by_name={**schemas.classes_by_name, class_info.name: prop},
-            models_to_process=[*schemas.models_to_process, prop],
+        schemas.set_class_by_name(class_info.name, prop)
+        schemas.add_model_to_process(prop)
+        if fingerprint is not None:
+            schemas.add_inline_class(fingerprint, prop)
+        return prop, schemas
+
+    def reused_for(
+        self,
+        *,
+        data: oai.Schema,
+        name: str,
+        required: bool,
+        schemas: Schemas,
+        config: Config,
+        roots: set[ReferencePath | utils.ClassName],
+    ) -> tuple[ModelProperty, Schemas]:
+        """Use this model for an identical inline schema `data`, instead of generating another class for it"""
+        # Whatever the schema refers to is still a dependency of where it's used, as if it had its own class
+        for ref in references(data):
+            ref_path = parse_reference_path(ref)
+            if not isinstance(ref_path, ParseError):
+                schemas.add_dependencies(ref_path, roots)
+        prop = evolve(
+            self,
+            name=name,
+            required=required,
+            python_name=utils.PythonIdentifier(value=name, prefix=config.field_prefix),
         )
         return prop, schemas
 
@@ -164,6 +209,7 @@ class ModelProperty(PropertyProtocol):
     def get_base_type_string(self, *, quoted: bool = False) -> str:
         return f'"{self.class_info.name}"' if quoted else self.class_info.name
 
+    @cached_value
     def get_imports(self, *, prefix: str) -> set[str]:
         """
         Get a set of import strings that should be included when this property is used somewhere
@@ -172,7 +218,7 @@ class ModelProperty(PropertyProtocol):
             prefix: A prefix to put before any relative (local) module names. This should be the number of . to get
             back to the root of the generated client.
         """
-        imports = super().get_imports(prefix=prefix)
+        imports = PropertyProtocol.get_imports(self, prefix=prefix)
         imports.update(
             {
                 "from typing import cast",
@@ -180,6 +226,7 @@ class ModelProperty(PropertyProtocol):
         )
         return imports
 
+    @cached_value
     def get_lazy_imports(self, *, prefix: str) -> set[str]:
         """Get a set of lazy import strings that should be included when this property is used somewhere
 
@@ -196,6 +243,7 @@ class ModelProperty(PropertyProtocol):
             relative_imports: The set of relative import strings
         """
         self.details.relative_imports = {ri for ri in relative_imports if self.self_import not in ri}
+        invalidate_cached_values()
 
     def set_lazy_imports(self, lazy_imports: set[str]) -> None:
         """Set the lazy imports set for this ModelProperty, filtering out self imports
@@ -204,7 +252,9 @@ class ModelProperty(PropertyProtocol):
             lazy_imports: The set of lazy import strings
         """
         self.details.lazy_imports = {li for li in lazy_imports if self.self_import not in li}
+        invalidate_cached_values()
 
+    @cached_value
     def get_type_string(
         self,
         no_optional: bool = False,
@@ -250,6 +300,27 @@ def _resolve_naming_conflict(first: Property, second: Property, config: Config)
     return None
 
 
+def _index_python_name(
+    prop: Property, properties: dict[str, Property], names_by_python_name: dict[str, str], config: Config
+) -> PropertyError | None:
+    """Add `prop` (already in `properties`) to `names_by_python_name`, renaming it if its python_name is taken"""
+    # Resolving a conflict renames both properties, and either may then conflict with another one in turn
+    unindexed = [prop]
+    while unindexed:
+        current = unindexed.pop()
+        other_name = names_by_python_name.get(current.python_name)
+        if other_name is None or other_name == current.name:
+            names_by_python_name[current.python_name] = current.name
+            continue
+        other_prop = properties[other_name]
+        del names_by_python_name[other_prop.python_name]
+        naming_error = _resolve_naming_conflict(current, other_prop, config)
+        if naming_error is not None:
+            return naming_error
+        unindexed.extend((other_prop, current))
+    return None
+
+
 def _process_properties(  # noqa: PLR0911
     *,
     data: oai.Schema,
@@ -262,27 +333,32 @@ def _process_properties(  # noqa: PLR0911
     from .merge_properties import merge_properties
 
     properties: dict[str, Property] = {}
+    # The name of the property with each python_name, to find naming conflicts without comparing every property
+    names_by_python_name: dict[str, str] = {}
     required_set = set(data.required or [])
 
     def _add_if_no_conflict(new_prop: Property) -> PropertyError | None:
-        nonlocal properties
-
         name_conflict = properties.get(new_prop.name)
         merged_prop = merge_properties(name_conflict, new_prop, class_name, config) if name_conflict else new_prop
         if isinstance(merged_prop, PropertyError):
             merged_prop.header = f"Found conflicting properties named {new_prop.name} when creating {class_name}"
             return merged_prop
-
-        for other_prop in properties.values():
-            if other_prop.name == merged_prop.name:
-                continue  # Same property, probably just got merged
-            if other_prop.python_name != merged_prop.python_name:
-                continue
-            naming_error = _resolve_naming_conflict(merged_prop, other_prop, config)
-            if naming_error is not None:
-                return naming_error
+        if name_conflict is not None and names_by_python_name.get(name_conflict.python_name) == name_conflict.name:
+            del names_by_python_name[name_conflict.python_name]
 
         properties[merged_prop.name] = merged_prop
+        return _index_python_name(merged_prop, properties, names_by_python_name, config)
+
+    def _inherit(sub_model: ModelProperty) -> PropertyError | None:
+        if not properties:
+            # Nothing to conflict with yet (usually this is the model's base class), so take every property at once
+            properties.update(sub_model.details.properties_by_name())
+            names_by_python_name.update((prop.python_name, name) for name, prop in properties.items())
+            return None
+        for prop in chain(sub_model.required_properties, sub_model.optional_properties):
+            err = _add_if_no_conflict(prop)
+            if err is not None:
+                return err
         return None
 
     unprocessed_props: list[tuple[str, oai.Reference | oai.Schema]] = (
@@ -301,10 +377,9 @@ def _process_properties(  # noqa: PLR0911
             # Properties of allOf references first should be processed first
             if sub_model.needs_post_processing():
                 return PropertyError(f"Reference {sub_model.name} in allOf was not processed", data=sub_prop), schemas
-            for prop in chain(sub_model.required_properties, sub_model.optional_properties):
-                err = _add_if_no_conflict(prop)
-                if err is not None:
-                    return err, schemas
+            err = _inherit(sub_model)
+            if err is not None:
+                return err, schemas
             schemas.add_dependencies(ref_path=ref_path, roots=roots)
         else:
             unprocessed_props.extend(sub_prop.properties.items() if sub_prop.properties else [])
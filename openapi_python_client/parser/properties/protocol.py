@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-__all__ = ["PropertyProtocol", "Value"]
+__all__ = ["PropertyProtocol", "Value", "cached_value", "invalidate_cached_values"]
 
 from abc import abstractmethod
+from collections.abc import Callable
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, ClassVar, Protocol, TypeVar
+from functools import wraps
+from typing import TYPE_CHECKING, Any, ClassVar, Protocol, TypeVar, cast
 
 from ... import Config
 from ... import schema as oai
@@ -30,6 +32,46 @@ class Value:
 
 PropertyType = TypeVar("PropertyType", bound="PropertyProtocol")
 
+# Identifies the current state of every Property. Cached values are only valid for the token they were computed with,
+# so replacing it invalidates every cache at once, including those of properties containing a changed one.
+# A new object (rather than a counter) is used so that caches unpickled from another run are never considered valid.
+_cache_token = object()
+
+Method = TypeVar("Method", bound=Callable[..., Any])
+
+
+def invalidate_cached_values() -> None:
+    """Forget everything cached by `cached_value`. Call whenever a Property is mutated in a way that could change it."""
+    global _cache_token  # noqa: PLW0603
+    _cache_token = object()
+
+
+def cached_value(method: Method) -> Method:
+    """Cache the result of a Property method which derives a value (like a type string) from the Property.
+
+    The Property must have a `_cached_values` dict (which should be excluded from `__init__` and equality). Sets are
+    cached as frozensets and a copy returned on every call, since callers are allowed to update the sets they get.
+    Decorated methods can't use `super()` because attrs can't update the class they close over for slotted classes,
+    so they must call the base class method explicitly instead.
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        cache: dict[Any, Any] = self._cached_values
+        if cache.get(None) is not _cache_token:
+            cache.clear()
+            cache[None] = _cache_token
+        key = (name, args, tuple(sorted(kwargs.items())))
+        if key in cache:
+            value = cache[key]
+            return set(value) if isinstance(value, frozenset) else value
+        value = method(self, *args, **kwargs)
+        cache[key] = frozenset(value) if isinstance(value, set) else value
+        return value
+
+    return cast(Method, wrapper)
+
 
 class PropertyProtocol(Protocol):
     """
@@ -87,6 +129,7 @@ class PropertyProtocol(Protocol):
             "python_name",
             PythonIdentifier(value=new_name, prefix=config.field_prefix, skip_snake_case=skip_snake_case),
         )
+        invalidate_cached_values()
 
     def get_base_type_string(self, *, quoted: bool = False) -> str:
         """Get the string describing the Python type of this property. Base types no require quoting."""
@@ -3,6 +3,8 @@ __all__ = [
     "Parameters",
     "ReferencePath",
     "Schemas",
+    "SchemasCheckpoint",
+    "inline_schema_fingerprint",
     "parameter_from_data",
     "parameter_from_reference",
     "parse_reference_path",
@@ -10,10 +12,13 @@ __all__ = [
     "update_schemas_with_data",
 ]
 
-from typing import TYPE_CHECKING, NewType, Union, cast
+import hashlib
+import json
+from collections.abc import Hashable
+from typing import TYPE_CHECKING, NewType, Optional, Union, cast
 from urllib.parse import urlparse
 
-from attrs import define, evolve, field
+from attrs import define, field
 
 from ... import Config
 from ... import schema as oai
@@ -22,14 +27,20 @@ from ...utils import ClassName, PythonIdentifier
 from ..errors import ParameterError, ParseError, PropertyError
 
 if TYPE_CHECKING:  # pragma: no cover
+    from .enum_property import EnumProperty
+    from .literal_enum_property import LiteralEnumProperty
     from .model_property import ModelProperty
     from .property import Property
 else:
+    EnumProperty = "EnumProperty"
+    LiteralEnumProperty = "LiteralEnumProperty"
     ModelProperty = "ModelProperty"
     Property = "Property"
 
 
 ReferencePath = NewType("ReferencePath", str)
+# The properties which generate a class of their own
+InlineClass = Union[EnumProperty, LiteralEnumProperty, ModelProperty]
 
 
 def parse_reference_path(ref_path_raw: str) -> Union[ReferencePath, ParseError]:
@@ -79,15 +90,40 @@ class Class:
         return Class(name=class_name, module_name=module_name)
 
 
+_MISSING = object()
+
+
+@define
+class SchemasCheckpoint:
+    """A point in the history of a `Schemas` which it can be rolled back to. Get one from `Schemas.checkpoint`."""
+
+    journal_length: int
+    merge_journal_length: int
+    models_to_process_length: int
+
+
 @define
 class Schemas:
-    """Structure for containing all defined, shareable, and reusable schemas (attr classes and Enums)"""
+    """Structure for containing all defined, shareable, and reusable schemas (attr classes and Enums)
+
+    Schemas are updated in place so that adding a class is O(1), but every function which updates them still returns
+    the `Schemas` to keep the functional style of the parser. A caller which needs to discard the changes from a failed
+    attempt (as if it had kept an older copy) should take a `checkpoint` first and `rollback` to it.
+    """
 
     classes_by_reference: dict[ReferencePath, Property] = field(factory=dict)
     dependencies: dict[ReferencePath, set[Union[ReferencePath, ClassName]]] = field(factory=dict)
     classes_by_name: dict[ClassName, Property] = field(factory=dict)
     models_to_process: list[ModelProperty] = field(factory=list)
     errors: list[ParseError] = field(factory=list)
+    # Inline models and enums by what they're made of, so identical ones can share a class (`deduplicate_inline_schemas`)
+    inline_classes_by_fingerprint: dict[Hashable, InlineClass] = field(factory=dict)
+    # The names of inline classes which weren't generated, by the name of the identical class used instead
+    merged_classes: dict[ClassName, set[ClassName]] = field(factory=dict)
+    # Every change to classes_by_name as (key, previous value or _MISSING), so that changes can be rolled back
+    _journal: list[tuple[ClassName, object]] = field(factory=list, init=False, eq=False, repr=False)
+    # Every addition to merged_classes as (name of the class used, name of the merged class), for the same reason
+    _merge_journal: list[tuple[ClassName, ClassName]] = field(factory=list, init=False, eq=False, repr=False)
 
     def add_dependencies(self, ref_path: ReferencePath, roots: set[Union[ReferencePath, ClassName]]) -> None:
         """Record new dependencies on the given ReferencePath
@@ -99,6 +135,69 @@ class Schemas:
         self.dependencies.setdefault(ref_path, set())
         self.dependencies[ref_path].update(roots)
 
+    def set_class_by_name(self, name: ClassName, prop: Property) -> None:
+        """Add (or replace) the class which will be generated with `name`"""
+        self._journal.append((name, self.classes_by_name.get(name, _MISSING)))
+        self.classes_by_name[name] = prop
+
+    def add_model_to_process(self, model: ModelProperty) -> None:
+        """Queue a ModelProperty to have its properties filled in by `process_model`"""
+        self.models_to_process.append(model)
+
+    def add_inline_class(self, fingerprint: Hashable, prop: InlineClass) -> None:
+        """Record an inline model or enum which later inline schemas with the same `fingerprint` can use instead"""
+        self.inline_classes_by_fingerprint.setdefault(fingerprint, prop)
+
+    def identical_inline_class(self, fingerprint: Hashable, name: ClassName) -> Optional[InlineClass]:
+        """Get the inline class with `fingerprint` to use instead of creating one called `name`, if there is one"""
+        existing = self.inline_classes_by_fingerprint.get(fingerprint)
+        # A class can be removed after it's added (e.g., if the model it's inside of fails to process)
+        if existing is None or self.classes_by_name.get(existing.class_info.name) is not existing:
+            return None
+        used = existing.class_info.name
+        if used != name and name not in self.merged_classes.get(used, ()):
+            self.merged_classes.setdefault(used, set()).add(name)
+            self._merge_journal.append((used, name))
+        return existing
+
+    def checkpoint(self) -> SchemasCheckpoint:
+        """Record the current state of the classes and models to process, so it can be restored with `rollback`"""
+        return SchemasCheckpoint(
+            journal_length=len(self._journal),
+            merge_journal_length=len(self._merge_journal),
+            models_to_process_length=len(self.models_to_process),
+        )
+
+    def rollback(self, checkpoint: SchemasCheckpoint) -> None:
+        """Undo every class, merged class, and model to process which was added since `checkpoint` was taken
+
+        `dependencies` and `errors` are deliberately kept, since they describe what was attempted.
+        """
+        while len(self._journal) > checkpoint.journal_length:
+            name, previous = self._journal.pop()
+            if previous is _MISSING:
+                self.classes_by_name.pop(name, None)
+            else:
+                self.classes_by_name[name] = cast(Property, previous)
+        while len(self._merge_journal) > checkpoint.merge_journal_length:
+            used, merged = self._merge_journal.pop()
+            self.merged_classes[used].discard(merged)
+            if not self.merged_classes[used]:
+                del self.merged_classes[used]
+        del self.models_to_process[checkpoint.models_to_process_length :]
+
+
+def inline_schema_fingerprint(data: oai.Schema) -> str:
+    """Identify an inline schema by its structure, so that identical ones can share a class.
+
+    Keys are compared regardless of their order and of whether default values are written out. `title`, `example`, and
+    `examples` only name or illustrate the schema itself, so are ignored.
+    """
+    normalized = data.model_dump(
+        mode="json", by_alias=True, exclude_defaults=True, exclude={"title", "example", "examples"}
+    )
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
 
 def update_schemas_with_data(
     *, ref_path: ReferencePath, data: oai.Schema, schemas: Schemas, config: Config
@@ -120,6 +219,7 @@ def update_schemas_with_data(
     """
     from . import property_from_data
 
+    checkpoint = schemas.checkpoint()
     prop: Union[PropertyError, Property]
     prop, schemas = property_from_data(
         data=data,
@@ -134,6 +234,7 @@ def update_schemas_with_data(
     )
 
     if isinstance(prop, PropertyError):
+        schemas.rollback(checkpoint)
         prop.detail = f"{prop.header}: {prop.detail}"
         prop.header = f"Unable to parse schema {ref_path}"
         if isinstance(prop.data, oai.Reference) and prop.data.ref.endswith(ref_path):  # pragma: nocover
@@ -142,13 +243,17 @@ def update_schemas_with_data(
             )
         return prop
 
-    schemas = evolve(schemas, classes_by_reference={ref_path: prop, **schemas.classes_by_reference})
+    # If a reference is processed again (e.g., while retrying references in a cycle), the first property for it is kept
+    schemas.classes_by_reference.setdefault(ref_path, prop)
     return schemas
 
 
 @define
 class Parameters:
-    """Structure for containing all defined, shareable, and reusable parameters"""
+    """Structure for containing all defined, shareable, and reusable parameters
+
+    Like `Schemas`, this is updated in place by the functions which return it.
+    """
 
     classes_by_reference: dict[ReferencePath, Parameter] = field(factory=dict)
     classes_by_name: dict[ClassName, Parameter] = field(factory=dict)
@@ -178,9 +283,7 @@ def parameter_from_data(
         param_schema=data.param_schema,
         param_in=data.param_in,
     )
-    parameters = evolve(
-        parameters, classes_by_name={**parameters.classes_by_name, ClassName(name, config.field_prefix): new_param}
-    )
+    parameters.classes_by_name[ClassName(name, config.field_prefix)] = new_param
     return new_param, parameters
 
 
@@ -213,7 +316,7 @@ def update_parameters_with_data(
             )
         return param
 
-    parameters = evolve(parameters, classes_by_reference={ref_path: param, **parameters.classes_by_reference})
+    parameters.classes_by_reference.setdefault(ref_path, param)
     return parameters
 
 
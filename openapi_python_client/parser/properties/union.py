@@ -3,13 +3,13 @@ from __future__ import annotations
 from itertools import chain
 from typing import Any, ClassVar, cast
 
-from attr import define, evolve
+from attr import define, evolve, field
 
 from ... import Config
 from ... import schema as oai
 from ...utils import PythonIdentifier
 from ..errors import ParseError, PropertyError
-from .protocol import PropertyProtocol, Value
+from .protocol import PropertyProtocol, Value, cached_value
 from .schemas import Schemas
 
 
@@ -25,6 +25,7 @@ class UnionProperty(PropertyProtocol):
     example: str | None
     inner_properties: list[PropertyProtocol]
     template: ClassVar[str] = "union_property.py.jinja"
+    _cached_values: dict[Any, Any] = field(factory=dict, init=False, eq=False, repr=False)
 
     @classmethod
     def build(
@@ -106,6 +107,7 @@ class UnionProperty(PropertyProtocol):
                 return value_or_error
         return value_or_error
 
+    @cached_value
     def _get_inner_type_strings(self, json: bool, multipart: bool) -> set[str]:
         return {
             p.get_type_string(no_optional=True, json=json, multipart=multipart, quoted=not p.is_base_type)
@@ -118,9 +120,11 @@ class UnionProperty(PropertyProtocol):
             return inner_types.pop()
         return f"Union[{', '.join(sorted(inner_types))}]"
 
+    @cached_value
     def get_base_type_string(self, *, quoted: bool = False) -> str:
         return self._get_type_string_from_inner_type_strings(self._get_inner_type_strings(json=False, multipart=False))
 
+    @cached_value
     def get_base_json_type_string(self, *, quoted: bool = False) -> str:
         return self._get_type_string_from_inner_type_strings(self._get_inner_type_strings(json=True, multipart=False))
 
@@ -145,6 +149,7 @@ class UnionProperty(PropertyProtocol):
             type_strings.add("Unset")
         return type_strings
 
+    @cached_value
     def get_type_string(
         self,
         no_optional: bool = False,
@@ -161,6 +166,7 @@ class UnionProperty(PropertyProtocol):
         type_strings_in_union = self.get_type_strings_in_union(no_optional=no_optional, json=json, multipart=multipart)
         return self._get_type_string_from_inner_type_strings(type_strings_in_union)
 
+    @cached_value
     def get_imports(self, *, prefix: str) -> set[str]:
         """
         Get a set of import strings that should be included when this property is used somewhere
@@ -169,14 +175,15 @@ class UnionProperty(PropertyProtocol):
             prefix: A prefix to put before any relative (local) module names. This should be the number of . to get
             back to the root of the generated client.
         """
-        imports = super().get_imports(prefix=prefix)
+        imports = PropertyProtocol.get_imports(self, prefix=prefix)
         for inner_prop in self.inner_properties:
             imports.update(inner_prop.get_imports(prefix=prefix))
         imports.add("from typing import cast, Union")
         return imports
 
+    @cached_value
     def get_lazy_imports(self, *, prefix: str) -> set[str]:
-        lazy_imports = super().get_lazy_imports(prefix=prefix)
+        lazy_imports = PropertyProtocol.get_lazy_imports(self, prefix=prefix)
         for inner_prop in self.inner_properties:
             lazy_imports.update(inner_prop.get_lazy_imports(prefix=prefix))
         return lazy_imports
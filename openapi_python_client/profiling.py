@@ -0,0 +1,132 @@
+"""Recording where generating a client spends time and memory, as a Chrome trace.
+
+Wrap the code to profile in `profile()`, then open the written file in a trace viewer (like `chrome://tracing` or
+https://ui.perfetto.dev). Phases of the generator mark themselves with `span()` (and add what they find out while running
+with `annotate()`), which do nothing unless a profile is being recorded.
+"""
+
+__all__ = ["Profiler", "annotate", "profile", "span"]
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Optional
+
+from attrs import define
+
+_active: Optional["Profiler"] = None
+
+
+@define
+class _OpenSpan:
+    start_ns: int
+    start_memory: int
+    peak_memory: int
+    args: dict[str, Any]
+
+
+class Profiler:
+    """Collects spans as Chrome trace events"""
+
+    def __init__(self) -> None:
+        self.events: list[dict[str, Any]] = []
+        self._stack: list[_OpenSpan] = []
+        self._pid = os.getpid()
+        self.thread_id = threading.get_ident()
+
+    @contextmanager
+    def span(self, name: str, category: str, args: dict[str, Any]) -> Iterator[None]:
+        """Record how long the body takes and the peak memory allocated while it runs"""
+        # tracemalloc only tracks one peak, so reset it for every span and pass the peak up to the enclosing span
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1].peak_memory = max(self._stack[-1].peak_memory, peak_memory)
+        tracemalloc.reset_peak()
+        open_span = _OpenSpan(
+            start_ns=time.perf_counter_ns(), start_memory=current_memory, peak_memory=current_memory, args=dict(args)
+        )
+        self._stack.append(open_span)
+        try:
+            yield
+        finally:
+            end_ns = time.perf_counter_ns()
+            current_memory, peak_memory = tracemalloc.get_traced_memory()
+            self._stack.pop()
+            open_span.peak_memory = max(open_span.peak_memory, peak_memory)
+            if self._stack:
+                self._stack[-1].peak_memory = max(self._stack[-1].peak_memory, open_span.peak_memory)
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": open_span.start_ns / 1000,
+                    "dur": (end_ns - open_span.start_ns) / 1000,
+                    "pid": self._pid,
+                    "tid": self.thread_id,
+                    "args": {
+                        **open_span.args,
+                        "peak_memory_bytes": open_span.peak_memory,
+                        "allocated_bytes": open_span.peak_memory - open_span.start_memory,
+                        "retained_bytes": current_memory - open_span.start_memory,
+                    },
+                }
+            )
+
+    def annotate(self, args: dict[str, Any]) -> None:
+        """Add `args` to the innermost span which is still running"""
+        if self._stack:
+            self._stack[-1].args.update(args)
+
+    def write(self, path: Path) -> None:
+        """Write the recorded spans to `path` in the Chrome trace event format"""
+        events = sorted(self.events, key=lambda event: event["ts"])
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+
+
+@contextmanager
+def profile(path: Path) -> Iterator[Profiler]:
+    """Record spans (and memory allocations) from everything run in this context, then write them to `path`"""
+    global _active  # noqa: PLW0603
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = Profiler()
+    _active = profiler
+    try:
+        with profiler.span("generate", "generator", {}):
+            yield profiler
+    finally:
+        _active = None
+        if started_tracing:
+            tracemalloc.stop()
+        profiler.write(path)
+
+
+_NO_SPAN = nullcontext()
+
+
+def span(name: str, category: str = "generator", **args: Any) -> AbstractContextManager[None]:
+    """Record the enclosed code as a span named `name` if a profile is being recorded.
+
+    Extra keyword arguments are shown with the span in trace viewers.
+    """
+    profiler = _active
+    # Spans can only nest on the thread which is being profiled
+    if profiler is None or threading.get_ident() != profiler.thread_id:
+        return _NO_SPAN
+    return profiler.span(name, category, args)
+
+
+def annotate(**args: Any) -> None:
+    """Show the keyword arguments with the innermost running span in trace viewers, if a profile is being recorded"""
+    profiler = _active
+    if profiler is None or threading.get_ident() != profiler.thread_id:
+        return
+    profiler.annotate(args)
@@ -1,4 +1,5 @@
 __all__ = [
+    "Components",
     "DataType",
     "MediaType",
     "OpenAPI",
@@ -17,6 +18,7 @@ __all__ = [
 
 from .data_type import DataType
 from .openapi_schema_pydantic import (
+    Components,
     MediaType,
     OpenAPI,
     Operation,
@@ -0,0 +1,325 @@
+"""Tidying rendered Python code in-process, so that generated clients are readable without running formatters"""
+
+__all__ = ["tidy_python"]
+
+import ast
+import re
+import sys
+from collections.abc import Iterable
+from typing import Optional, Union
+
+from attrs import define, field
+
+LINE_LENGTH = 120
+
+# Modules the default templates import from the standard library, for Python versions without `stdlib_module_names`
+_STDLIB_FALLBACK = frozenset(
+    ("collections", "contextlib", "datetime", "enum", "http", "io", "json", "ssl", "types", "typing", "uuid")
+)
+_STDLIB = frozenset(getattr(sys, "stdlib_module_names", _STDLIB_FALLBACK))
+_WORD = re.compile(r"\w+")
+_DIGITS = re.compile(r"([0-9]+)")
+# Comments and string literals, so that the content of strings isn't mistaken for code
+_STRINGS_AND_COMMENTS = re.compile(
+    r"#[^\n]*"
+    r"|'''(?:\\.|[^\\])*?'''"
+    r'|"""(?:\\.|[^\\])*?"""'
+    r"|'(?:\\.|[^'\\\n])*'"
+    r'|"(?:\\.|[^"\\\n])*"',
+    re.DOTALL,
+)
+_BLOCK_STARTS = ("def ", "async def ", "class ", "@")
+_CLOSING = (")", "]", "}")
+
+
+def _section(node: Union[ast.Import, ast.ImportFrom]) -> int:
+    """Order groups of imports like isort: `__future__`, the standard library, third-party, then relative imports"""
+    if isinstance(node, ast.ImportFrom) and node.level:
+        return 3
+    module = node.module if isinstance(node, ast.ImportFrom) else node.names[0].name
+    top_level = (module or "").split(".")[0]
+    if top_level == "__future__":
+        return 0
+    if top_level in _STDLIB:
+        return 1
+    return 2
+
+
+def _name_order(name: str) -> tuple[int, tuple[Union[str, int], ...], str]:
+    """Constants, then classes, then everything else, like Ruff's `order-by-type`, with numbers in natural order"""
+    if name.isupper() and len(name) > 1:
+        kind = 0
+    elif name[:1].isupper():
+        kind = 1
+    else:
+        kind = 2
+    natural = tuple(int(part) if index % 2 else part for index, part in enumerate(_DIGITS.split(name.lower())))
+    return kind, natural, name
+
+
+def _from_statements(module: str, names: Iterable[tuple[str, str]], line_length: int) -> list[str]:
+    statements = []
+    plain = sorted({name for name, as_name in names if not as_name}, key=_name_order)
+    if plain:
+        statement = f"from {module} import {', '.join(plain)}"
+        if len(statement) > line_length:
+            statement = f"from {module} import (\n" + "".join(f"    {name},\n" for name in plain) + ")"
+        statements.append(statement)
+    for name, as_name in sorted({pair for pair in names if pair[1]}, key=lambda pair: _name_order(pair[0])):
+        statements.append(f"from {module} import {name} as {as_name}")
+    return statements
+
+
+@define
+class _Section:
+    """The imports in one group, as `(name, as_name)` pairs"""
+
+    imports: set[tuple[str, str]] = field(factory=set)
+    from_imports: dict[tuple[int, str], set[tuple[str, str]]] = field(factory=dict)
+
+    def render(self, line_length: int) -> str:
+        statements = [
+            f"import {name} as {as_name}" if as_name else f"import {name}"
+            for name, as_name in sorted(self.imports, key=lambda pair: (pair[0].lower(), pair))
+        ]
+        # Relative imports go from the furthest parent to the closest
+        for (level, module), names in sorted(self.from_imports.items(), key=lambda item: (-item[0][0], item[0][1])):
+            statements.extend(_from_statements("." * level + module, names, line_length))
+        return "".join(f"{statement}\n" for statement in statements)
+
+
+def _string_lines(source: str) -> set[int]:
+    """The (0-based) lines which are part of a multi-line string, so must not be changed"""
+    protected: set[int] = set()
+    line, position = 0, 0
+    for match in _STRINGS_AND_COMMENTS.finditer(source):
+        newlines = match.group().count("\n")
+        if not newlines or match.group().startswith("#"):
+            continue
+        line += source.count("\n", position, match.start())
+        position = match.end()
+        protected.update(range(line, line + newlines + 1))
+        line += newlines
+    return protected
+
+
+def _indentation(line: str) -> str:
+    return line[: len(line) - len(line.lstrip())]
+
+
+def _block_end(lines: list[str], index: int, indent: str) -> int:
+    """The line after the imports (indented by `indent`) which start at `index`, or `index` if there are none"""
+    end = index
+    depth, continued = 0, False
+    while index < len(lines):
+        line = lines[index].rstrip()
+        if (
+            depth
+            or continued
+            or (_indentation(line) == indent and line[len(indent) :].startswith(("import ", "from ")))
+        ):
+            depth += line.count("(") - line.count(")")
+            continued = line.endswith("\\")
+            end = index + 1
+        elif line:
+            break
+        index += 1
+    return end
+
+
+def _import_blocks(lines: list[str], protected: set[int]) -> list[tuple[int, int, str]]:
+    """Find the imports at the top of a module (after any docstring) and every indented group of imports after that,
+    as ranges of line indexes and the indentation of the imports in them
+    """
+    index = 0
+    while index < len(lines) and (
+        not lines[index].strip() or index in protected or lines[index].startswith(("'", '"'))
+    ):
+        index += 1
+    blocks = []
+    end = _block_end(lines, index, "")
+    if end > index:
+        blocks.append((index, end, ""))
+        index = end
+    while index < len(lines):
+        line = lines[index]
+        indent = _indentation(line)
+        if not indent or index in protected or not line.lstrip().startswith(("import ", "from ")):
+            index += 1
+            continue
+        end = _block_end(lines, index, indent)
+        blocks.append((index, end, indent))
+        index = end
+    return blocks
+
+
+def _is_code(lines: list[str], index: int, protected: set[int]) -> bool:
+    """Whether the line at `index` starts a statement (or is part of one), rather than being blank or in a string"""
+    return bool(lines[index].strip()) and index not in protected and not lines[index].lstrip().startswith(_CLOSING)
+
+
+def _function_body_end(lines: list[str], first: int, indent: str, protected: set[int]) -> Optional[int]:
+    """If the imports at `first` (indented by `indent`) are in the body of a function, the line after that body.
+
+    Imports in other blocks (like `if TYPE_CHECKING:`) may be used anywhere in the module.
+    """
+    index = first - 1
+    while index >= 0 and not (_is_code(lines, index, protected) and len(_indentation(lines[index])) < len(indent)):
+        index -= 1
+    if index < 0 or not lines[index].lstrip().startswith(("def ", "async def ")):
+        return None
+    index = first
+    while index < len(lines) and not (
+        _is_code(lines, index, protected) and len(_indentation(lines[index])) < len(indent)
+    ):
+        index += 1
+    return index
+
+
+def _is_whole_body(lines: list[str], first: int, last: int, indent: str) -> bool:
+    """Whether the lines from `first` to `last` are everything in the body of a block, which can't be empty"""
+    before = next((line for line in reversed(lines[:first]) if line.strip()), "")
+    after = next((line for line in lines[last:] if line.strip()), "")
+    return before.rstrip().endswith(":") and len(_indentation(after)) < len(indent)
+
+
+def _render_imports(block: list[str], indent: str, used: Optional[set[str]]) -> Optional[str]:
+    """Merge, deduplicate, and sort the imports in `block`, dropping those whose names aren't in `used` (if given).
+
+    Returns None if the imports can't be rearranged.
+    """
+    if any("#" in line for line in block):
+        return None  # Comments (like `noqa`) can't be moved around safely
+    try:
+        nodes = ast.parse("".join(line[len(indent) :] if line.startswith(indent) else line.lstrip() for line in block))
+    except SyntaxError:
+        return None
+
+    def is_used(bound_name: str) -> bool:
+        return used is None or bound_name in used
+
+    sections: list[_Section] = [_Section() for _ in range(4)]
+    for node in nodes.body:
+        if not isinstance(node, (ast.Import, ast.ImportFrom)):
+            return None
+        section = _section(node)
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if is_used(alias.asname or alias.name.split(".")[0]):
+                    sections[section].imports.add((alias.name, alias.asname or ""))
+            continue
+        names = sections[section].from_imports.setdefault((node.level, node.module or ""), set())
+        for alias in node.names:
+            if section == 0 or alias.name == "*" or is_used(alias.asname or alias.name):
+                names.add((alias.name, alias.asname or ""))
+
+    rendered = "\n".join(filter(None, (section.render(LINE_LENGTH - len(indent)) for section in sections)))
+    return "".join(indent + line if line.strip() else line for line in rendered.splitlines(keepends=True))
+
+
+def _tidy_imports(source: str, *, remove_unused: bool, protected: set[int]) -> str:
+    """Merge, deduplicate, and sort the imports at the top of a module and in indented blocks (like functions),
+    optionally dropping those which aren't used.
+
+    Imports in a function only count as used if the rest of the function uses them, all others if anything in the
+    module outside of imports does.
+    """
+    lines = source.splitlines(keepends=True)
+    blocks = _import_blocks(lines, protected)
+    import_lines = {index for first, last, _ in blocks for index in range(first, last)}
+
+    def used_in(start: int, end: int) -> Optional[set[str]]:
+        if not remove_unused:
+            return None
+        return set(_WORD.findall("".join(lines[index] for index in range(start, end) if index not in import_lines)))
+
+    used_in_module = used_in(0, len(lines))
+    output: list[str] = []
+    position = 0
+    for first, last, indent in blocks:
+        function_end = _function_body_end(lines, first, indent, protected) if indent else None
+        used = used_in_module if function_end is None else used_in(last, function_end)
+        rendered = _render_imports(lines[first:last], indent, used)
+        if rendered is None or (not rendered and indent and _is_whole_body(lines, first, last, indent)):
+            continue
+        output.extend(lines[position:first])
+        position = last
+        if not indent:
+            # Separate the imports from the docstring before them, and by one blank line from the code after them
+            # (which gets two if it's a function or class)
+            if first and lines[first - 1].strip():
+                rendered = "\n" + rendered
+            while position < len(lines) and not lines[position].strip():
+                position += 1
+            if position < len(lines):
+                rendered += "\n"
+        output.append(rendered)
+    output.extend(lines[position:])
+    return "".join(output)
+
+
+def _tidy_lines(source: str, protected: set[int]) -> str:
+    """Strip trailing whitespace and remove the blank lines which templates leave behind, roughly like a formatter"""
+    output: list[str] = []
+    blank_lines = 0
+    # Whether the last top-level statement was a function or class, which needs two blank lines after it
+    after_block = False
+    for index, line in enumerate(source.splitlines()):
+        if index in protected:
+            output.extend([""] * blank_lines)
+            blank_lines = 0
+            output.append(line)
+            continue
+        line = line.rstrip()  # noqa: PLW2901
+        if not line:
+            blank_lines += 1
+            continue
+        stripped = line.lstrip()
+        previous = output[-1] if output else ""
+        if not output or previous.endswith(("(", "[", "{", ":")) or stripped.startswith((")", "]", "}")):
+            blank_lines = 0
+        elif stripped != line:
+            blank_lines = min(blank_lines, 1)
+        elif previous.startswith(("@", "#")):
+            blank_lines = min(blank_lines, 2)
+        elif after_block or stripped.startswith(_BLOCK_STARTS):
+            blank_lines = 2
+        else:
+            blank_lines = min(blank_lines, 2)
+        if stripped == line and not stripped.startswith((")", "]", "}")):
+            after_block = stripped.startswith(_BLOCK_STARTS)
+        output.extend([""] * blank_lines)
+        blank_lines = 0
+        output.append(line)
+    return "\n".join(output) + "\n"
+
+
+def _tidy_docstrings(source: str) -> str:
+    """Remove the whitespace between the quotes and the text of docstrings (and trailing whitespace in them)"""
+
+    def tidy(match: re.Match[str]) -> str:
+        string = match.group()
+        if not string.startswith('"""') or source[source.rfind("\n", 0, match.start()) + 1 : match.start()].strip():
+            return string  # Only strings which start a line are docstrings (and Ruff leaves raw ones alone)
+        lines = string[3:-3].split("\n")
+        lines[0] = lines[0].lstrip(" \t")
+        lines[:-1] = [line.rstrip() for line in lines[:-1]]
+        if lines[-1].strip() or len(lines) == 1:
+            lines[-1] = lines[-1].rstrip()
+        return '"""' + "\n".join(lines) + '"""'
+
+    return _STRINGS_AND_COMMENTS.sub(tidy, source)
+
+
+def tidy_python(source: str, *, remove_unused_imports: bool = True) -> str:
+    """Clean up Python code rendered from templates: sort and merge imports, remove unused imports (unless
+    `remove_unused_imports` is False, e.g. for `__init__.py` files which re-export names), strip whitespace from
+    docstrings and the ends of lines, and remove extra blank lines.
+
+    The result passes Ruff's import sorting and unused import checks, but isn't formatted like Ruff would (long lines
+    aren't wrapped, for example). To keep this much faster than running a formatter, only imports are parsed (and left
+    as they are if that fails), the rest of the code is handled line by line.
+    """
+    source = _tidy_docstrings(source)
+    tidied = _tidy_imports(source, remove_unused=remove_unused_imports, protected=_string_lines(source))
+    return _tidy_lines(tidied, _string_lines(tidied))
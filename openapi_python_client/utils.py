@@ -3,57 +3,90 @@ from __future__ import annotations
 import builtins
 import re
 from email.message import Message
+from functools import lru_cache
 from keyword import iskeyword
-from typing import Any
+from typing import Any, NamedTuple
 
 from .config import Config
 
 DELIMITERS = r"\. _-"
 
+# The same names are converted over and over again while parsing and rendering, so all the pure string transformations
+# in this module are memoized. The caches are bounded so that huge documents can't use unlimited memory.
+CACHE_SIZE = 16384
+
+_NOT_ALLOWED_CHARACTERS = re.compile(rf"[^\w{DELIMITERS}]+")
+_WORD = re.compile("([A-Z]?[a-z]+)")
+_NOT_DELIMITERS = re.compile(rf"[^{DELIMITERS}]+")
+
 
 class PythonIdentifier(str):
     """A snake_case string which has been validated / transformed into a valid identifier for Python"""
 
     def __new__(cls, value: str, prefix: str, skip_snake_case: bool = False) -> PythonIdentifier:
-        new_value = sanitize(value)
-        if not skip_snake_case:
-            new_value = snake_case(new_value)
-        new_value = fix_reserved_words(new_value)
-
-        if not new_value.isidentifier() or value.startswith("_"):
-            new_value = f"{prefix}{new_value}"
-        return str.__new__(cls, new_value)
+        return str.__new__(cls, _python_identifier(value, prefix, skip_snake_case))
 
     def __deepcopy__(self, _: Any) -> PythonIdentifier:
         return self
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # The value is already valid, so unpickling shouldn't run it through __new__ again
+        return str.__new__, (self.__class__, str(self))
+
 
 class ClassName(str):
     """A PascalCase string which has been validated / transformed into a valid class name for Python"""
 
     def __new__(cls, value: str, prefix: str) -> ClassName:
-        new_value = fix_reserved_words(pascal_case(sanitize(value)))
-
-        if not new_value.isidentifier():
-            value = f"{prefix}{new_value}"
-            new_value = fix_reserved_words(pascal_case(sanitize(value)))
-        return str.__new__(cls, new_value)
+        return str.__new__(cls, _class_name(value, prefix))
 
     def __deepcopy__(self, _: Any) -> ClassName:
         return self
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # The value is already valid, so unpickling shouldn't run it through __new__ again
+        return str.__new__, (self.__class__, str(self))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _python_identifier(value: str, prefix: str, skip_snake_case: bool) -> str:
+    new_value = sanitize(value)
+    if not skip_snake_case:
+        new_value = snake_case(new_value)
+    new_value = fix_reserved_words(new_value)
+
+    if not new_value.isidentifier() or value.startswith("_"):
+        new_value = f"{prefix}{new_value}"
+    return new_value
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _class_name(value: str, prefix: str) -> str:
+    new_value = fix_reserved_words(pascal_case(sanitize(value)))
+
+    if not new_value.isidentifier():
+        value = f"{prefix}{new_value}"
+        new_value = fix_reserved_words(pascal_case(sanitize(value)))
+    return new_value
+
 
+@lru_cache(maxsize=CACHE_SIZE)
 def sanitize(value: str) -> str:
     """Removes every character that isn't 0-9, A-Z, a-z, or a known delimiter"""
-    return re.sub(rf"[^\w{DELIMITERS}]+", "", value)
+    return _NOT_ALLOWED_CHARACTERS.sub("", value)
 
 
 def split_words(value: str) -> list[str]:
     """Split a string on words and known delimiters"""
+    return list(_split_words(value))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _split_words(value: str) -> tuple[str, ...]:
     # We can't guess words if there is no capital letter
     if any(c.isupper() for c in value):
-        value = " ".join(re.split("([A-Z]?[a-z]+)", value))
-    return re.findall(rf"[^{DELIMITERS}]+", value)
+        value = " ".join(_WORD.split(value))
+    return tuple(_NOT_DELIMITERS.findall(value))
 
 
 RESERVED_WORDS = (set(dir(builtins)) | {"self", "true", "false", "datetime"}) - {
@@ -76,22 +109,25 @@ def fix_reserved_words(value: str) -> str:
     return value
 
 
+@lru_cache(maxsize=CACHE_SIZE)
 def snake_case(value: str) -> str:
     """Converts to snake_case"""
-    words = split_words(sanitize(value))
+    words = _split_words(sanitize(value))
     return "_".join(words).lower()
 
 
+@lru_cache(maxsize=CACHE_SIZE)
 def pascal_case(value: str) -> str:
     """Converts to PascalCase"""
-    words = split_words(sanitize(value))
+    words = _split_words(sanitize(value))
     capitalized_words = (word.capitalize() if not word.isupper() else word for word in words)
     return "".join(capitalized_words)
 
 
+@lru_cache(maxsize=CACHE_SIZE)
 def kebab_case(value: str) -> str:
     """Converts to kebab-case"""
-    words = split_words(sanitize(value))
+    words = _split_words(sanitize(value))
     return "-".join(words).lower()
 
 
@@ -111,6 +147,11 @@ def get_content_type(content_type: str, config: Config) -> str | None:
     Given a string representing a content type with optional parameters, returns the content type only
     """
     content_type = config.content_type_overrides.get(content_type, content_type)
+    return _parse_content_type(content_type)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_content_type(content_type: str) -> str | None:
     message = Message()
     message.add_header("Content-Type", content_type)
 
@@ -120,3 +161,35 @@ def get_content_type(content_type: str, config: Config) -> str | None:
         return None
 
     return parsed_content_type
+
+
+_CACHED_FUNCTIONS = {
+    "python_identifier": _python_identifier,
+    "class_name": _class_name,
+    "sanitize": sanitize,
+    "split_words": _split_words,
+    "snake_case": snake_case,
+    "pascal_case": pascal_case,
+    "kebab_case": kebab_case,
+    "get_content_type": _parse_content_type,
+}
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of the cache of one memoized function, the same as `functools.lru_cache` reports"""
+
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+
+
+def cache_info() -> dict[str, CacheInfo]:
+    """Get the hits, misses, and size of the cache for each memoized string transformation, for profiling"""
+    return {name: CacheInfo(*function.cache_info()) for name, function in _CACHED_FUNCTIONS.items()}
+
+
+def clear_caches() -> None:
+    """Empty the caches of every memoized string transformation (and reset their counters)"""
+    for function in _CACHED_FUNCTIONS.values():
+        function.cache_clear()
@@ -0,0 +1,118 @@
+"""Generating a client again whenever the document, the files it refers to, or custom templates change"""
+
+__all__ = ["POLL_INTERVAL", "Watcher", "watch"]
+
+import time
+from collections.abc import Callable, Iterable, Sequence
+from pathlib import Path
+from typing import NoReturn, Optional
+
+from attrs import define, field
+
+from .cache import RenderCache
+from .config import Config
+from .external_references import loaded_document_paths
+from .generator import Project, get_generator_data
+from .parser import GeneratorData
+from .parser.errors import GeneratorError
+
+# How often to check for changes, in seconds
+POLL_INTERVAL = 0.5
+
+# When each file was last modified and how big it is, at least one of which changes whenever it is written
+_Snapshot = dict[Path, tuple[int, int]]
+
+
+def _snapshot(paths: Iterable[Path]) -> _Snapshot:
+    snapshot: _Snapshot = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue  # Deleted, or in the middle of being replaced by an editor
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+@define
+class Watcher:
+    """Generates a client, then generates it again if anything it was generated from changed.
+
+    Everything which can be reused between runs is kept in memory: the document is only parsed again if it (or a file
+    it refers to) changed, templates are only compiled again if they changed, and only files whose template or context
+    changed are rendered again. Runs are incremental, so only files whose content changed are written.
+    """
+
+    config: Config
+    custom_template_path: Optional[Path] = None
+    render_cache: RenderCache = field(factory=RenderCache)
+    _openapi: Optional[GeneratorData] = None
+    # The files the document was read from and the custom templates, as of the last run
+    _document_files: _Snapshot = field(factory=dict)
+    _template_files: _Snapshot = field(factory=dict)
+
+    def _document_paths(self) -> set[Path]:
+        paths = loaded_document_paths()
+        if isinstance(self.config.document_source, Path):
+            paths.add(self.config.document_source.resolve())
+        return paths
+
+    def _template_paths(self) -> set[Path]:
+        if self.custom_template_path is None:
+            return set()
+        return {path for path in self.custom_template_path.rglob("*") if path.is_file()}
+
+    def changed(self) -> bool:
+        """Whether anything the client is generated from changed since the last run"""
+        return (
+            _snapshot(self._document_paths()) != self._document_files
+            or _snapshot(self._template_paths()) != self._template_files
+        )
+
+    def generate(self) -> Sequence[GeneratorError]:
+        """Generate the client, reusing as much of the last run as possible"""
+        # Taken before reading anything, so changes made while generating are picked up by the next run
+        document_files = _snapshot(self._document_paths())
+        template_files = _snapshot(self._template_paths())
+        if self._openapi is None or document_files != self._document_files:
+            openapi = get_generator_data(self.config)
+            # Files referred to for the first time are only known after parsing
+            document_files.update(_snapshot(self._document_paths() - document_files.keys()))
+            self._document_files = document_files
+            if isinstance(openapi, GeneratorError):
+                self._openapi = None
+                self._template_files = template_files
+                return [openapi]
+            self._openapi = openapi
+
+        env = self.render_cache.env
+        if template_files.keys() != self._template_files.keys() and env is not None and env.cache is not None:
+            # Jinja notices when loaded templates change, but not when a new custom template overrides a default one
+            env.cache.clear()
+        self._template_files = template_files
+
+        project = Project(
+            openapi=self._openapi,
+            config=self.config,
+            custom_template_path=self.custom_template_path,
+            render_cache=self.render_cache,
+        )
+        return project.build()
+
+
+def watch(
+    watcher: Watcher,
+    on_generated: Callable[[Sequence[GeneratorError], float], None],
+    *,
+    poll_interval: float = POLL_INTERVAL,
+) -> NoReturn:
+    """Generate with `watcher`, then again every time something changes, until interrupted.
+
+    After every run, `on_generated` is called with the errors and how many seconds generating took.
+    """
+    while True:
+        start = time.perf_counter()
+        errors = watcher.generate()
+        on_generated(errors, time.perf_counter() - start)
+        while not watcher.changed():
+            time.sleep(poll_interval)
@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from openapi_python_client.batch import BatchEntry, BatchManifest, generate_batch
+
+
+def _document(title: str) -> dict:
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": title, "version": "1.0.0"},
+        "paths": {"/things": {"get": {"operationId": "get_things", "responses": {}}}},
+        "components": {"schemas": {"Thing": {"type": "object", "properties": {"id": {"type": "integer"}}}}},
+    }
+
+
+def test_load_from_path_resolves_relative_paths(tmp_path: Path) -> None:
+    manifest = tmp_path / "clients.json"
+    manifest.write_text(
+        json.dumps(
+            {
+                "clients": [
+                    {"path": "first.yaml", "config": "config.yaml", "output_path": "out/first", "meta": "none"},
+                    {"url": "https://example.com/openapi.json"},
+                ]
+            }
+        )
+    )
+
+    clients = BatchManifest.load_from_path(manifest).clients
+
+    assert clients[0].path == tmp_path / "first.yaml"
+    assert clients[0].config == tmp_path / "config.yaml"
+    assert clients[0].output_path == tmp_path / "out" / "first"
+    assert clients[0].meta == "none"
+    assert clients[1].path is None
+    assert clients[1].source == "https://example.com/openapi.json"
+
+
+@pytest.mark.parametrize("workers", (1, 2))
+def test_generate_batch(tmp_path: Path, mocker, workers: int) -> None:
+    from openapi_python_client import generator
+
+    entries = []
+    for name in ("First", "Second"):
+        (tmp_path / f"{name}.json").write_text(json.dumps(_document(name)))
+        entries.append(BatchEntry(path=tmp_path / f"{name}.json", output_path=tmp_path / name))
+    (tmp_path / "config.yaml").write_text("class_overrides: {Thing: {class_name: Item, module_name: item}}\n")
+    entries[1].config = tmp_path / "config.yaml"
+    create_environment = mocker.spy(generator.Project, "_create_environment")
+
+    results = generate_batch(entries, meta_type="none", fast=True, workers=workers)
+
+    assert results == [[], []]
+    assert (tmp_path / "First" / "models" / "thing.py").is_file()
+    assert (tmp_path / "Second" / "models" / "item.py").is_file()
+    if workers == 1:
+        # Both clients use the same templates, which are only loaded and compiled once
+        assert create_environment.call_count <= 1
+
+
+def test_generate_batch_reports_errors_per_entry(tmp_path: Path) -> None:
+    (tmp_path / "openapi.json").write_text(json.dumps(_document("Valid")))
+    entries = [
+        BatchEntry(path=tmp_path / "openapi.json", url="https://example.com/openapi.json"),
+        BatchEntry(path=tmp_path / "openapi.json", config=tmp_path / "missing.yaml"),
+        BatchEntry(path=tmp_path / "openapi.json", output_path=tmp_path / "client"),
+    ]
+
+    results = generate_batch(entries, meta_type="none", fast=True)
+
+    assert [error.header for error in results[0]] == [
+        "Provide either path or url for each client in the manifest, not both"
+    ]
+    assert [error.header for error in results[1]] == [f"Unable to parse config {tmp_path / 'missing.yaml'}"]
+    assert results[2] == []
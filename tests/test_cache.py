@@ -0,0 +1,172 @@
+from pathlib import Path
+
+from attrs import evolve
+from jinja2 import DictLoader, Environment
+
+from openapi_python_client.cache import (
+    RenderCache,
+    fingerprint,
+    generator_data_cache_key,
+    load_generator_data,
+    store_generator_data,
+    template_bytecode_cache,
+)
+from openapi_python_client.config import Config
+from openapi_python_client.parser import GeneratorData
+from openapi_python_client.parser.properties import ModelProperty
+
+
+def _generator_data() -> GeneratorData:
+    return GeneratorData(
+        title="My Test API",
+        description=None,
+        version="1.0.0",
+        models=[],
+        errors=[],
+        endpoint_collections_by_tag={},
+        enums=[],
+    )
+
+
+class TestGeneratorDataCacheKey:
+    def test_same_inputs_same_key(self, config: Config) -> None:
+        assert generator_data_cache_key(b"doc", config, "1.0.0") == generator_data_cache_key(b"doc", config, "1.0.0")
+
+    def test_document_changes_key(self, config: Config) -> None:
+        assert generator_data_cache_key(b"doc", config, "1.0.0") != generator_data_cache_key(b"doc2", config, "1.0.0")
+
+    def test_version_changes_key(self, config: Config) -> None:
+        assert generator_data_cache_key(b"doc", config, "1.0.0") != generator_data_cache_key(b"doc", config, "1.0.1")
+
+    def test_parsing_config_changes_key(self, config: Config) -> None:
+        other_config = evolve(config, field_prefix="other_")
+
+        assert generator_data_cache_key(b"doc", config, "1.0.0") != generator_data_cache_key(
+            b"doc", other_config, "1.0.0"
+        )
+
+    def test_output_config_does_not_change_key(self, config: Config) -> None:
+        other_config = evolve(config, output_path=Path("somewhere/else"), post_hooks=[], overwrite=True)
+
+        assert generator_data_cache_key(b"doc", config, "1.0.0") == generator_data_cache_key(
+            b"doc", other_config, "1.0.0"
+        )
+
+
+def test_store_and_load_round_trip(tmp_path: Path) -> None:
+    data = _generator_data()
+
+    store_generator_data(tmp_path / "cache", "key", data)
+
+    assert load_generator_data(tmp_path / "cache", "key") == data
+    assert load_generator_data(tmp_path / "cache", "other_key") is None
+
+
+def test_load_ignores_corrupt_entries(tmp_path: Path) -> None:
+    (tmp_path / "key.pickle").write_bytes(b"not a pickle")
+
+    assert load_generator_data(tmp_path, "key") is None
+
+
+class TestTemplateBytecodeCache:
+    @staticmethod
+    def _environment(cache_dir: Path, templates: dict[str, str], version: str = "1.0.0") -> Environment:
+        return Environment(loader=DictLoader(templates), bytecode_cache=template_bytecode_cache(cache_dir, version))
+
+    def test_reuses_compiled_templates(self, tmp_path: Path) -> None:
+        templates = {"template.jinja": "Hello {{ name }}"}
+        assert self._environment(tmp_path, templates).get_template("template.jinja").render(name="a") == "Hello a"
+
+        cache = template_bytecode_cache(tmp_path, "1.0.0")
+        bucket = cache.get_bucket(Environment(), "template.jinja", None, templates["template.jinja"])
+
+        assert bucket.code is not None
+        assert self._environment(tmp_path, templates).get_template("template.jinja").render(name="b") == "Hello b"
+
+    def test_keyed_by_content(self, tmp_path: Path) -> None:
+        self._environment(tmp_path, {"template.jinja": "Before"}).get_template("template.jinja")
+
+        changed = self._environment(tmp_path, {"template.jinja": "After"}).get_template("template.jinja")
+
+        assert changed.render() == "After"
+        assert len(list((tmp_path / "templates").iterdir())) == 2
+
+    def test_unusable_directory(self, tmp_path: Path) -> None:
+        (tmp_path / "templates").write_text("not a directory")
+
+        assert template_bytecode_cache(tmp_path, "1.0.0") is None
+
+
+class TestFingerprint:
+    def test_same_contents_same_fingerprint(self, model_property_factory) -> None:
+        first = model_property_factory(description="A model")
+        second = model_property_factory(description="A model")
+
+        assert first is not second
+        assert fingerprint({"model": first}, {}) == fingerprint({"model": second}, {})
+
+    def test_changed_contents_change_fingerprint(self, model_property_factory) -> None:
+        before = model_property_factory(description="A model")
+        after = model_property_factory(description="Another model")
+
+        assert fingerprint({"model": before}, {}) != fingerprint({"model": after}, {})
+
+    def test_sets_are_unordered(self) -> None:
+        assert fingerprint({"b", "a", "c"}, {}) == fingerprint({"c", "b", "a"}, {})
+        assert fingerprint(["a", "b"], {}) != fingerprint(["b", "a"], {})
+
+    def test_recursive_models(self, model_property_factory, string_property_factory) -> None:
+        def recursive_model(description: str) -> ModelProperty:
+            model = model_property_factory(description=description)
+            model.details.required_properties = [string_property_factory(), model]
+            return model
+
+        memo: dict = {}
+        first = fingerprint(recursive_model("A model"), memo)
+
+        assert first is not None
+        assert first == fingerprint(recursive_model("A model"), memo)
+        assert first != fingerprint(recursive_model("Another model"), memo)
+
+    def test_deeply_nested(self) -> None:
+        nested: list = []
+        for _ in range(10_000):
+            nested = [nested]
+
+        assert fingerprint(nested, {}) is not None
+
+    def test_unknown_types(self) -> None:
+        assert fingerprint({"value": object()}, {}) is None
+
+
+class TestRenderCacheTemplateInputs:
+    @staticmethod
+    def _environment(templates: dict[str, str]) -> Environment:
+        return Environment(loader=DictLoader(templates))
+
+    def test_includes_referenced_templates(self) -> None:
+        templates = {
+            "model.jinja": '{% from "helpers.jinja" import helper %}{% import "props/" + kind as prop %}{{ name }}',
+            "helpers.jinja": "{% macro helper() %}{{ config }}{% endmacro %}",
+            "props/int.jinja": "int",
+            "unrelated.jinja": "unrelated",
+        }
+        cache = RenderCache()
+        inputs = cache.template_inputs(self._environment(templates), "model.jinja")
+
+        assert inputs is not None
+        digest, variables = inputs
+        assert variables == {"kind", "name", "config"}
+        for name, changed_digest in [
+            ("helpers.jinja", False),
+            ("props/int.jinja", False),
+            ("unrelated.jinja", True),
+        ]:
+            changed = cache.template_inputs(self._environment({**templates, name: "changed"}), "model.jinja")
+            assert changed is not None
+            assert (changed[0] == digest) is changed_digest, name
+
+    def test_templates_using_the_whole_document(self) -> None:
+        templates = {"api_init.jinja": "{% for tag in endpoint_collections_by_tag %}{{ tag }}{% endfor %}"}
+
+        assert RenderCache().template_inputs(self._environment(templates), "api_init.jinja") is None
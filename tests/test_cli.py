@@ -1,7 +1,17 @@
+import json
+import subprocess
+import sys
+
 from typer.testing import CliRunner
 
 runner = CliRunner()
 
+# Modules which take a long time to import and aren't needed until a client is actually generated
+SLOW_IMPORTS = ("httpx", "jinja2", "pydantic", "ruamel.yaml", "openapi_python_client.parser")
+# Importing the CLI takes under 200ms on a typical machine (mostly importing typer), and over 500ms with everything
+# above. This is generous, so that slow CI machines don't fail it.
+CLI_MAX_IMPORT_MS = 1000
+
 
 def test_version() -> None:
     from openapi_python_client.cli import app
@@ -12,6 +22,22 @@ def test_version() -> None:
     assert "openapi-python-client version: " in result.stdout
 
 
+def test_cli_startup_is_fast() -> None:
+    # Run in a fresh interpreter, since this test process has already imported everything
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import openapi_python_client.cli\n"
+        "print(round((time.perf_counter() - start) * 1000))\n"
+        f"print(','.join(module for module in {SLOW_IMPORTS!r} if module in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    import_time_ms, slow_imports = result.stdout.splitlines()
+
+    assert slow_imports == "", f"Importing the CLI imported {slow_imports} (took {import_time_ms}ms)"
+    assert int(import_time_ms) < CLI_MAX_IMPORT_MS
+
+
 def test_bad_config() -> None:
     from openapi_python_client.cli import app
 
@@ -49,3 +75,97 @@ class TestGenerate:
 
         assert result.exit_code == 1
         assert result.output == f"Unknown encoding : {file_encoding}\n"
+
+    def test_generate_passes_options_to_config(self, mocker, tmp_path) -> None:
+        from openapi_python_client.cli import app
+
+        generate = mocker.patch("openapi_python_client.generate", return_value=[])
+        cache_dir = tmp_path / "cache"
+
+        result = runner.invoke(
+            app,
+            [
+                "generate",
+                "--path=cool/path",
+                "--jobs=2",
+                "--incremental",
+                f"--cache-dir={cache_dir}",
+                "--fast",
+                "--low-memory",
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        config = generate.call_args.kwargs["config"]
+        assert config.jobs == 2
+        assert config.incremental is True
+        assert config.cache_dir == cache_dir
+        assert config.fast is True
+        assert config.low_memory is True
+
+    def test_generate_profile(self, mocker, tmp_path) -> None:
+        from openapi_python_client import profiling
+        from openapi_python_client.cli import app
+
+        def generate(**_kwargs):
+            with profiling.span("parse"):
+                return []
+
+        mocker.patch("openapi_python_client.generate", side_effect=generate)
+        trace_path = tmp_path / "trace.json"
+
+        result = runner.invoke(app, ["generate", "--path=cool/path", f"--profile={trace_path}"])
+
+        assert result.exit_code == 0, result.output
+        names = [event["name"] for event in json.loads(trace_path.read_text())["traceEvents"]]
+        assert names == ["generate", "parse"]
+
+
+class TestWatch:
+    def test_watch_is_incremental_and_fast(self, mocker) -> None:
+        from openapi_python_client.cli import app
+        from openapi_python_client.parser.errors import GeneratorError
+
+        def watch(watcher, on_generated):
+            on_generated([], 0.25)
+            on_generated([GeneratorError(header="Broken document")], 0.5)
+            raise KeyboardInterrupt
+
+        watch_for_changes = mocker.patch("openapi_python_client.watch.watch", side_effect=watch)
+
+        result = runner.invoke(app, ["watch", "--path=cool/path", "--jobs=2"])
+
+        assert result.exit_code == 0, result.output
+        config = watch_for_changes.call_args.args[0].config
+        assert config.incremental is True
+        assert config.fast is True
+        assert config.overwrite is True
+        assert config.jobs == 2
+        assert "Generated in 0.25s (0 files rendered, 0 unchanged)" in result.output
+        assert "Broken document" in result.output
+        assert result.output.endswith("Stopped watching\n")
+
+
+class TestGenerateBatch:
+    def test_generate_batch(self, mocker, tmp_path) -> None:
+        from openapi_python_client.cli import app
+        from openapi_python_client.parser.errors import GeneratorError
+
+        manifest = tmp_path / "clients.yaml"
+        manifest.write_text("clients:\n  - path: first.yaml\n  - url: https://example.com/openapi.json\n")
+        generate_batch = mocker.patch(
+            "openapi_python_client.batch.generate_batch", return_value=[[], [GeneratorError(header="Broken document")]]
+        )
+
+        result = runner.invoke(app, ["generate-batch", f"--manifest={manifest}", "--workers=2", "--fast"])
+
+        assert result.exit_code == 1
+        clients = generate_batch.call_args.args[0]
+        assert [client.source for client in clients] == [
+            str(tmp_path / "first.yaml"),
+            "https://example.com/openapi.json",
+        ]
+        assert generate_batch.call_args.kwargs["workers"] == 2
+        assert generate_batch.call_args.kwargs["fast"] is True
+        assert "Generating from https://example.com/openapi.json:" in result.output
+        assert "Broken document" in result.output
@@ -7,7 +7,7 @@ from typing import Any
 import pytest
 from ruamel.yaml import YAML as _YAML
 
-from openapi_python_client.config import ConfigFile
+from openapi_python_client.config import Config, ConfigFile, MetaType
 
 
 class YAML(_YAML):
@@ -59,3 +59,64 @@ def test_load_from_path(tmp_path: Path, filename, dump, relative) -> None:
     assert config.project_name_override == "project-name"
     assert config.package_name_override == "package_name"
     assert config.package_version_override == "package_version"
+
+
+@pytest.mark.parametrize(
+    "file_jobs,cli_jobs,expected",
+    [
+        (1, None, 1),
+        (4, None, 4),
+        (4, 2, 2),
+    ],
+)
+def test_jobs(file_jobs, cli_jobs, expected) -> None:
+    config = Config.from_sources(
+        ConfigFile(jobs=file_jobs),
+        MetaType.POETRY,
+        document_source=Path("openapi.yaml"),
+        file_encoding="utf-8",
+        overwrite=False,
+        output_path=None,
+        jobs=cli_jobs,
+    )
+
+    assert config.jobs == expected
+
+
+@pytest.mark.parametrize(
+    "file_fast,cli_fast,post_hooks,expected_post_hooks",
+    [
+        (False, False, None, ["ruff check --fix .", "ruff format ."]),
+        (True, False, None, []),
+        (False, True, None, []),
+        (False, True, ["echo hi"], ["echo hi"]),
+    ],
+)
+def test_fast(file_fast, cli_fast, post_hooks, expected_post_hooks) -> None:
+    config = Config.from_sources(
+        ConfigFile(fast=file_fast, post_hooks=post_hooks),
+        MetaType.POETRY,
+        document_source=Path("openapi.yaml"),
+        file_encoding="utf-8",
+        overwrite=False,
+        output_path=None,
+        fast=cli_fast,
+    )
+
+    assert config.fast is (file_fast or cli_fast)
+    assert config.post_hooks == expected_post_hooks
+
+
+def test_include_and_exclude() -> None:
+    config = Config.from_sources(
+        ConfigFile.load_from_str('{"include": {"tags": ["pets"]}, "exclude": {"paths": ["/pets/admin/*"]}}'),
+        MetaType.POETRY,
+        document_source=Path("openapi.yaml"),
+        file_encoding="utf-8",
+        overwrite=False,
+        output_path=None,
+    )
+
+    assert config.includes_operation(path="/pets/{id}", tags=["pets"], operation_id="get_pet")
+    assert not config.includes_operation(path="/pets/admin/stats", tags=["pets"], operation_id="get_stats")
+    assert not config.includes_operation(path="/users", tags=["users"], operation_id="get_users")
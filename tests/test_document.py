@@ -0,0 +1,72 @@
+import pytest
+
+from openapi_python_client import document
+from openapi_python_client.document import LoadedDocument, load_document
+from openapi_python_client.parser.errors import GeneratorError
+
+
+@pytest.mark.parametrize("content_type", ["application/json", "application/yaml", "text/plain", None])
+def test_load_document_json_regardless_of_content_type(content_type) -> None:
+    result = load_document(b' \n{"openapi": "3.1.0", "info": {"version": 1}}', content_type)
+
+    assert isinstance(result, LoadedDocument)
+    assert result.data == {"openapi": "3.1.0", "info": {"version": 1}}
+    assert result.parser == ("orjson" if document.orjson is not None else "json")
+
+
+def test_load_document_yaml() -> None:
+    result = load_document(b"openapi: 3.1.0\ninfo:\n  version: 1\n", "application/yaml")
+
+    assert isinstance(result, LoadedDocument)
+    assert result.data == {"openapi": "3.1.0", "info": {"version": 1}}
+    assert result.parser.startswith("ruamel.yaml")
+
+
+def test_load_document_yaml_flow_mapping() -> None:
+    result = load_document(b"{openapi: 3.1.0, info: {version: 1}}", None)
+
+    assert isinstance(result, LoadedDocument)
+    assert result.data == {"openapi": "3.1.0", "info": {"version": 1}}
+    assert result.parser.startswith("ruamel.yaml")
+
+
+def test_load_document_invalid_json() -> None:
+    result = load_document(b"{openapi: 3.1.0}", "application/json")
+
+    assert isinstance(result, GeneratorError)
+    assert result.header.startswith("Invalid JSON from provided source: ")
+
+
+def test_load_document_invalid_yaml() -> None:
+    result = load_document(b"openapi: [3.1.0", None)
+
+    assert isinstance(result, GeneratorError)
+    assert result.header.startswith("Invalid YAML from provided source: ")
+
+
+def test_load_document_keeps_large_integers_exact() -> None:
+    result = load_document(b'{"maximum": 18446744073709551616, "minimum": NaN}', None)
+
+    assert isinstance(result, LoadedDocument)
+    assert result.data["maximum"] == 18446744073709551616
+    assert isinstance(result.data["maximum"], int)
+    assert result.parser == "json"
+
+
+@pytest.mark.parametrize("number", [-9223372036854775809, 18446744073709551616])
+def test_load_document_keeps_integers_outside_64_bits_exact(number) -> None:
+    result = load_document(b'{"maximum": %d}' % number, None)
+
+    assert isinstance(result, LoadedDocument)
+    assert result.data == {"maximum": number}
+    assert result.parser == "json"
+
+
+def test_load_document_without_orjson(mocker) -> None:
+    mocker.patch.object(document, "orjson", None)
+
+    result = load_document(b'{"openapi": "3.1.0"}', None)
+
+    assert isinstance(result, LoadedDocument)
+    assert result.data == {"openapi": "3.1.0"}
+    assert result.parser == "json"
@@ -0,0 +1,173 @@
+import pytest
+
+from openapi_python_client import external_references
+from openapi_python_client.external_references import has_external_references, resolve_external_references
+from openapi_python_client.parser.errors import GeneratorError
+
+
+@pytest.mark.parametrize(
+    "document,expected",
+    [
+        (b'{"$ref": "#/components/schemas/Local"}', False),
+        (b"schema:\n  $ref: '#/components/schemas/Local'\n", False),
+        (b'{"$ref":"common.json#/components/schemas/Money"}', True),
+        (b"schema:\n  $ref: common.yaml#/components/schemas/Money\n", True),
+    ],
+)
+def test_has_external_references(document, expected) -> None:
+    assert has_external_references(document) is expected
+
+
+def _with_schema(schema: dict) -> dict:
+    return {"components": {"schemas": {"a": schema}}}
+
+
+def test_resolve_external_references(tmp_path) -> None:
+    (tmp_path / "common").mkdir()
+    (tmp_path / "common" / "money.yaml").write_text(
+        "components:\n"
+        "  schemas:\n"
+        "    Money:\n"
+        "      properties:\n"
+        "        currency: {$ref: 'currency.json'}\n"
+        "        next: {$ref: '#/components/schemas/Money'}\n"
+        "    Unused: {type: object}\n"
+    )
+    (tmp_path / "common" / "currency.json").write_text('{"type": "string", "enum": ["EUR"]}')
+    schema = {"$ref": "common/money.yaml#/components/schemas/Money"}
+    document = {
+        "paths": {"/": {"get": {"responses": {"200": {"content": {"application/json": {"schema": schema}}}}}}},
+        "components": {
+            "schemas": {
+                "Money": {"type": "integer"},
+                "Price": {"properties": {"money": {"$ref": "common/money.yaml#/components/schemas/Money"}}},
+            }
+        },
+    }
+
+    error = resolve_external_references(document, tmp_path / "openapi.yaml")
+
+    assert error is None
+    assert schema == {"$ref": "#/components/schemas/Money2"}
+    assert document["components"]["schemas"] == {
+        "Money": {"type": "integer"},
+        "Price": {"properties": {"money": {"$ref": "#/components/schemas/Money2"}}},
+        "Money2": {
+            "properties": {
+                "currency": {"$ref": "#/components/schemas/currency"},
+                "next": {"$ref": "#/components/schemas/Money2"},
+            }
+        },
+        "currency": {"type": "string", "enum": ["EUR"]},
+    }
+
+
+def test_resolve_external_references_loads_each_document_once(tmp_path, mocker) -> None:
+    (tmp_path / "common.yaml").write_text("A: {type: string}\nB: {type: integer}\n")
+    schemas = {
+        "a": {"$ref": "common.yaml#/A"},
+        "b": {"$ref": "./common.yaml#/B"},
+        "also_a": {"$ref": "common.yaml#/A"},
+    }
+    document = {"components": {"schemas": schemas}}
+    load_document = mocker.spy(external_references, "load_document")
+
+    assert resolve_external_references(document, tmp_path / "openapi.yaml") is None
+    assert resolve_external_references(_with_schema({"$ref": "common.yaml#/A"}), tmp_path / "openapi.yaml") is None
+
+    assert load_document.call_count == 1
+    assert schemas["also_a"] == schemas["a"] == {"$ref": "#/components/schemas/A"}
+    assert schemas["A"] == {"type": "string"}
+    assert schemas["B"] == {"type": "integer"}
+
+    (tmp_path / "common.yaml").write_text("A: {type: boolean}\n")
+    changed = _with_schema({"$ref": "common.yaml#/A"})
+    assert resolve_external_references(changed, tmp_path / "openapi.yaml") is None
+    assert changed["components"]["schemas"]["A"] == {"type": "boolean"}
+    assert load_document.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "ref,header",
+    [
+        ("missing.yaml#/A", "Could not read referenced document"),
+        ("common.yaml#/Missing", "Could not resolve reference common.yaml#/Missing"),
+        ("invalid.yaml#/A", "Invalid YAML from provided source"),
+    ],
+)
+def test_resolve_external_references_errors(tmp_path, ref, header) -> None:
+    (tmp_path / "common.yaml").write_text("A: {type: string}\n")
+    (tmp_path / "invalid.yaml").write_text("A: [\n")
+
+    error = resolve_external_references(_with_schema({"$ref": ref}), tmp_path / "openapi.yaml")
+
+    assert isinstance(error, GeneratorError)
+    assert error.header.startswith(header)
+
+
+def test_resolve_external_references_leaves_remote_references(tmp_path) -> None:
+    document = {"a": {"$ref": "https://example.com/common.yaml#/A"}, "b": {"$ref": "#/components/schemas/B"}}
+
+    assert resolve_external_references(document, tmp_path / "openapi.yaml") is None
+
+    assert document == {"a": {"$ref": "https://example.com/common.yaml#/A"}, "b": {"$ref": "#/components/schemas/B"}}
+
+
+def test_resolve_external_references_by_where_they_are(tmp_path) -> None:
+    (tmp_path / "paths").mkdir()
+    (tmp_path / "paths" / "users.yaml").write_text(
+        "get:\n"
+        "  operationId: list_users\n"
+        "  parameters: [{$ref: '../common.yaml#/Limit'}]\n"
+        "  responses:\n"
+        "    '200': {$ref: '../common.yaml#/Users'}\n"
+    )
+    (tmp_path / "common.yaml").write_text(
+        "Limit: {name: limit, in: query, schema: {type: integer}}\n"
+        "Users:\n"
+        "  description: OK\n"
+        "  content: {application/json: {schema: {type: array, items: {$ref: '#/User'}}}}\n"
+        "User: {type: object}\n"
+    )
+    document = {"paths": {"/users": {"$ref": "paths/users.yaml", "summary": "Users"}}}
+
+    assert resolve_external_references(document, tmp_path / "openapi.yaml") is None
+
+    assert document["paths"]["/users"] == {
+        "summary": "Users",
+        "get": {
+            "operationId": "list_users",
+            "parameters": [{"$ref": "#/components/parameters/Limit"}],
+            "responses": {"200": {"$ref": "#/components/responses/Users"}},
+        },
+    }
+    assert document["components"] == {
+        "parameters": {"Limit": {"name": "limit", "in": "query", "schema": {"type": "integer"}}},
+        "responses": {
+            "Users": {
+                "description": "OK",
+                "content": {
+                    "application/json": {"schema": {"type": "array", "items": {"$ref": "#/components/schemas/User"}}}
+                },
+            }
+        },
+        "schemas": {"User": {"type": "object"}},
+    }
+
+
+@pytest.mark.parametrize(
+    "document,detail",
+    [
+        ({"paths": {"/": {"get": {"callbacks": {"$ref": "common.yaml#/A"}}}}}, "only supported in place of"),
+        ({"paths": {"/": {"$ref": "loop.yaml#/paths/~1"}}}, "The path item refers to itself"),
+    ],
+)
+def test_resolve_external_references_which_cant_be_placed(tmp_path, document, detail) -> None:
+    (tmp_path / "common.yaml").write_text("A: {type: string}\n")
+    (tmp_path / "loop.yaml").write_text("paths: {'/': {$ref: '#/paths/~1'}}\n")
+
+    error = resolve_external_references(document, tmp_path / "openapi.yaml")
+
+    assert isinstance(error, GeneratorError)
+    assert error.header.startswith("Could not resolve reference")
+    assert detail in error.detail
@@ -0,0 +1,461 @@
+from pathlib import Path, PurePosixPath
+
+import pytest
+
+from openapi_python_client import Config, ErrorLevel, Project
+from openapi_python_client.config import ConfigFile
+from openapi_python_client.generator import _load_manifest
+
+default_http_timeout = ConfigFile.model_json_schema()["properties"]["http_timeout"]["default"]
+
+
+def make_project(config: Config) -> Project:
+    from unittest.mock import MagicMock
+
+    from openapi_python_client import Project
+
+    return Project(openapi=MagicMock(title="My Test API"), config=config)
+
+
+@pytest.fixture
+def project_with_dir(config) -> Project:
+    """Return a Project with the project dir pre-made (needed for cwd of commands). Unlinks after the test completes"""
+    project = make_project(config)
+    project.project_dir.mkdir()
+
+    yield project
+
+    project.project_dir.rmdir()
+
+
+class TestProject:
+    def test__run_post_hooks_reports_missing_commands(self, project_with_dir: Project) -> None:
+        fake_command_name = "blahblahdoesntexist"
+        project_with_dir.config.post_hooks = [fake_command_name]
+        need_to_make_cwd = not project_with_dir.project_dir.exists()
+        if need_to_make_cwd:
+            project_with_dir.project_dir.mkdir()
+
+        project_with_dir._run_post_hooks()
+
+        assert len(project_with_dir.errors) == 1
+        error = project_with_dir.errors[0]
+        assert error.level == ErrorLevel.WARNING
+        assert error.header == "Skipping Integration"
+        assert fake_command_name in error.detail
+
+    def test__run_post_hooks_reports_stdout_of_commands_that_error_with_no_stderr(self, project_with_dir):
+        failing_command = "python3 -c \"print('a message'); exit(1)\""
+        project_with_dir.config.post_hooks = [failing_command]
+        project_with_dir._run_post_hooks()
+
+        assert len(project_with_dir.errors) == 1
+        error = project_with_dir.errors[0]
+        assert error.level == ErrorLevel.ERROR
+        assert error.header == "python3 failed"
+        assert "a message" in error.detail
+
+    def test__run_post_hooks_reports_stderr_of_commands_that_error(self, project_with_dir):
+        failing_command = "python3 -c \"print('a message'); raise Exception('some exception')\""
+        project_with_dir.config.post_hooks = [failing_command]
+        project_with_dir._run_post_hooks()
+
+        assert len(project_with_dir.errors) == 1
+        error = project_with_dir.errors[0]
+        assert error.level == ErrorLevel.ERROR
+        assert error.header == "python3 failed"
+        assert "some exception" in error.detail
+
+    @pytest.mark.parametrize("jobs", (1, 3))
+    def test__render_and_write_writes_in_order(self, config, tmp_path, jobs) -> None:
+        from attrs import evolve
+
+        project = make_project(evolve(config, jobs=jobs))
+        template = project.env.from_string("{{ value }} from {{ package_name }}")
+        renders = [(tmp_path / f"{i}.py", template, {"value": i}) for i in range(10)]
+
+        project._render_and_write(renders)
+
+        for i in range(10):
+            assert (tmp_path / f"{i}.py").read_text() == f"{i} from my_test_api_client"
+
+    def test__run_post_hooks_fast_runs_in_order(self, config, project_with_dir) -> None:
+        from attrs import evolve
+
+        project_with_dir.config = evolve(config, fast=True)
+        # The second hook fails unless the first one has already finished
+        project_with_dir.config.post_hooks = [
+            "python3 -c \"import pathlib, time; time.sleep(0.2); pathlib.Path('first').touch()\"",
+            "python3 -c \"import pathlib; pathlib.Path('second').write_text(pathlib.Path('first').read_text())\"",
+        ]
+
+        project_with_dir._run_post_hooks()
+
+        assert project_with_dir.errors == []
+        for name in ("first", "second"):
+            (project_with_dir.project_dir / name).unlink()
+
+    @pytest.mark.parametrize("jobs", (1, 3))
+    def test__render_and_write_fast_tidies_python(self, config, tmp_path, jobs) -> None:
+        from attrs import evolve
+
+        project = make_project(evolve(config, fast=True, jobs=jobs))
+        template = project.env.from_string("import sys\nimport json\n\n\n\n\nvalue = json   \n")
+        renders = [(tmp_path / "module.py", template, {}), (tmp_path / "__init__.py", template, {})]
+
+        project._render_and_write(renders)
+
+        assert (tmp_path / "module.py").read_text() == "import json\n\nvalue = json\n"
+        assert (tmp_path / "__init__.py").read_text() == "import json\nimport sys\n\nvalue = json\n"
+
+    def test__write_file_incremental_skips_unchanged_files(self, config, tmp_path) -> None:
+        from attrs import evolve
+
+        from openapi_python_client.generator import MANIFEST_FILE_NAME
+
+        config = evolve(config, incremental=True, overwrite=True, output_path=tmp_path)
+        unchanged = tmp_path / "unchanged.py"
+        changed = tmp_path / "changed.py"
+        edited = tmp_path / "edited.py"
+        first = make_project(config)
+        first._write_file(unchanged, "a = 1\n")
+        first._write_file(changed, "b = 1\n")
+        first._write_file(edited, "c = 1\n")
+        first._save_manifest()
+        edited.write_text("c = 'edited by hand'\n")
+        unchanged_mtime = unchanged.stat().st_mtime_ns
+
+        second = make_project(config)
+        second._previous_manifest = _load_manifest(tmp_path / MANIFEST_FILE_NAME)
+        second._write_file(unchanged, "a = 1\n")
+        second._write_file(changed, "b = 2\n")
+        second._write_file(edited, "c = 1\n")
+
+        assert unchanged.stat().st_mtime_ns == unchanged_mtime
+        assert changed.read_text() == "b = 2\n"
+        assert edited.read_text() == "c = 1\n"
+
+    def test__remove_orphaned_files(self, config, tmp_path) -> None:
+        from attrs import evolve
+
+        from openapi_python_client.generator import MANIFEST_FILE_NAME
+
+        config = evolve(config, incremental=True, overwrite=True, output_path=tmp_path)
+        kept = tmp_path / "api" / "kept" / "endpoint.py"
+        orphan = tmp_path / "api" / "removed" / "endpoint.py"
+        not_generated = tmp_path / "api" / "user_file.py"
+        for path in (kept, orphan, not_generated):
+            path.parent.mkdir(parents=True, exist_ok=True)
+        not_generated.write_text("")
+        first = make_project(config)
+        first._write_file(kept, "")
+        first._write_file(orphan, "")
+        first._save_manifest()
+
+        second = make_project(config)
+        second._previous_manifest = _load_manifest(tmp_path / MANIFEST_FILE_NAME)
+        second._write_file(kept, "")
+        second._remove_orphaned_files()
+
+        assert kept.exists()
+        assert not orphan.parent.exists()
+        assert not_generated.exists()
+
+    @staticmethod
+    def _built_project(config, output_path, *, thing_description="A thing", render_cache=None):
+        from attrs import evolve
+
+        from openapi_python_client.config import MetaType
+        from openapi_python_client.parser import GeneratorData
+
+        config = evolve(config, meta_type=MetaType.NONE, post_hooks=[], overwrite=True, output_path=output_path)
+        document = {
+            "openapi": "3.1.0",
+            "info": {"title": "My Test API", "version": "1.0.0"},
+            "paths": {"/things": {"get": {"operationId": "get_things", "tags": ["things"], "responses": {}}}},
+            "components": {
+                "schemas": {
+                    "Thing": {
+                        "type": "object",
+                        "description": thing_description,
+                        "properties": {"id": {"type": "integer"}},
+                    },
+                    "Other": {"type": "object", "properties": {"name": {"type": "string"}}},
+                }
+            },
+        }
+        openapi = GeneratorData.from_dict(document, config=config)
+        return Project(openapi=openapi, config=config, render_cache=render_cache)
+
+    def test_build_replaces_generated_files_and_keeps_others(self, config, tmp_path) -> None:
+        output_path = tmp_path / "client"
+        (output_path / "models").mkdir(parents=True)
+        (output_path / "models" / "stale_model.py").write_text("")
+        (output_path / "client.py").write_text("old client")
+        (output_path / "tests").mkdir()
+        (output_path / "tests" / "test_client.py").write_text("user test")
+
+        errors = self._built_project(config, output_path).build()
+
+        assert not errors
+        assert not (output_path / "models" / "stale_model.py").exists()
+        assert (output_path / "models" / "thing.py").is_file()
+        assert (output_path / "api" / "things" / "get_things.py").is_file()
+        assert (output_path / "client.py").read_text() != "old client"
+        assert (output_path / "tests" / "test_client.py").read_text() == "user test"
+        assert [path.name for path in tmp_path.iterdir()] == ["client"]
+
+    def test_build_interrupted_leaves_previous_client(self, config, tmp_path, mocker) -> None:
+        output_path = tmp_path / "client"
+        output_path.mkdir()
+        (output_path / "client.py").write_text("old client")
+        project = self._built_project(config, output_path)
+        mocker.patch.object(project, "_api_renders", side_effect=KeyboardInterrupt)
+
+        with pytest.raises(KeyboardInterrupt):
+            project.build()
+
+        assert (output_path / "client.py").read_text() == "old client"
+        assert [path.name for path in output_path.iterdir()] == ["client.py"]
+        assert [path.name for path in tmp_path.iterdir()] == ["client"]
+
+    def test_build_interrupted_in_post_hooks_keeps_user_files(self, config, tmp_path, mocker) -> None:
+        output_path = tmp_path / "client"
+        (output_path / "tests").mkdir(parents=True)
+        (output_path / "tests" / "test_client.py").write_text("user test")
+        (output_path / "notes.md").write_text("notes")
+        project = self._built_project(config, output_path)
+        mocker.patch.object(project, "_run_post_hooks", side_effect=KeyboardInterrupt)
+
+        with pytest.raises(KeyboardInterrupt):
+            project.build()
+
+        assert (output_path / "tests" / "test_client.py").read_text() == "user test"
+        assert (output_path / "notes.md").read_text() == "notes"
+        assert [path.name for path in tmp_path.iterdir()] == ["client"]
+
+    def test_build_failed_swap_restores_previous_client(self, config, tmp_path, mocker) -> None:
+        output_path = tmp_path / "client"
+        (output_path / "tests").mkdir(parents=True)
+        (output_path / "tests" / "test_client.py").write_text("user test")
+        (output_path / "client.py").write_text("old client")
+        project = self._built_project(config, output_path)
+        rename = Path.rename
+
+        def fail_to_replace_output(path: Path, target: Path) -> Path:
+            if target == output_path and path.name.endswith(".tmp"):
+                raise PermissionError(target)
+            return rename(path, target)
+
+        mocker.patch.object(Path, "rename", fail_to_replace_output)
+
+        with pytest.raises(PermissionError):
+            project.build()
+
+        assert (output_path / "tests" / "test_client.py").read_text() == "user test"
+        assert (output_path / "client.py").read_text() == "old client"
+        assert [path.name for path in tmp_path.iterdir()] == ["client"]
+
+    def test_build_with_render_cache_only_renders_changes(self, config, tmp_path) -> None:
+        from attrs import evolve
+
+        from openapi_python_client.cache import RenderCache
+
+        config = evolve(config, incremental=True, fast=True)
+        output_path = tmp_path / "client"
+        render_cache = RenderCache()
+        first = self._built_project(config, output_path, render_cache=render_cache)
+        assert not first.build()
+        assert render_cache.env is first.env
+        assert (render_cache.rendered, render_cache.reused) == (10, 0)
+
+        unchanged = self._built_project(config, output_path, render_cache=render_cache)
+        assert not unchanged.build()
+        assert unchanged.env is first.env
+        assert (render_cache.rendered, render_cache.reused) == (0, 10)
+
+        changed = self._built_project(config, output_path, thing_description="Changed", render_cache=render_cache)
+        assert not changed.build()
+        assert (render_cache.rendered, render_cache.reused) == (1, 9)
+        assert "Changed" in (output_path / "models" / "thing.py").read_text()
+
+    def test_build_low_memory_writes_the_same_files(self, config, tmp_path) -> None:
+        from attrs import evolve
+
+        normal = self._built_project(config, tmp_path / "normal")
+        assert not normal.build()
+        low_memory = self._built_project(evolve(config, low_memory=True), tmp_path / "low_memory")
+        assert not low_memory.build()
+
+        files = sorted(path.relative_to(tmp_path / "normal") for path in (tmp_path / "normal").rglob("*.py"))
+        assert files == sorted(
+            path.relative_to(tmp_path / "low_memory") for path in (tmp_path / "low_memory").rglob("*.py")
+        )
+        for file in files:
+            assert (tmp_path / "low_memory" / file).read_text() == (tmp_path / "normal" / file).read_text()
+
+    @pytest.mark.parametrize("jobs", (1, 3))
+    def test_iter_files_matches_build_without_writing(self, config, tmp_path, jobs) -> None:
+        from attrs import evolve
+
+        config = evolve(config, fast=True, jobs=jobs)
+        built = self._built_project(config, tmp_path / "built")
+        assert not built.build()
+
+        files = dict(self._built_project(config, tmp_path / "in_memory").iter_files())
+
+        assert not (tmp_path / "in_memory").exists()
+        on_disk = sorted(path for path in (tmp_path / "built").rglob("*") if path.is_file())
+        assert sorted(files) == sorted(
+            PurePosixPath(path.relative_to(tmp_path / "built").as_posix()) for path in on_disk
+        )
+        for path in on_disk:
+            assert files[PurePosixPath(path.relative_to(tmp_path / "built").as_posix())] == path.read_bytes()
+
+    def test__write_file_batches_writes(self, config, tmp_path, mocker) -> None:
+        from attrs import evolve
+
+        from openapi_python_client import generator
+
+        mocker.patch.object(generator, "WRITE_BATCH_SIZE", 10)
+        project = make_project(evolve(config, output_path=tmp_path, jobs=2))
+        project._pending_writes = []
+
+        project._write_file(tmp_path / "a" / "first.py", "12345")
+        assert not (tmp_path / "a").exists()
+        project._write_file(tmp_path / "a" / "second.py", "67890")
+        project._write_file(tmp_path / "b" / "third.py", "1")
+        assert (tmp_path / "a" / "first.py").read_text() == "12345"
+        assert (tmp_path / "a" / "second.py").read_text() == "67890"
+        assert not (tmp_path / "b").exists()
+        project._flush_writes()
+
+        assert (tmp_path / "b" / "third.py").read_text() == "1"
+
+
+def test__get_generator_data_resolves_external_references_without_caching(config, tmp_path) -> None:
+    from attrs import evolve
+
+    from openapi_python_client.generator import _get_generator_data
+    from openapi_python_client.parser import GeneratorData
+
+    (tmp_path / "common.yaml").write_text("components: {schemas: {Money: {type: object}}}\n")
+    (tmp_path / "prices.yaml").write_text("get:\n  operationId: list_prices\n  responses: {'200': {description: OK}}\n")
+    document = (
+        b"openapi: 3.1.0\n"
+        b"info: {title: Money, version: '1.0.0'}\n"
+        b"paths: {/prices: {$ref: prices.yaml}}\n"
+        b"components: {schemas: {Price: {$ref: 'common.yaml#/components/schemas/Money'}}}\n"
+    )
+    cache_dir = tmp_path / "cache"
+    config = evolve(config, document_source=tmp_path / "openapi.yaml", cache_dir=cache_dir)
+
+    openapi = _get_generator_data(document, "application/yaml", config=config)
+
+    assert isinstance(openapi, GeneratorData)
+    assert [model.class_info.name for model in openapi.models] == ["Money"]
+    assert [endpoint.name for endpoint in openapi.endpoint_collections_by_tag["default"].endpoints] == ["list_prices"]
+    assert not cache_dir.exists()
+
+
+def test_generate_profiles_string_caches(config, tmp_path, mocker) -> None:
+    import json
+
+    from openapi_python_client import generate
+    from openapi_python_client.profiling import profile
+    from openapi_python_client.utils import snake_case
+
+    def build() -> list:
+        snake_case("SomeName")
+        snake_case("SomeName")
+        return []
+
+    project = mocker.patch("openapi_python_client.generator._get_project_for_url_or_path").return_value
+    project.build.side_effect = build
+    path = tmp_path / "trace.json"
+
+    with profile(path):
+        assert generate(config=config) == []
+
+    (event,) = [event for event in json.loads(path.read_text())["traceEvents"] if event["name"] == "generate"]
+    counters = event["args"]["string_caches"]["snake_case"]
+    assert counters["hits"] >= 1
+    assert set(counters) == {"hits", "misses", "maxsize", "currsize"}
+
+
+def test_generate_files(config, tmp_path, mocker) -> None:
+    import json
+
+    from attrs import evolve
+
+    from openapi_python_client import generate_files
+    from openapi_python_client.config import MetaType
+
+    document = {
+        "openapi": "3.1.0",
+        "info": {"title": "My Test API", "version": "1.0.0"},
+        "paths": {"/things": {"get": {"operationId": "get_things", "responses": {}}}},
+    }
+    (tmp_path / "openapi.json").write_text(json.dumps(document))
+    config = evolve(
+        config,
+        document_source=tmp_path / "openapi.json",
+        meta_type=MetaType.POETRY,
+        output_path=tmp_path / "client",
+        post_hooks=["ruff format ."],
+    )
+    run = mocker.patch("subprocess.run")
+
+    files, errors = generate_files(config=config)
+
+    assert not errors
+    assert list(tmp_path.iterdir()) == [tmp_path / "openapi.json"]
+    run.assert_not_called()
+    assert files[PurePosixPath("my_test_api_client/py.typed")] == b"# Marker file for PEP 561"
+    assert b"def sync_detailed(" in files[PurePosixPath("my_test_api_client/api/default/get_things.py")]
+    assert PurePosixPath("pyproject.toml") in files
+
+
+def test_stream_files_reports_errors(config, tmp_path) -> None:
+    from attrs import evolve
+
+    from openapi_python_client import stream_files
+
+    (tmp_path / "openapi.yaml").write_text("not: [valid")
+
+    files, errors = stream_files(config=evolve(config, document_source=tmp_path / "openapi.yaml"))
+
+    assert list(files) == []
+    assert len(errors) == 1
+
+
+# Generating in low memory mode grows the peak memory by around 45x the size of the document on Linux, and by around
+# 70% of what normal mode does
+LOW_MEMORY_MAX_RATIO = 60
+LOW_MEMORY_MAX_FRACTION = 0.85
+
+
+def test_low_memory_peak_rss_is_lower(tmp_path) -> None:
+    import json
+    import subprocess
+    import sys
+
+    pytest.importorskip("resource")
+
+    def measure(*args: str) -> dict:
+        # A new process, since the peak resident set size of this one includes everything other tests did
+        output = tmp_path / "memory.json"
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.memory", f"--output={output}", *args],
+            cwd=Path(__file__).parent.parent,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        assert result.returncode == 0, result.stdout + result.stderr
+        return json.loads(output.read_text())
+
+    low_memory = measure("--low-memory")
+    assert low_memory["ratio"] < LOW_MEMORY_MAX_RATIO
+    # Also compared to normal mode on the same machine, since how much memory is used depends on the platform's allocator
+    assert low_memory["growth"] < LOW_MEMORY_MAX_FRACTION * measure()["growth"]
@@ -4,7 +4,7 @@ import pydantic
 import pytest
 
 import openapi_python_client.schema as oai
-from openapi_python_client.parser.errors import ParseError
+from openapi_python_client.parser.errors import GeneratorError, ParseError
 from openapi_python_client.parser.openapi import Endpoint, EndpointCollection
 from openapi_python_client.parser.properties import IntProperty, Parameters, Schemas
 from openapi_python_client.schema import DataType
@@ -26,6 +26,21 @@ class TestEndpoint:
             relative_imports={"import_3"},
         )
 
+    def test__copy_parameters_keep_their_own_cached_values(self, list_property_factory):
+        from openapi_python_client.parser.properties.protocol import invalidate_cached_values
+
+        endpoint = self.make_endpoint()
+        endpoint.query_parameters.append(list_property_factory(required=False))
+        original_type_string = endpoint.query_parameters[0].get_type_string()
+
+        copied = endpoint._copy()
+        # Like the mutations the parsing steps make, such as `set_python_name`
+        object.__setattr__(copied.query_parameters[0], "required", True)
+        invalidate_cached_values()
+
+        assert copied.query_parameters[0].get_type_string() != original_type_string
+        assert endpoint.query_parameters[0].get_type_string() == original_type_string
+
     @pytest.mark.parametrize("response_status_code", ["not_a_number", 499])
     def test__add_responses_status_code_error(self, response_status_code, mocker):
         from openapi_python_client.parser.openapi import Endpoint, Schemas
@@ -300,6 +315,33 @@ class TestEndpoint:
         assert isinstance(err, ParseError)
         assert "param_path" in err.detail
 
+    def test__add_parameters_does_not_change_input_endpoint(self, config, string_property_factory):
+        endpoint = self.make_endpoint()
+        operation_param = string_property_factory(name="param", python_name="param")
+        endpoint.query_parameters.append(operation_param)
+        data = oai.PathItem.model_construct(
+            parameters=[
+                oai.Parameter.model_construct(
+                    name="param",
+                    param_in="path",
+                    param_schema=oai.Schema.model_construct(type="string"),
+                    required=True,
+                ),
+            ]
+        )
+
+        (result, _, _) = endpoint.add_parameters(
+            endpoint=endpoint, data=data, schemas=Schemas(), parameters=Parameters(), config=config
+        )
+
+        assert result is not endpoint
+        assert [param.python_name for param in result.query_parameters] == ["param_query"]
+        assert [param.python_name for param in result.path_parameters] == ["param_path"]
+        assert operation_param.python_name == "param"
+        assert endpoint.query_parameters == [operation_param]
+        assert endpoint.path_parameters == []
+        assert endpoint.relative_imports == {"import_3"}
+
     def test__add_parameters_query_optionality(self, config):
         endpoint = self.make_endpoint()
         data = oai.Operation.model_construct(
@@ -773,3 +815,406 @@ class TestEndpointCollection:
         )
         collection: EndpointCollection = collections["default"]
         assert isinstance(collection.endpoints[0].query_parameters[0], IntProperty)
+
+    @pytest.mark.parametrize(
+        "include,exclude,expected",
+        [
+            (None, None, ["get_pets", "list_pets", "post_pets", "get_users"]),
+            ({"tags": ["pets"]}, None, ["get_pets", "list_pets", "post_pets"]),
+            ({"paths": ["/users*"]}, None, ["get_users"]),
+            ({"operation_ids": ["get_pets", "get_users"]}, None, ["get_pets", "get_users"]),
+            ({"tags": ["pets"]}, {"operation_ids": ["post_pets"], "paths": ["/pets/mine"]}, ["list_pets"]),
+            (None, {"tags": ["admin"]}, ["get_pets", "list_pets", "post_pets"]),
+        ],
+    )
+    def test_from_data_filters_operations(self, mocker, config, include, exclude, expected):
+        from attrs import evolve
+
+        from openapi_python_client.config import OperationFilter
+
+        config = evolve(
+            config,
+            include=OperationFilter(**include) if include else None,
+            exclude=OperationFilter(**exclude) if exclude else None,
+        )
+        responses = {"200": oai.Response.model_construct(description="OK")}
+        data = {
+            "/pets/mine": oai.PathItem.model_construct(
+                get=oai.Operation.model_construct(tags=["pets"], operationId="get_pets", responses=responses),
+            ),
+            "/pets": oai.PathItem.model_construct(
+                get=oai.Operation.model_construct(tags=["pets"], operationId="list_pets", responses=responses),
+                post=oai.Operation.model_construct(tags=["pets"], responses=responses),
+            ),
+            "/users": oai.PathItem.model_construct(
+                get=oai.Operation.model_construct(tags=["users", "admin"], responses=responses),
+            ),
+        }
+        endpoint_from_data = mocker.spy(Endpoint, "from_data")
+
+        collections, _, _ = EndpointCollection.from_data(
+            data=data,
+            schemas=Schemas(),
+            parameters=Parameters(),
+            config=config,
+            request_bodies={},
+            responses={},
+        )
+
+        names = [endpoint.name for collection in collections.values() for endpoint in collection.endpoints]
+        assert names == expected
+        assert endpoint_from_data.call_count == len(expected)
+
+
+@pytest.mark.parametrize("skip_unused_models", (False, True))
+def test_generator_data_skip_unused_models(config, skip_unused_models):
+    from attrs import evolve
+
+    from openapi_python_client.parser.openapi import GeneratorData
+
+    def ref(name: str) -> dict[str, str]:
+        return {"$ref": f"#/components/schemas/{name}"}
+
+    json_content = {"application/json": {"schema": ref("Pet")}}
+    document = {
+        "openapi": "3.1.0",
+        "info": {"title": "Pets", "version": "1.0.0"},
+        "paths": {
+            "/pets": {
+                "post": {
+                    "requestBody": {"content": json_content},
+                    "responses": {
+                        "200": {"description": "OK", "content": {"application/json": {"schema": ref("Page")}}}
+                    },
+                }
+            }
+        },
+        "components": {
+            "schemas": {
+                "Pet": {"type": "object", "properties": {"owner": ref("Owner")}},
+                "Owner": {"type": "object", "additionalProperties": ref("Address")},
+                "Address": {"type": "object", "properties": {"kind": ref("AddressKind")}},
+                "AddressKind": {"type": "string", "enum": ["home", "work"]},
+                "Page": {
+                    "type": "object",
+                    "properties": {"items": {"type": "array", "items": {"oneOf": [ref("Cat")]}}},
+                },
+                "Cat": {"type": "object"},
+                "Unused": {"type": "object", "properties": {"status": ref("UnusedStatus")}},
+                "UnusedStatus": {"type": "string", "enum": ["a", "b"]},
+            }
+        },
+    }
+
+    openapi = GeneratorData.from_dict(document, config=evolve(config, skip_unused_models=skip_unused_models))
+
+    assert isinstance(openapi, GeneratorData)
+    expected_models = {"Pet", "Owner", "Address", "Page", "Cat"}
+    expected_enums = {"AddressKind"}
+    if not skip_unused_models:
+        expected_models.add("Unused")
+        expected_enums.add("UnusedStatus")
+    assert {model.class_info.name for model in openapi.models} == expected_models
+    assert {enum.class_info.name for enum in openapi.enums} == expected_enums
+
+
+def test_generator_data_skip_unused_models_in_cycle(config):
+    from attrs import evolve
+
+    from openapi_python_client.parser.openapi import GeneratorData
+
+    def ref(name: str) -> dict[str, str]:
+        return {"$ref": f"#/components/schemas/{name}"}
+
+    document = {
+        "openapi": "3.1.0",
+        "info": {"title": "Pets", "version": "1.0.0"},
+        "paths": {
+            "/pets": {
+                "get": {
+                    "responses": {
+                        "200": {"description": "OK", "content": {"application/json": {"schema": ref("Pet")}}}
+                    },
+                }
+            }
+        },
+        "components": {
+            "schemas": {
+                # Pet is processed first, with a copy of Owner from before Owner was processed
+                "Pet": {"type": "object", "properties": {"owner": ref("Owner")}},
+                "Owner": {
+                    "type": "object",
+                    "properties": {"pets": {"type": "array", "items": ref("Pet")}},
+                    "additionalProperties": ref("Address"),
+                },
+                "Address": {"type": "object"},
+            }
+        },
+    }
+
+    openapi = GeneratorData.from_dict(document, config=evolve(config, skip_unused_models=True))
+
+    assert isinstance(openapi, GeneratorData)
+    assert {model.class_info.name for model in openapi.models} == {"Pet", "Owner", "Address"}
+
+
+def test_generator_data_low_memory(config):
+    import copy
+
+    from attrs import evolve
+
+    from openapi_python_client.parser.openapi import GeneratorData
+
+    document = {
+        "openapi": "3.0.3",
+        "info": {"title": "Pets", "version": "1.0.0"},
+        "paths": {
+            "/pets": {
+                "get": {
+                    "responses": {
+                        "200": {
+                            "description": "OK",
+                            "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Pet"}}},
+                        }
+                    },
+                }
+            }
+        },
+        "components": {
+            "schemas": {
+                "Pet": {
+                    "type": "object",
+                    "properties": {"name": {"type": "string", "nullable": True}, "age": {"type": "integer"}},
+                },
+            },
+            "x-extension": True,
+        },
+    }
+
+    expected = GeneratorData.from_dict(copy.deepcopy(document), config=config)
+    openapi = GeneratorData.from_dict(document, config=evolve(config, low_memory=True), release=True)
+
+    assert isinstance(expected, GeneratorData)
+    assert isinstance(openapi, GeneratorData)
+    assert document == {}
+    (expected_pet,) = expected.models
+    (pet,) = openapi.models
+    assert pet.class_info == expected_pet.class_info
+    assert pet.details.optional_properties == expected_pet.details.optional_properties
+    assert pet.data == oai.Schema()
+    (response,) = openapi.endpoint_collections_by_tag["default"].endpoints[0].responses
+    assert response.prop.class_info == expected_pet.class_info
+    assert response.data == oai.Response(description="")
+
+
+@pytest.mark.parametrize("low_memory", (False, True))
+@pytest.mark.parametrize("lazy_validation", (False, True))
+def test_generator_data_from_dict_keeps_data(config, low_memory, lazy_validation):
+    import copy
+
+    from attrs import evolve
+
+    from openapi_python_client.config import OperationFilter
+    from openapi_python_client.parser.openapi import GeneratorData
+
+    document = _lazy_validation_document()
+    original = copy.deepcopy(document)
+    config = evolve(
+        config,
+        include=OperationFilter(tags=["pets"]),
+        low_memory=low_memory,
+        lazy_validation=lazy_validation,
+        skip_unused_models=True,
+    )
+
+    first = GeneratorData.from_dict(document, config=config)
+
+    assert document == original
+    if lazy_validation:
+        second = GeneratorData.from_dict(document, config=config)
+        assert isinstance(first, GeneratorData)
+        assert isinstance(second, GeneratorData)
+        assert [model.class_info.name for model in second.models] == [model.class_info.name for model in first.models]
+
+
+def test_generator_data_lazy_validation_swagger_error(config):
+    from attrs import evolve
+
+    from openapi_python_client.parser.openapi import GeneratorData
+
+    document = {"swagger": "2.0", "info": {"title": "Pets", "version": "1.0.0"}, "paths": {}}
+
+    result = GeneratorData.from_dict(document, config=evolve(config, lazy_validation=True), release=True)
+
+    assert isinstance(result, GeneratorError)
+    assert "You may be trying to use a Swagger document" in result.detail
+
+
+def test_generator_data_low_memory_validation_error(config):
+    from attrs import evolve
+
+    from openapi_python_client.parser.openapi import GeneratorData
+
+    document = {
+        "openapi": "3.1.0",
+        "info": {"title": "Pets", "version": "1.0.0"},
+        "paths": {},
+        "components": {"schemas": {"Pet": {"type": "animal"}}},
+    }
+
+    result = GeneratorData.from_dict(document, config=evolve(config, low_memory=True))
+
+    assert isinstance(result, GeneratorError)
+    assert "components.schemas.Pet" in result.detail
+
+
+def _lazy_validation_document(pet_type: str = "object") -> dict:
+    def operation(tag: str, ref: str) -> dict:
+        return {
+            "tags": [tag],
+            "responses": {"200": {"description": "OK", "content": {"application/json": {"schema": {"$ref": ref}}}}},
+        }
+
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "Pets", "version": "1.0.0"},
+        "paths": {
+            "/pets": {"get": operation("pets", "#/components/schemas/Pet")},
+            "/stores": {"get": {**operation("stores", "#/components/schemas/Store"), "parameters": "not a list"}},
+        },
+        "components": {
+            "schemas": {
+                "Pet": {"type": pet_type, "properties": {"owner": {"$ref": "#/components/schemas/Owner"}}},
+                "Owner": {"type": "object", "properties": {"name": {"type": "string"}}},
+                "Store": {"type": "shop"},
+            },
+        },
+    }
+
+
+def test_generator_data_lazy_validation_skips_discarded_parts(config):
+    from attrs import evolve
+
+    from openapi_python_client.config import OperationFilter
+    from openapi_python_client.parser.openapi import GeneratorData
+
+    config = evolve(config, include=OperationFilter(tags=["pets"]), skip_unused_models=True)
+
+    assert isinstance(GeneratorData.from_dict(_lazy_validation_document(), config=config), GeneratorError)
+    openapi = GeneratorData.from_dict(_lazy_validation_document(), config=evolve(config, lazy_validation=True))
+
+    assert isinstance(openapi, GeneratorData)
+    assert not openapi.errors
+    assert list(openapi.endpoint_collections_by_tag) == ["pets"]
+    assert [model.class_info.name for model in openapi.models] == ["Pet", "Owner"]
+
+
+def test_generator_data_lazy_validation_ignores_remote_references(config):
+    from attrs import evolve
+
+    from openapi_python_client.config import OperationFilter
+    from openapi_python_client.parser.openapi import GeneratorData
+
+    document = _lazy_validation_document()
+    document["components"]["schemas"]["Owner"]["properties"]["pet"] = {"$ref": "https://example.com/pet.json"}
+    config = evolve(config, include=OperationFilter(tags=["pets"]), lazy_validation=True, skip_unused_models=True)
+
+    openapi = GeneratorData.from_dict(document, config=config, release=True)
+
+    assert isinstance(openapi, GeneratorData)
+    assert "Remote references" in openapi.errors[0].detail
+    assert document == {}
+
+
+def test_generator_data_lazy_validation_reports_errors_where_they_are(config):
+    from attrs import evolve
+
+    from openapi_python_client.config import OperationFilter
+    from openapi_python_client.parser.openapi import GeneratorData
+
+    config = evolve(config, include=OperationFilter(tags=["pets"]), lazy_validation=True)
+
+    result = GeneratorData.from_dict(_lazy_validation_document(pet_type="animal"), config=config)
+
+    assert isinstance(result, GeneratorError)
+    assert result.header == "Failed to parse OpenAPI document"
+    assert "components.schemas.Pet" in result.detail
+    assert "paths" not in result.detail
+
+
+@pytest.mark.parametrize("deduplicate_inline_schemas", (False, True))
+def test_generator_data_deduplicate_inline_schemas(config, deduplicate_inline_schemas):
+    from attrs import evolve
+
+    from openapi_python_client.parser.openapi import GeneratorData
+
+    item = {
+        "type": "object",
+        "properties": {"id": {"type": "integer"}, "status": {"type": "string", "enum": ["active", "inactive"]}},
+    }
+
+    def list_operation(description: str) -> dict:
+        schema = {"type": "array", "items": item}
+        return {
+            "parameters": [
+                {"name": "status", "in": "query", "schema": {"type": "string", "enum": ["active", "inactive"]}}
+            ],
+            "responses": {"200": {"description": description, "content": {"application/json": {"schema": schema}}}},
+        }
+
+    document = {
+        "openapi": "3.1.0",
+        "info": {"title": "Items", "version": "1.0.0"},
+        "paths": {
+            "/items": {"get": {"operationId": "list_items", **list_operation("Items")}},
+            "/archived": {"get": {"operationId": "list_archived", **list_operation("Archived items")}},
+            "/items/upload": {
+                "post": {
+                    "operationId": "upload",
+                    "requestBody": {
+                        "content": {"application/json": {"schema": item}, "multipart/form-data": {"schema": item}}
+                    },
+                    "responses": {"204": {"description": "Uploaded"}},
+                }
+            },
+        },
+    }
+
+    openapi = GeneratorData.from_dict(
+        document, config=evolve(config, deduplicate_inline_schemas=deduplicate_inline_schemas)
+    )
+
+    assert isinstance(openapi, GeneratorData)
+    assert not openapi.errors
+    # Each body of an endpoint with more than one needs its own class
+    upload_models = {"UploadJsonBody", "UploadJsonBodyStatus", "UploadFilesBody", "UploadFilesBodyStatus"}
+    if deduplicate_inline_schemas:
+        assert {model.class_info.name for model in openapi.models} == {
+            "ListItemsResponse200Item",
+            "UploadJsonBody",
+            "UploadFilesBody",
+        }
+        # The first of identical schemas is the one generated
+        assert {enum.class_info.name for enum in openapi.enums} == {
+            "ListItemsStatus",
+            "UploadJsonBodyStatus",
+            "UploadFilesBodyStatus",
+        }
+        assert openapi.merged_classes == {
+            "ListItemsResponse200Item": ["ListArchivedResponse200Item"],
+            "ListItemsStatus": ["ListArchivedStatus", "ListItemsResponse200ItemStatus"],
+        }
+        (archived,) = openapi.endpoint_collections_by_tag["default"].endpoints[1].responses
+        assert archived.prop.inner_property.class_info.name == "ListItemsResponse200Item"
+    else:
+        classes = {model.class_info.name for model in openapi.models} | {enum.class_info.name for enum in openapi.enums}
+        assert classes == {
+            "ListItemsStatus",
+            "ListArchivedStatus",
+            "ListItemsResponse200Item",
+            "ListItemsResponse200ItemStatus",
+            "ListArchivedResponse200Item",
+            "ListArchivedResponse200ItemStatus",
+            *upload_models,
+        }
+        assert openapi.merged_classes == {}
@@ -0,0 +1,66 @@
+import openapi_python_client.schema as oai
+from openapi_python_client.parser.properties.dependency_graph import (
+    all_of_references,
+    is_cycle,
+    references,
+    strongly_connected_components,
+)
+
+
+def test_strongly_connected_components_orders_dependencies_first():
+    # 0 depends on 2, 1 has no dependencies, 2 depends on 1
+    dependencies = [[2], [], [1]]
+
+    assert strongly_connected_components(dependencies) == [[1], [2], [0]]
+
+
+def test_strongly_connected_components_keeps_order_without_dependencies():
+    assert strongly_connected_components([[], [], []]) == [[0], [1], [2]]
+
+
+def test_strongly_connected_components_groups_cycles():
+    # 0 and 2 reference each other, 1 depends on the cycle, 3 references itself
+    dependencies = [[2], [0], [0], [3]]
+
+    components = strongly_connected_components(dependencies)
+
+    assert components == [[0, 2], [1], [3]]
+    assert [is_cycle(component, dependencies) for component in components] == [True, False, True]
+
+
+def test_strongly_connected_components_deep_chain():
+    count = 5000
+    dependencies = [[index + 1] for index in range(count - 1)] + [[]]
+
+    assert strongly_connected_components(dependencies) == [[index] for index in reversed(range(count))]
+
+
+def test_references():
+    data = oai.Schema.model_validate(
+        {
+            "type": "object",
+            "properties": {
+                "a": {"$ref": "#/components/schemas/A"},
+                "b": {"type": "array", "items": {"anyOf": [{"$ref": "#/components/schemas/B"}]}},
+            },
+            "additionalProperties": {"$ref": "#/components/schemas/C"},
+            "allOf": [{"$ref": "#/components/schemas/D"}],
+        }
+    )
+
+    assert sorted(references(data)) == [f"#/components/schemas/{name}" for name in "ABCD"]
+    assert list(all_of_references(data)) == ["#/components/schemas/D"]
+
+
+def test_all_of_references_in_inline_schemas():
+    data = oai.Schema.model_validate(
+        {
+            "type": "object",
+            "properties": {
+                "a": {"$ref": "#/components/schemas/A"},
+                "inline": {"allOf": [{"$ref": "#/components/schemas/B"}, {"type": "object"}]},
+            },
+        }
+    )
+
+    assert list(all_of_references(data)) == ["#/components/schemas/B"]
@@ -283,61 +283,105 @@ class TestCreateSchemas:
         )
         assert result == update_schemas_with_data.return_value
 
-    def test_retries_failing_properties_while_making_progress(self, mocker, config):
+    def test_creates_schemas_after_their_references(self, mocker, config):
         from openapi_python_client.parser.properties import Schemas, _create_schemas
-        from openapi_python_client.schema import Schema
+        from openapi_python_client.parser.properties.schemas import update_schemas_with_data as real_update
 
-        components = {"first": Schema.model_construct(), "second": Schema.model_construct()}
-        update_schemas_with_data = mocker.patch(
-            f"{MODULE_NAME}.update_schemas_with_data", side_effect=[PropertyError(), Schemas(), PropertyError()]
-        )
-        parse_reference_path = mocker.patch(f"{MODULE_NAME}.parse_reference_path")
-        schemas = Schemas()
+        components = {
+            "First": oai.Schema.model_validate({"type": "array", "items": {"$ref": "#/components/schemas/Second"}}),
+            "Second": oai.Schema.model_validate({"type": "string"}),
+        }
+        update_schemas_with_data = mocker.patch(f"{MODULE_NAME}.update_schemas_with_data", wraps=real_update)
 
-        result = _create_schemas(components=components, schemas=schemas, config=config)
-        parse_reference_path.assert_has_calls(
-            [
-                call("#/components/schemas/first"),
-                call("#/components/schemas/second"),
-                call("#/components/schemas/first"),
-            ]
+        result = _create_schemas(components=components, schemas=Schemas(), config=config)
+
+        assert [call.kwargs["ref_path"] for call in update_schemas_with_data.call_args_list] == [
+            "/components/schemas/Second",
+            "/components/schemas/First",
+        ]
+        assert result.errors == []
+
+    def test_reports_cycles(self, config):
+        from openapi_python_client.parser.properties import Schemas, _create_schemas
+
+        components = {
+            "First": oai.Schema.model_validate({"type": "array", "items": {"$ref": "#/components/schemas/Second"}}),
+            "Second": oai.Schema.model_validate({"type": "array", "items": {"$ref": "#/components/schemas/First"}}),
+            "Recursive": oai.Schema.model_validate(
+                {"type": "object", "properties": {"child": {"$ref": "#/components/schemas/Recursive"}}}
+            ),
+        }
+
+        result = _create_schemas(components=components, schemas=Schemas(), config=config)
+
+        assert len(result.errors) == 2
+        assert all(
+            error.detail.endswith("Circular reference between schemas: First, Second") for error in result.errors
         )
-        assert update_schemas_with_data.call_count == 3
-        assert result.errors == [PropertyError()]
+        assert "/components/schemas/Recursive" in result.classes_by_reference
+
+    def test_property_references_are_not_cycles(self, config):
+        from openapi_python_client.parser.properties import Schemas, _create_schemas
+
+        components = {
+            "Invalid": oai.Schema.model_validate(
+                {
+                    "type": "string",
+                    "format": "uuid",
+                    "default": "not a uuid",
+                    "properties": {"self": {"$ref": "#/components/schemas/Invalid"}},
+                }
+            ),
+        }
+
+        result = _create_schemas(components=components, schemas=Schemas(), config=config)
+
+        assert len(result.errors) == 1
+        assert "Circular reference" not in result.errors[0].detail
 
 
 class TestProcessModels:
-    def test_detect_recursive_allof_reference_no_retry(self, mocker, model_property_factory, config):
-        from openapi_python_client.parser.properties import Class, _process_models
-        from openapi_python_client.schema import Reference
+    def test_detect_recursive_allof_reference(self, config):
+        from openapi_python_client.parser.properties import Schemas, build_schemas
 
-        class_name = ClassName("class_name", "")
-        recursive_model = model_property_factory(
-            class_info=Class(name=class_name, module_name=PythonIdentifier("module_name", ""))
-        )
-        second_model = model_property_factory()
-        schemas = Schemas(
-            classes_by_name={
-                "recursive": recursive_model,
-                "second": second_model,
-            },
-            models_to_process=[recursive_model, second_model],
-        )
-        recursion_error = PropertyError(data=Reference.model_construct(ref=f"#/{class_name}"))
-        process_model = mocker.patch(f"{MODULE_NAME}.process_model", side_effect=[recursion_error, schemas])
-        process_model_errors = mocker.patch(f"{MODULE_NAME}._process_model_errors", return_value=["error"])
+        components = {
+            "Recursive": oai.Schema.model_validate({"allOf": [{"$ref": "#/components/schemas/Recursive"}, {}]}),
+            "First": oai.Schema.model_validate({"allOf": [{"$ref": "#/components/schemas/Second"}, {}]}),
+            "Second": oai.Schema.model_validate({"allOf": [{"$ref": "#/components/schemas/First"}, {}]}),
+            "Valid": oai.Schema.model_validate({"type": "object"}),
+        }
 
-        result = _process_models(schemas=schemas, config=config)
+        result = build_schemas(components=components, schemas=Schemas(), config=config)
 
-        process_model.assert_has_calls(
-            [
-                call(recursive_model, schemas=schemas, config=config),
-                call(schemas.classes_by_name["second"], schemas=schemas, config=config),
-            ]
-        )
-        assert process_model_errors.was_called_once_with([(recursive_model, recursion_error)])
-        assert all(error in result.errors for error in process_model_errors.return_value)
-        assert "\n\nRecursive allOf reference found" in recursion_error.detail
+        assert [error.header for error in result.errors] == [
+            "\nUnable to process schema /components/schemas/Recursive:",
+            "\nUnable to process schema /components/schemas/First:",
+            "\nUnable to process schema /components/schemas/Second:",
+        ]
+        assert "Recursive allOf reference found between: Recursive\n" in result.errors[0].detail
+        assert "Recursive allOf reference found between: First, Second\n" in result.errors[1].detail
+        assert result.classes_by_name.keys() == {"Valid"}
+
+    def test_processes_models_after_their_all_of_references(self, mocker, config):
+        from openapi_python_client.parser.properties import Schemas, build_schemas
+        from openapi_python_client.parser.properties.model_property import process_model as real_process_model
+
+        components = {
+            "Child": oai.Schema.model_validate({"allOf": [{"$ref": "#/components/schemas/Parent"}, {}]}),
+            "Holder": oai.Schema.model_validate(
+                {
+                    "type": "object",
+                    "properties": {"inline": {"allOf": [{"$ref": "#/components/schemas/Child"}, {}]}},
+                }
+            ),
+            "Parent": oai.Schema.model_validate({"type": "object", "properties": {"a": {"type": "string"}}}),
+        }
+        process_model = mocker.patch(f"{MODULE_NAME}.process_model", wraps=real_process_model)
+
+        result = build_schemas(components=components, schemas=Schemas(), config=config)
+
+        assert result.errors == []
+        assert [call.args[0].class_info.name for call in process_model.call_args_list] == ["Parent", "Child", "Holder"]
 
     def test_resolve_reference_to_single_allof_reference(self, config, model_property_factory):
         # test for https://github.com/openapi-generators/openapi-python-client/issues/1091
@@ -548,13 +592,13 @@ class TestBuildParameters:
         )
         assert result == update_parameters_with_data.return_value
 
-    def test_retries_failing_parameters_while_making_progress(self, mocker, config):
+    def test_does_not_retry_failing_parameters(self, mocker, config):
         from openapi_python_client.parser.properties import Parameters, build_parameters
         from openapi_python_client.schema import Parameter
 
         parameters = {"first": Parameter.model_construct(), "second": Parameter.model_construct()}
         update_parameters_with_data = mocker.patch(
-            f"{MODULE_NAME}.update_parameters_with_data", side_effect=[ParameterError(), Parameters(), ParameterError()]
+            f"{MODULE_NAME}.update_parameters_with_data", side_effect=[ParameterError(), Parameters()]
         )
 
         parse_reference_path = mocker.patch(f"{MODULE_NAME}.parse_reference_path")
@@ -563,10 +607,9 @@ class TestBuildParameters:
             [
                 call("#/components/parameters/first"),
                 call("#/components/parameters/second"),
-                call("#/components/parameters/first"),
             ]
         )
-        assert update_parameters_with_data.call_count == 3
+        assert update_parameters_with_data.call_count == 2
         assert result.errors == [ParameterError()]
 
 
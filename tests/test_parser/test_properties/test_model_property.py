@@ -141,7 +141,7 @@ class TestBuild:
             process_properties=True,
         )
 
-        assert new_schemas != schemas
+        assert new_schemas is schemas
         assert new_schemas.classes_by_name == {
             "OtherModel": None,
             "ParentMyModel": model,
@@ -309,7 +309,7 @@ class TestBuild:
             process_properties=False,
         )
 
-        assert new_schemas != schemas
+        assert new_schemas is schemas
         assert new_schemas.classes_by_name == {
             "OtherModel": None,
             "ParentMyModel": model,
@@ -646,6 +646,39 @@ class TestProcessProperties:
         result, _ = _process_properties(data=data, schemas=schemas, class_name="", config=config, roots={"root"})
         assert isinstance(result, PropertyError)
 
+    def test_conflicting_property_names_after_renaming(self, config):
+        # ---1 and _1 are both a1, and renaming them makes _1 into a_1, which is already taken
+        config = evolve(config, field_prefix="a")
+        names = ["a_1", "_1", "---1"]
+        data = oai.Schema.model_construct(
+            properties={name: oai.Schema.model_construct(type="string") for name in names}
+        )
+
+        result, _ = _process_properties(data=data, schemas=Schemas(), class_name="", config=config, roots={"root"})
+
+        assert isinstance(result, PropertyError)
+        assert result.header == "Conflicting property names"
+
+    def test_inherits_properties_of_shared_base(self, model_property_factory, string_property_factory, config):
+        base = model_property_factory(
+            required_properties=[string_property_factory(name="id", required=True)],
+            optional_properties=[string_property_factory(name="some_prop", required=False)],
+        )
+        schemas = Schemas(classes_by_reference={"/Base": base})
+        data = oai.Schema.model_construct(
+            allOf=[oai.Reference.model_construct(ref="#/Base")],
+            properties={"someProp": oai.Schema.model_construct(type="string")},
+        )
+
+        first, _ = _process_properties(data=data, schemas=schemas, class_name="", config=config, roots={"root"})
+        second, _ = _process_properties(data=data, schemas=schemas, class_name="", config=config, roots={"root"})
+
+        for result in (first, second):
+            assert result.required_properties == base.required_properties
+            assert [prop.name for prop in result.optional_properties] == ["some_prop", "someProp"]
+            assert len({prop.python_name for prop in result.optional_properties}) == 2
+        assert base.details.properties_by_name() is base.details.properties_by_name()
+
     def test_merge_inline_objects(self, model_property_factory, enum_property_factory, config):
         data = oai.Schema.model_construct(
             allOf=[
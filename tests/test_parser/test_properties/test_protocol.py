@@ -93,3 +93,24 @@ def test_needs_post_processing(any_property_factory, model_property_factory):
 
     p2 = model_property_factory()
     assert p2.needs_post_processing() is True
+
+
+def test_cached_values_are_copied_and_invalidated(
+    mocker, list_property_factory, model_property_factory, string_property_factory, config
+):
+    inner = model_property_factory()
+    prop = list_property_factory(inner_property=inner)
+    get_inner_imports = mocker.spy(inner, "get_imports")
+
+    imports = prop.get_imports(prefix="..")
+    imports.add("mutated")
+    assert prop.get_imports(prefix="..") == imports - {"mutated"}
+    assert get_inner_imports.call_count == 1
+
+    inner.set_relative_imports(set())
+    prop.get_imports(prefix="..")
+    assert get_inner_imports.call_count == 2
+
+    string_property_factory().set_python_name("other", config=config)
+    prop.get_imports(prefix="..")
+    assert get_inner_imports.call_count == 3
@@ -156,3 +156,129 @@ class TestUpdateParametersFromData:
 
         parameter_from_data.assert_called_once()
         assert new_parameters.classes_by_reference[ref_path] == param
+
+    def test_keeps_first_parameter_for_reference(self, config):
+        from openapi_python_client.parser.properties.schemas import update_parameters_with_data
+        from openapi_python_client.schema import ParameterLocation, Schema
+
+        parameters = Parameters()
+        ref_path = "#/components/parameters/a_param"
+        first, second = (
+            Parameter(name="a_param", param_in=ParameterLocation.QUERY, param_schema=Schema(description=description))
+            for description in ("first", "second")
+        )
+
+        update_parameters_with_data(ref_path=ref_path, data=first, parameters=parameters, config=config)
+        update_parameters_with_data(ref_path=ref_path, data=second, parameters=parameters, config=config)
+
+        assert parameters.classes_by_reference[ref_path].param_schema.description == "first"
+
+
+class TestUpdateSchemasWithData:
+    def test_keeps_first_property_for_reference(self, config):
+        from openapi_python_client.parser.properties import Schemas
+        from openapi_python_client.parser.properties.schemas import ReferencePath, update_schemas_with_data
+        from openapi_python_client.schema import Schema
+
+        schemas = Schemas()
+        ref_path = ReferencePath("/components/schemas/AString")
+
+        update_schemas_with_data(ref_path=ref_path, data=Schema(type="string"), schemas=schemas, config=config)
+        update_schemas_with_data(ref_path=ref_path, data=Schema(type="integer"), schemas=schemas, config=config)
+
+        assert schemas.classes_by_reference[ref_path].get_type_string() == "str"
+
+
+class TestSchemas:
+    def test_updates_in_place(self, config):
+        from openapi_python_client.parser.properties import Schemas, build_schemas
+        from openapi_python_client.schema import Schema
+
+        schemas = Schemas()
+        components = {
+            "MyModel": Schema.model_validate({"type": "object", "properties": {"a": {"type": "string"}}}),
+            "MyEnum": Schema.model_validate({"type": "string", "enum": ["a", "b"]}),
+        }
+
+        new_schemas = build_schemas(components=components, schemas=schemas, config=config)
+
+        assert new_schemas is schemas
+        assert set(schemas.classes_by_name) == {"MyModel", "MyEnum"}
+        assert set(schemas.classes_by_reference) == {"/components/schemas/MyModel", "/components/schemas/MyEnum"}
+
+    def test_rollback(self, any_property_factory, model_property_factory):
+        from openapi_python_client.parser.properties import Schemas
+
+        original = any_property_factory()
+        replacement = any_property_factory()
+        model = model_property_factory()
+        schemas = Schemas(classes_by_name={ClassName("Existing", ""): original})
+
+        checkpoint = schemas.checkpoint()
+        schemas.set_class_by_name(ClassName("Existing", ""), replacement)
+        schemas.set_class_by_name(ClassName("New", ""), model)
+        schemas.add_model_to_process(model)
+        schemas.rollback(checkpoint)
+
+        assert schemas.classes_by_name == {"Existing": original}
+        assert schemas.models_to_process == []
+
+    def test_identical_inline_class(self, model_property_factory):
+        from openapi_python_client.parser.properties import Schemas
+
+        model = model_property_factory(class_info=Class(name=ClassName("First", ""), module_name="first"))
+        schemas = Schemas()
+        schemas.set_class_by_name(ClassName("First", ""), model)
+        schemas.add_inline_class("fingerprint", model)
+
+        assert schemas.identical_inline_class("other", ClassName("Second", "")) is None
+        assert schemas.identical_inline_class("fingerprint", ClassName("First", "")) is model
+        assert schemas.identical_inline_class("fingerprint", ClassName("Second", "")) is model
+        assert schemas.merged_classes == {"First": {"Second"}}
+
+    def test_identical_inline_class_ignores_removed_classes(self, model_property_factory):
+        from openapi_python_client.parser.properties import Schemas
+
+        model = model_property_factory(class_info=Class(name=ClassName("First", ""), module_name="first"))
+        schemas = Schemas()
+        checkpoint = schemas.checkpoint()
+        schemas.set_class_by_name(ClassName("First", ""), model)
+        schemas.add_inline_class("fingerprint", model)
+        schemas.rollback(checkpoint)
+
+        assert schemas.identical_inline_class("fingerprint", ClassName("Second", "")) is None
+        assert schemas.merged_classes == {}
+
+    def test_rollback_merged_classes(self, model_property_factory):
+        from openapi_python_client.parser.properties import Schemas
+
+        model = model_property_factory(class_info=Class(name=ClassName("First", ""), module_name="first"))
+        schemas = Schemas()
+        schemas.set_class_by_name(ClassName("First", ""), model)
+        schemas.add_inline_class("fingerprint", model)
+        schemas.identical_inline_class("fingerprint", ClassName("Second", ""))
+
+        checkpoint = schemas.checkpoint()
+        schemas.identical_inline_class("fingerprint", ClassName("Second", ""))
+        schemas.identical_inline_class("fingerprint", ClassName("Third", ""))
+        schemas.rollback(checkpoint)
+
+        assert schemas.merged_classes == {"First": {"Second"}}
+        assert schemas.checkpoint() == checkpoint
+
+
+def test_inline_schema_fingerprint():
+    from openapi_python_client.parser.properties.schemas import inline_schema_fingerprint
+    from openapi_python_client.schema import Schema
+
+    def fingerprint(data):
+        return inline_schema_fingerprint(Schema.model_validate(data))
+
+    properties = {"id": {"type": "integer"}, "name": {"type": "string"}}
+    original = fingerprint({"type": "object", "properties": properties, "title": "Item", "example": {"id": 1}})
+
+    assert (
+        fingerprint({"properties": dict(reversed(properties.items())), "type": "object", "nullable": False}) == original
+    )
+    assert fingerprint({"type": "object", "properties": properties, "description": "An item"}) != original
+    assert fingerprint({"type": "object", "properties": {**properties, "id": {"type": "number"}}}) != original
@@ -0,0 +1,80 @@
+import json
+import threading
+import tracemalloc
+
+from openapi_python_client import profiling
+from openapi_python_client.profiling import profile, span
+
+
+def test_span_does_nothing_without_profile() -> None:
+    with span("anything"):
+        pass
+
+    assert profiling._active is None
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile_writes_chrome_trace(tmp_path) -> None:
+    path = tmp_path / "trace.json"
+
+    with profile(path):
+        with span("outer", "phase", extra="info"):
+            with span("inner", "schema"):
+                data = [0] * 100_000
+            del data
+
+    assert profiling._active is None
+    assert not tracemalloc.is_tracing()
+    events = {event["name"]: event for event in json.loads(path.read_text())["traceEvents"]}
+    assert set(events) == {"generate", "outer", "inner"}
+    outer, inner = events["outer"], events["inner"]
+    assert outer["ph"] == "X"
+    assert outer["cat"] == "phase"
+    assert outer["args"]["extra"] == "info"
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert inner["args"]["allocated_bytes"] >= 800_000
+    # The list was freed before leaving outer, but its allocation still counts towards outer's peak
+    assert outer["args"]["peak_memory_bytes"] >= inner["args"]["peak_memory_bytes"]
+    assert outer["args"]["retained_bytes"] < inner["args"]["allocated_bytes"]
+
+
+def test_profile_ignores_spans_from_other_threads(tmp_path) -> None:
+    path = tmp_path / "trace.json"
+
+    def other_thread() -> None:
+        with span("ignored"):
+            pass
+
+    with profile(path):
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        thread.join()
+
+    names = [event["name"] for event in json.loads(path.read_text())["traceEvents"]]
+    assert names == ["generate"]
+
+
+def test_profile_keeps_existing_tracing(tmp_path) -> None:
+    tracemalloc.start()
+    try:
+        with profile(tmp_path / "trace.json"):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_annotate_adds_args_to_running_span(tmp_path) -> None:
+    path = tmp_path / "trace.json"
+
+    profiling.annotate(ignored=True)
+    with profile(path):
+        with span("outer", found="before"):
+            with span("inner"):
+                pass
+            profiling.annotate(found="after")
+
+    events = {event["name"]: event for event in json.loads(path.read_text())["traceEvents"]}
+    assert events["outer"]["args"]["found"] == "after"
+    assert "found" not in events["inner"]["args"]
@@ -0,0 +1,210 @@
+import pytest
+
+from openapi_python_client.tidy import tidy_python
+
+
+def test_tidy_python_sorts_and_merges_imports() -> None:
+    source = (
+        '"""A module"""\n'
+        "from ..types import UNSET, Unset\n"
+        "from typing import Any, TypeVar\n"
+        "from __future__ import annotations\n"
+        "import httpx\n"
+        "from typing import cast\n"
+        "from ... import errors\n"
+        "import datetime\n"
+        "from attrs import define as _attrs_define\n"
+        "\n"
+        "value: Any = cast(TypeVar, [UNSET, Unset, errors, httpx, datetime, _attrs_define])\n"
+    )
+
+    assert tidy_python(source) == (
+        '"""A module"""\n'
+        "\n"
+        "from __future__ import annotations\n"
+        "\n"
+        "import datetime\n"
+        "from typing import Any, TypeVar, cast\n"
+        "\n"
+        "import httpx\n"
+        "from attrs import define as _attrs_define\n"
+        "\n"
+        "from ... import errors\n"
+        "from ..types import UNSET, Unset\n"
+        "\n"
+        "value: Any = cast(TypeVar, [UNSET, Unset, errors, httpx, datetime, _attrs_define])\n"
+    )
+
+
+@pytest.mark.parametrize("remove_unused_imports", (True, False))
+def test_tidy_python_unused_imports(remove_unused_imports) -> None:
+    source = "from typing import Any, Optional, Union\nimport json\n\nvalue: Optional[int] = None\n"
+
+    result = tidy_python(source, remove_unused_imports=remove_unused_imports)
+
+    if remove_unused_imports:
+        assert result == "from typing import Optional\n\nvalue: Optional[int] = None\n"
+    else:
+        assert result == "import json\nfrom typing import Any, Optional, Union\n\nvalue: Optional[int] = None\n"
+
+
+def test_tidy_python_wraps_long_imports() -> None:
+    names = [f"Model{i}" for i in range(20)]
+    source = f"from .models import {', '.join(names)}\n\nvalue = [{', '.join(names)}]\n"
+
+    result = tidy_python(source)
+
+    assert result.startswith("from .models import (\n    Model0,\n    Model1,\n")
+    assert "    Model19,\n)\n" in result
+
+
+def test_tidy_python_blank_lines() -> None:
+    source = (
+        "import json\n"
+        "value = json\n"
+        "def function(\n"
+        "\n"
+        "    argument: int,   \n"
+        "\n"
+        ") -> None:\n"
+        "\n"
+        "    first = 1\n"
+        "\n"
+        "\n"
+        "\n"
+        "    second = 2\n"
+        "class Class:\n"
+        "    pass\n"
+        "other = 1\n"
+    )
+
+    assert tidy_python(source) == (
+        "import json\n"
+        "\n"
+        "value = json\n"
+        "\n"
+        "\n"
+        "def function(\n"
+        "    argument: int,\n"
+        ") -> None:\n"
+        "    first = 1\n"
+        "\n"
+        "    second = 2\n"
+        "\n"
+        "\n"
+        "class Class:\n"
+        "    pass\n"
+        "\n"
+        "\n"
+        "other = 1\n"
+    )
+
+
+def test_tidy_python_leaves_multi_line_strings_alone() -> None:
+    source = 'value = """\n\n\n  keep   \n"""\nother = "# not a comment"\n'
+
+    assert tidy_python(source) == source
+
+
+@pytest.mark.parametrize(
+    "source",
+    (
+        "import json  # noqa: F401\nvalue = 1\n",
+        "from typing import (\nvalue = 1\n",
+    ),
+)
+def test_tidy_python_leaves_imports_it_cant_handle(source) -> None:
+    result = tidy_python(source)
+
+    assert result.startswith(source.split("\n")[0])
+
+
+def test_tidy_python_indented_imports() -> None:
+    long_name = "Model" * 20
+    source = (
+        "from typing import TYPE_CHECKING\n"
+        "\n"
+        "\n"
+        "value = 1\n"
+        "if TYPE_CHECKING:\n"
+        "    from ..models.pet import Pet\n"
+        "    from ..models.owner import Owner\n"
+        "    from ..models.unused import Unused\n"
+        "\n"
+        "\n"
+        "class Model:\n"
+        "    owner: 'Owner'\n"
+        "\n"
+        "    def to_dict(self) -> dict[str, 'Pet']:\n"
+        "        from ..models.pet import Pet\n"
+        "        from ..models.owner import Owner\n"
+        "        return {}\n"
+        "\n"
+        "    def from_dict(\n"
+        "        self,\n"
+        "    ) -> None:\n"
+        f"        from ..models.owner import Owner, {long_name}\n"
+        f"        Owner({long_name})\n"
+        "\n"
+        "    def only_imports(self) -> None:\n"
+        "        from ..models.pet import Pet\n"
+        "\n"
+        "other = Pet\n"
+    )
+
+    assert tidy_python(source) == (
+        "from typing import TYPE_CHECKING\n"
+        "\n"
+        "value = 1\n"
+        "if TYPE_CHECKING:\n"
+        "    from ..models.owner import Owner\n"
+        "    from ..models.pet import Pet\n"
+        "\n"
+        "\n"
+        "class Model:\n"
+        "    owner: 'Owner'\n"
+        "\n"
+        "    def to_dict(self) -> dict[str, 'Pet']:\n"
+        "        return {}\n"
+        "\n"
+        "    def from_dict(\n"
+        "        self,\n"
+        "    ) -> None:\n"
+        "        from ..models.owner import (\n"
+        f"            {long_name},\n"
+        "            Owner,\n"
+        "        )\n"
+        f"        Owner({long_name})\n"
+        "\n"
+        "    def only_imports(self) -> None:\n"
+        "        from ..models.pet import Pet\n"
+        "\n"
+        "\n"
+        "other = Pet\n"
+    )
+
+
+def test_tidy_python_docstrings() -> None:
+    source = (
+        '""" A module """\n'
+        "\n"
+        "\n"
+        "def function() -> None:\n"
+        '    """ \n'
+        "    Args:   \n"
+        "        value: Something\n"
+        '    """\n'
+        '    value = """  not a docstring """\n'
+    )
+
+    assert tidy_python(source) == (
+        '"""A module"""\n'
+        "\n"
+        "\n"
+        "def function() -> None:\n"
+        '    """\n'
+        "    Args:\n"
+        "        value: Something\n"
+        '    """\n'
+        '    value = """  not a docstring """\n'
+    )
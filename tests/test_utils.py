@@ -19,6 +19,16 @@ class TestPythonIdentifier:
     def test_empty_is_prefixed(self):
         assert utils.PythonIdentifier(value="", prefix="something") == "something"
 
+    def test_pickle_round_trip_is_unchanged(self):
+        import pickle
+
+        identifier = utils.PythonIdentifier(value="Some Name", prefix="field", skip_snake_case=True)
+
+        unpickled = pickle.loads(pickle.dumps(identifier))
+
+        assert unpickled == identifier
+        assert isinstance(unpickled, utils.PythonIdentifier)
+
 
 class TestClassName:
     def test_valid_is_not_changed(self):
@@ -36,6 +46,16 @@ class TestClassName:
     def test_empty_is_prefixed(self):
         assert utils.ClassName(value="", prefix="something") == "Something"
 
+    def test_pickle_round_trip_is_unchanged(self):
+        import pickle
+
+        class_name = utils.ClassName(value="1", prefix="field")
+
+        unpickled = pickle.loads(pickle.dumps(class_name))
+
+        assert unpickled == class_name
+        assert isinstance(unpickled, utils.ClassName)
+
 
 @pytest.mark.parametrize(
     "before, after",
@@ -134,3 +154,25 @@ def test_pascalcase(before, after):
 )
 def test_get_content_type(content_type: str, expected: str, config) -> None:
     assert utils.get_content_type(content_type, config) == expected
+
+
+def test_cache_info_counts_hits_and_misses():
+    utils.clear_caches()
+
+    utils.snake_case("SomeName")
+    utils.snake_case("SomeName")
+    utils.PythonIdentifier("SomeName", prefix="field")
+    utils.PythonIdentifier("SomeName", prefix="field")
+
+    info = utils.cache_info()
+    assert info["snake_case"].misses == 1
+    assert info["snake_case"].hits == 2  # Once from PythonIdentifier
+    assert info["python_identifier"].misses == 1
+    assert info["python_identifier"].hits == 1
+
+
+def test_split_words_returns_a_new_list():
+    words = utils.split_words("SomeName")
+    words.append("mutated")
+
+    assert utils.split_words("SomeName") == ["Some", "Name"]
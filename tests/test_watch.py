@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+
+import pytest
+from attrs import evolve
+
+from openapi_python_client.config import Config, MetaType
+from openapi_python_client.watch import Watcher, watch
+
+
+def _document(description: str) -> dict:
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "My Test API", "version": "1.0.0"},
+        "paths": {"/things": {"get": {"operationId": "get_things", "tags": ["things"], "responses": {}}}},
+        "components": {"schemas": {"Thing": {"type": "object", "description": description}}},
+    }
+
+
+@pytest.fixture
+def watcher(config: Config, tmp_path: Path) -> Watcher:
+    document_path = tmp_path / "openapi.json"
+    document_path.write_text(json.dumps(_document("A thing")))
+    (tmp_path / "templates").mkdir()
+    config = evolve(
+        config,
+        document_source=document_path,
+        meta_type=MetaType.NONE,
+        post_hooks=[],
+        overwrite=True,
+        incremental=True,
+        fast=True,
+        output_path=tmp_path / "client",
+    )
+    return Watcher(config=config, custom_template_path=tmp_path / "templates")
+
+
+def _touch(path: Path, content: str) -> None:
+    """Write `content` to `path` so that watching notices, even if the filesystem's timestamps are coarse"""
+    modified = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(content)
+    if path.stat().st_mtime_ns == modified:
+        path.touch()
+
+
+class TestWatcher:
+    def test_document_changes(self, watcher: Watcher, tmp_path: Path, mocker) -> None:
+        from openapi_python_client import watch as watch_module
+
+        assert not watcher.generate()
+        assert not watcher.changed()
+        get_generator_data = mocker.spy(watch_module, "get_generator_data")
+
+        _touch(tmp_path / "openapi.json", json.dumps(_document("Changed")))
+
+        assert watcher.changed()
+        assert not watcher.generate()
+        assert get_generator_data.call_count == 1
+        assert "Changed" in (tmp_path / "client" / "models" / "thing.py").read_text()
+        assert watcher.render_cache.rendered == 1
+        assert not watcher.changed()
+
+    def test_template_changes_only_render_again(self, watcher: Watcher, tmp_path: Path, mocker) -> None:
+        from openapi_python_client import watch as watch_module
+
+        assert not watcher.generate()
+        get_generator_data = mocker.spy(watch_module, "get_generator_data")
+
+        _touch(tmp_path / "templates" / "errors.py.jinja", "# Custom errors\n")
+
+        assert watcher.changed()
+        assert not watcher.generate()
+        get_generator_data.assert_not_called()
+        assert (tmp_path / "client" / "errors.py").read_text() == "# Custom errors\n"
+
+        _touch(tmp_path / "templates" / "errors.py.jinja", "# Changed custom errors\n")
+        assert not watcher.generate()
+        assert (tmp_path / "client" / "errors.py").read_text() == "# Changed custom errors\n"
+
+    def test_invalid_document(self, watcher: Watcher, tmp_path: Path) -> None:
+        assert not watcher.generate()
+        _touch(tmp_path / "openapi.json", "{}")
+
+        errors = watcher.generate()
+
+        assert errors[0].header == "Failed to parse OpenAPI document"
+        assert not watcher.changed()
+        _touch(tmp_path / "openapi.json", json.dumps(_document("Fixed")))
+        assert watcher.changed()
+        assert not watcher.generate()
+
+
+def test_watch_generates_again_after_changes(mocker) -> None:
+    watcher = mocker.MagicMock(spec=Watcher)
+    watcher.generate.return_value = []
+    watcher.changed.side_effect = [False, False, True, KeyboardInterrupt]
+    on_generated = mocker.MagicMock()
+    sleep = mocker.patch("time.sleep")
+
+    with pytest.raises(KeyboardInterrupt):
+        watch(watcher, on_generated, poll_interval=0.1)
+
+    assert watcher.generate.call_count == 2
+    assert on_generated.call_count == 2
+    sleep.assert_called_with(0.1)